@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Caps concurrent ReAct runs with a bounded, per-user fair wait queue.
+
+    - At most ``max_concurrent`` runs execute at once.
+    - Up to ``max_queue`` requests wait for a slot, each for at most
+      ``queue_timeout`` seconds; beyond that requests are shed with 503.
+    - A single user may hold at most ``per_user_limit`` running + waiting
+      requests (429 beyond that), and freed slots are handed out round-robin
+      across users so one heavy user cannot starve the others.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        per_user_limit: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_concurrent = max(1, max_concurrent)
+        self._max_queue = max(0, max_queue)
+        self._queue_timeout = queue_timeout
+        self._per_user_limit = max(1, per_user_limit)
+        self._clock = clock
+        self._running = 0
+        self._queued = 0
+        self._waiters: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+        self._per_user: dict[str, int] = {}
+        self._avg_run_seconds = 1.0
+        self.admitted = 0
+        self.rejected_user = 0
+        self.rejected_full = 0
+        self.timed_out = 0
+
+    @asynccontextmanager
+    async def slot(self, user_id: str):
+        await self.acquire(user_id)
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.release(user_id, self._clock() - started)
+
+    async def acquire(self, user_id: str) -> None:
+        if self._per_user.get(user_id, 0) >= self._per_user_limit:
+            self.rejected_user += 1
+            raise AdmissionRejected(429, "请求过于频繁，请稍后重试", self._retry_after())
+
+        if self._running < self._max_concurrent and not self._queued:
+            self._grant(user_id)
+            return
+
+        if self._queued >= self._max_queue:
+            self.rejected_full += 1
+            raise AdmissionRejected(503, "服务繁忙，请稍后重试", self._retry_after())
+
+        waiter: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, deque()).append(waiter)
+        self._queued += 1
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=self._queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(user_id, waiter)
+            raise
+        if not done:
+            self._abandon(user_id, waiter)
+            self.timed_out += 1
+            raise AdmissionRejected(503, "服务繁忙，请稍后重试", self._retry_after())
+
+    def release(self, user_id: str, elapsed: Optional[float] = None) -> None:
+        self._running -= 1
+        self._drop_user(user_id)
+        if elapsed is not None:
+            self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * elapsed
+        self._wake_next()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self._running,
+            "queued": self._queued,
+            "maxConcurrent": self._max_concurrent,
+            "maxQueue": self._max_queue,
+            "admitted": self.admitted,
+            "rejectedPerUser": self.rejected_user,
+            "rejectedFull": self.rejected_full,
+            "timedOut": self.timed_out,
+        }
+
+    def _grant(self, user_id: str) -> None:
+        self._running += 1
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        self.admitted += 1
+
+    def _wake_next(self) -> None:
+        while self._running < self._max_concurrent and self._waiters:
+            # Round-robin: serve the user at the head, then move it to the back.
+            user_id, waiters = next(iter(self._waiters.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                self._waiters.move_to_end(user_id)
+            else:
+                del self._waiters[user_id]
+            self._queued -= 1
+            # The waiter was already counted against its user while queued.
+            self._running += 1
+            self.admitted += 1
+            waiter.set_result(None)
+
+    def _abandon(self, user_id: str, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # Granted right as the caller gave up: hand the slot back.
+            self.release(user_id)
+            return
+        waiter.cancel()
+        waiters = self._waiters.get(user_id)
+        if waiters and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self._waiters[user_id]
+            self._queued -= 1
+        self._drop_user(user_id)
+
+    def _drop_user(self, user_id: str) -> None:
+        remaining = self._per_user.get(user_id, 0) - 1
+        if remaining > 0:
+            self._per_user[user_id] = remaining
+        else:
+            self._per_user.pop(user_id, None)
+
+    def _retry_after(self) -> int:
+        backlog = (self._queued + 1) / self._max_concurrent
+        return max(1, math.ceil(backlog * self._avg_run_seconds))
@@ -1,20 +1,42 @@
 from __future__ import annotations
 
 import asyncio
+import gc
 import json
+import os
+import sys
+import time
 import uuid
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any, Optional
+from datetime import datetime, timezone
+from typing import Any, Callable, NamedTuple, Optional
 
 from agently import Agently
 
+from . import jsoncodec, tracing
 from .config import settings
+from .llm_endpoints import EndpointPool, LlmEndpoint, parse_endpoints
+from .llm_limiter import (
+    INTERACTIVE,
+    AdaptiveLimiter,
+    LimiterRejected,
+    TokenBucket,
+    current_priority,
+    is_rate_limited,
+    use_priority,
+)
 from .models import ChatMessage
+from .planner_cassette import PlannerCassette
+from .session_queue import SessionTurnQueue
 from .task_api import ApiResult, TaskApi
+from .task_replica import TaskReplica
 
 
 VALID_STATUSES = ["待办", "进行中", "已完成", "已延期", "已取消"]
+SNAPSHOT_VERSION = 2
+# What candidate lists and pending selections need; writes only use the ids.
+CANDIDATE_FIELDS = ["taskId", "title", "status", "tags"]
 
 ACTION_TO_INTENT = {
     "list_tasks": "list",
@@ -25,31 +47,100 @@ ACTION_TO_INTENT = {
 }
 
 
-@dataclass
+class MessageRecord(NamedTuple):
+    role: str
+    content: str
+
+
+@dataclass(frozen=True, slots=True)
+class TaskRef:
+    """What a session keeps of a listed task: enough to show and select it."""
+
+    task_id: str
+    title: str
+    status: str
+    tags: tuple[str, ...]
+
+    @classmethod
+    def from_task(cls, task: dict[str, Any]) -> TaskRef:
+        # Statuses and tags repeat across tasks and sessions; share one copy.
+        return cls(
+            task_id=str(task.get("taskId") or task.get("id") or ""),
+            title=task.get("title") or "",
+            status=sys.intern(task.get("status") or ""),
+            tags=tuple(sys.intern(str(tag)) for tag in task.get("tags") or ()),
+        )
+
+
+def _task_refs(tasks: list[dict[str, Any]]) -> list[TaskRef]:
+    return [TaskRef.from_task(task) for task in tasks]
+
+
+@contextmanager
+def _gc_paused():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _task_ref_row(ref: TaskRef) -> list[Any]:
+    return [ref.task_id, ref.title, ref.status, list(ref.tags)]
+
+
+def _task_ref_from_row(row: list[Any]) -> TaskRef:
+    task_id, title, status, tags = row
+    return TaskRef(task_id, title, sys.intern(status), tuple(sys.intern(tag) for tag in tags))
+
+
+def _message_records(messages: list[ChatMessage]) -> list[MessageRecord]:
+    return [MessageRecord(msg.role, msg.content) for msg in messages]
+
+
+@dataclass(slots=True)
 class SessionState:
     session_id: str
-    messages: list[ChatMessage]
+    messages: list[MessageRecord]
     updated_at: datetime
-    pending_candidates: list[dict[str, Any]] = field(default_factory=list)
+    pending_candidates: list[TaskRef] = field(default_factory=list)
     pending_intent: Optional[str] = None
-    recent_candidates: list[dict[str, Any]] = field(default_factory=list)
+    recent_candidates: list[TaskRef] = field(default_factory=list)
+
+
+class _TracedLock:
+    """``asyncio.Lock`` whose wait for acquisition is a ``session.lock`` span."""
+
+    __slots__ = ("_lock",)
+
+    def __init__(self) -> None:
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> None:
+        with tracing.span("session.lock"):
+            await self._lock.acquire()
+
+    async def __aexit__(self, *_exc: Any) -> None:
+        self._lock.release()
 
 
 class SessionStore:
     def __init__(self, max_messages: int) -> None:
         self._sessions: dict[str, SessionState] = {}
-        self._lock = asyncio.Lock()
+        self._lock = _TracedLock()
         self._max_messages = max_messages
 
     async def get_or_create(self, session_id: Optional[str]) -> SessionState:
         async with self._lock:
             if session_id and session_id in self._sessions:
                 state = self._sessions[session_id]
-                state.updated_at = datetime.utcnow()
+                state.updated_at = datetime.now(timezone.utc)
                 return state
             new_id = session_id or str(uuid.uuid4())
             state = SessionState(
-                session_id=new_id, messages=[], updated_at=datetime.utcnow()
+                session_id=new_id, messages=[], updated_at=datetime.now(timezone.utc)
             )
             self._sessions[new_id] = state
             return state
@@ -61,13 +152,13 @@ class SessionStore:
             if session_id not in self._sessions:
                 self._sessions[session_id] = SessionState(
                     session_id=session_id,
-                    messages=messages[-self._max_messages :],
-                    updated_at=datetime.utcnow(),
+                    messages=_message_records(messages[-self._max_messages :]),
+                    updated_at=datetime.now(timezone.utc),
                 )
                 return
             state = self._sessions[session_id]
-            state.messages = messages[-self._max_messages :]
-            state.updated_at = datetime.utcnow()
+            state.messages = _message_records(messages[-self._max_messages :])
+            state.updated_at = datetime.now(timezone.utc)
 
     async def append_messages(
         self, session_id: str, messages: list[ChatMessage]
@@ -76,14 +167,14 @@ class SessionStore:
             state = self._sessions.get(session_id)
             if not state:
                 state = SessionState(
-                    session_id=session_id, messages=[], updated_at=datetime.utcnow()
+                    session_id=session_id, messages=[], updated_at=datetime.now(timezone.utc)
                 )
                 self._sessions[session_id] = state
-            state.messages.extend(messages)
+            state.messages.extend(_message_records(messages))
             state.messages = state.messages[-self._max_messages :]
-            state.updated_at = datetime.utcnow()
+            state.updated_at = datetime.now(timezone.utc)
 
-    async def get_messages(self, session_id: str) -> list[ChatMessage]:
+    async def get_messages(self, session_id: str) -> list[MessageRecord]:
         async with self._lock:
             state = self._sessions.get(session_id)
             if not state:
@@ -97,12 +188,12 @@ class SessionStore:
             state = self._sessions.get(session_id)
             if not state:
                 state = SessionState(
-                    session_id=session_id, messages=[], updated_at=datetime.utcnow()
+                    session_id=session_id, messages=[], updated_at=datetime.now(timezone.utc)
                 )
                 self._sessions[session_id] = state
-            state.pending_candidates = candidates
+            state.pending_candidates = _task_refs(candidates)
             state.pending_intent = intent
-            state.updated_at = datetime.utcnow()
+            state.updated_at = datetime.now(timezone.utc)
 
     async def clear_pending(self, session_id: str) -> None:
         async with self._lock:
@@ -111,11 +202,11 @@ class SessionStore:
                 return
             state.pending_candidates = []
             state.pending_intent = None
-            state.updated_at = datetime.utcnow()
+            state.updated_at = datetime.now(timezone.utc)
 
     async def get_pending(
         self, session_id: str
-    ) -> tuple[Optional[str], list[dict[str, Any]]]:
+    ) -> tuple[Optional[str], list[TaskRef]]:
         async with self._lock:
             state = self._sessions.get(session_id)
             if not state:
@@ -127,11 +218,11 @@ class SessionStore:
             state = self._sessions.get(session_id)
             if not state:
                 state = SessionState(
-                    session_id=session_id, messages=[], updated_at=datetime.utcnow()
+                    session_id=session_id, messages=[], updated_at=datetime.now(timezone.utc)
                 )
                 self._sessions[session_id] = state
-            state.recent_candidates = candidates
-            state.updated_at = datetime.utcnow()
+            state.recent_candidates = _task_refs(candidates)
+            state.updated_at = datetime.now(timezone.utc)
 
     async def clear_recent(self, session_id: str) -> None:
         async with self._lock:
@@ -139,30 +230,126 @@ class SessionStore:
             if not state:
                 return
             state.recent_candidates = []
-            state.updated_at = datetime.utcnow()
+            state.updated_at = datetime.now(timezone.utc)
 
-    async def get_recent(self, session_id: str) -> list[dict[str, Any]]:
+    async def get_recent(self, session_id: str) -> list[TaskRef]:
         async with self._lock:
             state = self._sessions.get(session_id)
             if not state:
                 return []
             return list(state.recent_candidates)
 
+    def dump_snapshot(self, path: str) -> int:
+        """Write all sessions to ``path`` atomically and return how many.
+
+        Synchronous on purpose: nothing else runs on the loop while it writes,
+        so the snapshot is consistent without taking the lock.
+        """
+        with _gc_paused():
+            sessions = [
+                [
+                    state.session_id,
+                    state.updated_at.isoformat(),
+                    state.pending_intent,
+                    [[message.role, message.content] for message in state.messages],
+                    [_task_ref_row(ref) for ref in state.pending_candidates],
+                    [_task_ref_row(ref) for ref in state.recent_candidates],
+                ]
+                for state in self._sessions.values()
+            ]
+            body = jsoncodec.dumps_bytes({"version": SNAPSHOT_VERSION, "sessions": sessions})
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(body)
+        os.replace(tmp_path, path)
+        return len(sessions)
+
+    def load_snapshot(self, path: str) -> int:
+        """Restore sessions written by ``dump_snapshot``; 0 if missing or unreadable."""
+        # Millions of small objects: without pausing, GC passes dominate the load.
+        with _gc_paused():
+            try:
+                with open(path, "rb") as handle:
+                    data = jsoncodec.loads(handle.read())
+                if data.get("version") != SNAPSHOT_VERSION:
+                    return 0
+                rows = data["sessions"]
+                restored = {
+                    session_id: SessionState(
+                        session_id=session_id,
+                        messages=[
+                            MessageRecord(role, content) for role, content in messages
+                        ][-self._max_messages :],
+                        updated_at=datetime.fromisoformat(updated_at),
+                        pending_candidates=[_task_ref_from_row(row) for row in pending],
+                        pending_intent=pending_intent,
+                        recent_candidates=[_task_ref_from_row(row) for row in recent],
+                    )
+                    for session_id, updated_at, pending_intent, messages, pending, recent in rows
+                }
+            except (OSError, ValueError, TypeError, AttributeError, KeyError):
+                return 0
+        self._sessions.update(restored)
+        return len(restored)
+
 
 class ReActPlanner:
-    def __init__(self) -> None:
-        Agently.set_settings(
+    def __init__(
+        self,
+        limiter: Optional[AdaptiveLimiter] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        endpoints: Optional[EndpointPool] = None,
+        cassette: Optional[PlannerCassette] = None,
+    ) -> None:
+        if cassette is None and settings.planner_cassette_mode != "off":
+            cassette = PlannerCassette(
+                settings.planner_cassette_path,
+                settings.planner_cassette_mode,
+                settings.planner_cassette_delay_scale,
+            )
+        self.cassette = cassette
+        self.limiter = limiter or AdaptiveLimiter(
+            initial_limit=settings.llm_initial_concurrency,
+            max_limit=settings.llm_max_concurrency,
+            max_queue=settings.llm_max_queued,
+            queue_timeout=settings.llm_queue_timeout,
+            interactive_reserve=settings.llm_interactive_reserve,
+            starvation_timeout=settings.llm_starvation_timeout,
+        )
+        self.rate_limiter = rate_limiter or TokenBucket(
+            settings.llm_rate_per_second, settings.llm_rate_burst
+        )
+        self.endpoints = endpoints or EndpointPool(
+            parse_endpoints(
+                settings.llm_endpoints,
+                settings.llm_base_url,
+                settings.llm_model,
+                settings.llm_api_key,
+            ),
+            failure_threshold=settings.llm_endpoint_failure_threshold,
+            cooldown=settings.llm_endpoint_cooldown,
+            hedge=settings.llm_hedge_enabled,
+            hedge_quantile=settings.llm_hedge_quantile,
+            hedge_min_delay=settings.llm_hedge_min_delay,
+        )
+        self._agents = {
+            endpoint.name: self._create_agent(endpoint)
+            for endpoint in self.endpoints.endpoints
+        }
+
+    def _create_agent(self, endpoint: LlmEndpoint) -> Any:
+        agent = Agently.create_agent()
+        agent.set_settings(
             "OpenAICompatible",
             {
-                "base_url": settings.llm_base_url,
-                "model": settings.llm_model,
-                "api_key": settings.llm_api_key,
+                "base_url": endpoint.base_url,
+                "model": endpoint.model,
+                "api_key": endpoint.api_key,
                 "model_type": settings.llm_model_type,
                 "request_options": {"temperature": 0},
             },
         )
-        self._agent = Agently.create_agent()
-        self._agent.set_agent_prompt(
+        agent.set_agent_prompt(
             "system",
             (
                 "你是 NexusTodo 对话式任务助手，使用 ReAct 工作流（思考->行动->观察）。\n"
@@ -195,8 +382,13 @@ class ReActPlanner:
                 "若用户选择候选序号（如 删除3/选择2），请输出 action_input.selection_index 为数字。\n"
             ),
         )
+        return agent
 
     async def plan(self, conversation: str, scratchpad: str) -> dict[str, Any]:
+        with tracing.span("planner.plan", cassette=self.cassette and self.cassette.mode):
+            return await self._plan(conversation, scratchpad)
+
+    async def _plan(self, conversation: str, scratchpad: str) -> dict[str, Any]:
         prompt = (
             "请返回 JSON：\n"
             "{\n"
@@ -219,9 +411,59 @@ class ReActPlanner:
             f"已有思考与观察：\n{scratchpad}\n"
         )
 
-        try:
+        if self.cassette is not None and self.cassette.replaying:
+            replayed = await self.cassette.replay(prompt, conversation, scratchpad)
+            return replayed if isinstance(replayed, dict) else _react_failure()
+
+        data: Any = None
+        priority = current_priority()
+        plan_started = time.monotonic()
+        retries = settings.llm_throttle_retries
+        for attempt in range(retries + 1):
+            try:
+                with tracing.span("planner.queue", priority=priority):
+                    await self.limiter.acquire(priority)
+            except LimiterRejected:
+                return _react_failure()
+
+            latency: Optional[float] = None
+            throttled = False
+            try:
+                # Inside the try: a cancel during the bucket wait must free the slot.
+                await self.rate_limiter.take()
+                started = time.monotonic()
+                with tracing.span("llm.request", attempt=attempt):
+                    data = await self._request(prompt)
+                latency = time.monotonic() - started
+            except Exception as exc:
+                throttled = is_rate_limited(exc)
+                data = None
+            finally:
+                self.limiter.release(latency, throttled=throttled)
+
+            if throttled and attempt < retries:
+                # Provider pushback: wait and queue again instead of failing the turn.
+                await asyncio.sleep(min(8.0, 0.5 * 2**attempt))
+                continue
+            break
+
+        self.limiter.observe_call(priority, time.monotonic() - plan_started)
+        if not isinstance(data, dict):
+            return _react_failure()
+        if self.cassette is not None and latency is not None:
+            await self.cassette.record(prompt, conversation, scratchpad, data, latency)
+        return data
+
+    async def _request(self, prompt: str) -> Any:
+        return await self.endpoints.call(
+            lambda endpoint: self._request_endpoint(endpoint, prompt)
+        )
+
+    async def _request_endpoint(self, endpoint: LlmEndpoint, prompt: str) -> Any:
+        agent = self._agents[endpoint.name]
+        with tracing.span("llm.get_response", endpoint=endpoint.name):
             response = await asyncio.to_thread(
-                lambda: self._agent.input(prompt)
+                lambda: agent.input(prompt)
                 .output(
                     {
                         "thought": (str, "reasoning"),
@@ -251,6 +493,8 @@ class ReActPlanner:
                 )
                 .get_response()
             )
+        # get_data waits for the model output and re-asks when keys are missing.
+        with tracing.span("llm.get_data", endpoint=endpoint.name):
             data = await asyncio.to_thread(
                 lambda: response.get_data(
                     ensure_keys=["thought", "action", "action_input", "final"],
@@ -259,52 +503,132 @@ class ReActPlanner:
                     raise_ensure_failure=False,
                 )
             )
-        except Exception:
-            return _react_failure()
-
         if not isinstance(data, dict):
-            return _react_failure()
+            # Count an unparseable answer against the endpoint so we fail over.
+            raise ValueError(f"{endpoint.name} returned no plan")
         return data
 
 
 class AgentCore:
     def __init__(
-        self, task_api: TaskApi, session_store: SessionStore, planner: ReActPlanner
+        self,
+        task_api: TaskApi,
+        session_store: SessionStore,
+        planner: ReActPlanner,
+        session_queue: Optional[SessionTurnQueue] = None,
+        replica: Optional[TaskReplica] = None,
     ) -> None:
         self.task_api = task_api
+        # Reads go through the local replica when configured; writes always hit the API.
+        self.reads = replica or task_api
         self.session_store = session_store
         self.planner = planner
+        self.session_queue = session_queue or SessionTurnQueue()
+        self._active_runs = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
 
     async def handle_chat(
         self,
         session_id: Optional[str],
         messages: list[ChatMessage],
         headers: dict[str, str],
+        priority: str = INTERACTIVE,
     ) -> dict[str, Any]:
-        return await self._run_react(session_id, messages, headers, emit=None)
+        return await self._submit_turn(
+            session_id, messages, headers, emit=None, priority=priority
+        )
 
     async def handle_chat_stream(
         self,
         session_id: Optional[str],
         messages: list[ChatMessage],
         headers: dict[str, str],
+        timings: bool = False,
+        on_turn: Optional[Callable[[asyncio.Task], None]] = None,
     ):
+        """Yield ``(event_type, payload)``; ``timings`` adds per-step span timings
+        to ``action`` and ``execution`` payloads.
+
+        ``on_turn`` receives the turn's task once it starts. Closing the stream
+        before its ``done``/``error`` event cancels the turn.
+        """
         queue: asyncio.Queue[tuple[str, dict[str, Any]]] = asyncio.Queue()
 
         async def emit(event_type: str, payload: dict[str, Any]) -> None:
             await queue.put((event_type, payload))
 
+        def finished(task: asyncio.Task) -> None:
+            # A turn that raises or is cancelled (e.g. its session drain was
+            # cancelled) never emits "done"; end the stream with an error.
+            if task.cancelled():
+                queue.put_nowait(("error", {"code": "CANCELLED", "message": "对话已取消"}))
+            elif task.exception() is not None:
+                queue.put_nowait(
+                    ("error", {"code": "INTERNAL_ERROR", "message": str(task.exception())})
+                )
+
         task = asyncio.create_task(
-            self._run_react(session_id, messages, headers, emit=emit)
+            self._submit_turn(session_id, messages, headers, emit=emit, timings=timings)
         )
+        task.add_done_callback(finished)
+        if on_turn is not None:
+            on_turn(task)
 
-        while True:
-            event_type, payload = await queue.get()
-            yield event_type, payload
-            if event_type in {"done", "error"}:
-                break
+        ended = False
+        try:
+            while not ended:
+                event_type, payload = await queue.get()
+                ended = event_type in {"done", "error"}
+                yield event_type, payload
+        finally:
+            if not ended:
+                # Nobody reads the rest (e.g. the client disconnected): stop the turn.
+                task.cancel()
+
+        # Failures were already reported as the "error" event above.
+        await asyncio.wait({task})
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for running turns; False if some are left."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
 
-        await task
+    async def _submit_turn(
+        self,
+        session_id: Optional[str],
+        messages: list[ChatMessage],
+        headers: dict[str, str],
+        emit: Optional[callable],
+        priority: str = INTERACTIVE,
+        timings: bool = False,
+    ) -> dict[str, Any]:
+        async def run(
+            turn_messages: list[ChatMessage],
+            turn_headers: dict[str, str],
+            turn_emit: Optional[callable],
+        ) -> dict[str, Any]:
+            # Turns may run on the session queue's task, so set priority here.
+            self._active_runs += 1
+            self._idle.clear()
+            try:
+                with use_priority(priority), tracing.span("react.run", priority=priority):
+                    return await self._run_react(
+                        session_id, turn_messages, turn_headers, emit=turn_emit, timings=timings
+                    )
+            finally:
+                self._active_runs -= 1
+                if not self._active_runs:
+                    self._idle.set()
+
+        # Covers the wait behind earlier turns of the same session as well.
+        with tracing.span("agent.turn", session_id=session_id):
+            return await self.session_queue.submit(
+                session_id, messages, headers, emit, run
+            )
 
     async def _build_conversation(self, session_id: str) -> str:
         messages = await self.session_store.get_messages(session_id)
@@ -316,14 +640,7 @@ class AgentCore:
                 f"system: 待处理意图: {pending_intent or '未知'}",
             ]
             for idx, task in enumerate(candidates[:8], start=1):
-                title = task.get("title") or "(无标题)"
-                status = task.get("status") or ""
-                tags = task.get("tags") or []
-                tag_text = f"标签：{', '.join(tags)}" if tags else "无标签"
-                task_id = task.get("taskId") or task.get("id") or ""
-                context_lines.append(
-                    f"system: {idx}. {title}（{status}，{tag_text}，id: {task_id}）"
-                )
+                context_lines.append(f"system: {idx}. {_candidate_text(task)}")
             lines = context_lines + lines
         else:
             recent_candidates = await self.session_store.get_recent(session_id)
@@ -332,14 +649,7 @@ class AgentCore:
                     "system: 最近一次任务列表（可按序号选择/筛选）：",
                 ]
                 for idx, task in enumerate(recent_candidates[:8], start=1):
-                    title = task.get("title") or "(无标题)"
-                    status = task.get("status") or ""
-                    tags = task.get("tags") or []
-                    tag_text = f"标签：{', '.join(tags)}" if tags else "无标签"
-                    task_id = task.get("taskId") or task.get("id") or ""
-                    context_lines.append(
-                        f"system: {idx}. {title}（{status}，{tag_text}，id: {task_id}）"
-                    )
+                    context_lines.append(f"system: {idx}. {_candidate_text(task)}")
                 lines = context_lines + lines
         return "\n".join(lines)
 
@@ -364,9 +674,7 @@ class AgentCore:
             index = int(raw_index)
             if index < 1 or index > len(candidates):
                 continue
-            task = candidates[index - 1]
-            task_id = task.get("taskId") or task.get("id")
-            task_id = normalize_task_id(task_id)
+            task_id = normalize_task_id(candidates[index - 1].task_id)
             if task_id and task_id not in task_ids:
                 task_ids.append(task_id)
         if not task_ids:
@@ -384,6 +692,7 @@ class AgentCore:
         messages: list[ChatMessage],
         headers: dict[str, str],
         emit: Optional[callable] = None,
+        timings: bool = False,
     ) -> dict[str, Any]:
         session = await self.session_store.get_or_create(session_id)
         if len(messages) > 1:
@@ -399,17 +708,19 @@ class AgentCore:
             "result": {"reason": "no_action"},
         }
         last_action: dict[str, Any] = {"intent": "clarify", "params": {}}
-        last_action_key = ""
-        last_result_key = ""
+        seen_steps: set[tuple[Any, ...]] = set()
 
         for step in range(1, settings.react_max_steps + 1):
-            plan = await self.planner.plan(conversation, scratchpad)
-            thought = _clean_text(plan.get("thought")) or ""
-            action = str(plan.get("action", "final")).strip().lower()
-            action_input = self._normalize_action_input(action, plan.get("action_input"))
-            action_input = await self._apply_pending_selection(
-                session.session_id, action_input
-            )
+            with tracing.collect_timings(timings) as plan_timing, tracing.span(
+                "react.plan", step=step
+            ):
+                plan = await self.planner.plan(conversation, scratchpad)
+                thought = _clean_text(plan.get("thought")) or ""
+                action = str(plan.get("action", "final")).strip().lower()
+                action_input = self._normalize_action_input(action, plan.get("action_input"))
+                action_input = await self._apply_pending_selection(
+                    session.session_id, action_input
+                )
 
             if thought:
                 trace_parts.append(f"思考({step}): {thought}")
@@ -461,12 +772,16 @@ class AgentCore:
                         "action": action,
                         "intent": ACTION_TO_INTENT.get(action, "clarify"),
                         "input": action_input,
+                        **({"timing": plan_timing} if plan_timing is not None else {}),
                     },
                 )
 
-            result = await self._execute_tool(
-                action, action_input, session.session_id, headers
-            )
+            with tracing.collect_timings(timings) as tool_timing, tracing.span(
+                "react.tool", step=step, action=action
+            ):
+                result = await self._execute_tool(
+                    action, action_input, session.session_id, headers, emit
+                )
             last_execution = result["execution"]
             last_action = result["action"]
             observation = result["observation"]
@@ -474,7 +789,12 @@ class AgentCore:
             trace_parts.append(f"观察({step}): {observation}")
 
             if emit:
-                await emit("execution", last_execution)
+                await emit(
+                    "execution",
+                    {**last_execution, "timing": tool_timing}
+                    if tool_timing is not None
+                    else last_execution,
+                )
                 await emit(
                     "delta",
                     {
@@ -492,14 +812,10 @@ class AgentCore:
                 if action in {"create_task", "update_task", "delete_task"}:
                     await self.session_store.clear_recent(session.session_id)
 
-            action_key = f"{action}:{safe_json(action_input)}"
-            result_key = safe_json(last_execution.get("result"))
-
-            if (
-                action_key == last_action_key
-                and result_key == last_result_key
-                and last_execution.get("status") == "success"
-            ):
+            # A successful step that repeats any earlier step (A→A or A→B→A) adds
+            # nothing new for the planner, so stop instead of cycling.
+            fingerprint = step_fingerprint(action, action_input, last_execution)
+            if last_execution.get("status") == "success" and fingerprint in seen_steps:
                 assistant_message = "\n".join(
                     trace_parts
                     + [
@@ -563,8 +879,7 @@ class AgentCore:
                 f"Observation: {safe_json(last_execution.get('result'))}\n\n"
             )
 
-            last_action_key = action_key
-            last_result_key = result_key
+            seen_steps.add(fingerprint)
 
         assistant_message = "\n".join(trace_parts + ["结论: 已达到最大步骤限制。"])
         await self.session_store.append_messages(
@@ -621,11 +936,12 @@ class AgentCore:
         entities: dict[str, Any],
         session_id: str,
         headers: dict[str, str],
+        emit: Optional[callable] = None,
     ) -> dict[str, Any]:
         intent = ACTION_TO_INTENT.get(action, "clarify")
         if action == "list_tasks":
             query_payload = entities.get("query", {})
-            result = await self._list_tasks(query_payload, headers)
+            result = await self._list_tasks(query_payload, headers, emit)
             return self._wrap_result(intent, entities, result)
         if action == "get_task":
             if not entities.get("taskId") and not (
@@ -750,50 +1066,104 @@ class AgentCore:
         }
 
     async def _list_tasks(
-        self, query: dict[str, Any], headers: dict[str, str]
+        self,
+        query: dict[str, Any],
+        headers: dict[str, str],
+        emit: Optional[callable] = None,
     ) -> dict[str, Any]:
-        tasks, error = await self._get_tasks_for_query(query, headers)
-        if error is not None:
-            return self._error_response(error)
+        filters = self._list_filters(query)
+        if filters is None:
+            return {
+                "assistantMessage": format_task_list([]),
+                "execution": {"status": "success", "result": []},
+            }
 
-        assistant_message = format_task_list(tasks)
+        # Pages are streamed as they arrive; only the first TASK_LIST_RESULT_LIMIT
+        # tasks stay in memory for the result and the session's recent list.
+        window: list[dict[str, Any]] = []
+        total = 0
+        cursor: Optional[str] = None
+        page = 0
+        while True:
+            result = await self.reads.list_tasks(
+                headers, **filters, limit=settings.task_list_page_size, cursor=cursor
+            )
+            if not result.ok:
+                return self._error_response(result)
+            tasks = result.data or []
+            page += 1
+            total += len(tasks)
+            room = settings.task_list_result_limit - len(window)
+            if room > 0:
+                window.extend(tasks[:room])
+            if emit:
+                # Ids only: keyed streams keep every event for the idempotency TTL.
+                await emit(
+                    "page",
+                    {
+                        "page": page,
+                        "count": len(tasks),
+                        "taskIds": _task_ids(tasks),
+                        "nextCursor": result.next_cursor,
+                    },
+                )
+            cursor = result.next_cursor
+            if not cursor:
+                break
+
+        execution: dict[str, Any] = {"status": "success", "result": window}
+        if total > len(window):
+            execution["total"] = total
         return {
-            "assistantMessage": assistant_message,
-            "execution": {"status": "success", "result": tasks},
+            "assistantMessage": format_task_list(window, total),
+            "execution": execution,
+        }
+
+    def _list_filters(self, query: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """``list_tasks`` filter arguments for a planner query; None matches nothing."""
+        statuses = list(dict.fromkeys(query.get("status_list") or []))
+        q = None
+        keyword = query.get("keyword")
+        if keyword:
+            q = search_keyword(keyword)
+            if q is None:
+                return None
+        return {
+            "status": None if statuses else query.get("status"),
+            "tags": query.get("tags"),
+            "statuses": statuses or None,
+            "q": q,
         }
 
     async def _get_tasks_for_query(
-        self, query: dict[str, Any], headers: dict[str, str]
+        self,
+        query: dict[str, Any],
+        headers: dict[str, str],
+        fields: Optional[list[str]] = None,
     ) -> tuple[list[dict[str, Any]], Optional[ApiResult]]:
-        statuses = query.get("status_list") or []
-        status = query.get("status")
-        tags = query.get("tags")
-
-        collected: list[dict[str, Any]] = []
-        if statuses:
-            seen_ids = set()
-            for item in statuses:
-                result = await self.task_api.list_tasks(headers, status=item, tags=tags)
-                if not result.ok:
-                    return [], result
-                for task in result.data or []:
-                    task_id = task.get("taskId") or task.get("id")
-                    if task_id and task_id in seen_ids:
-                        continue
-                    if task_id:
-                        seen_ids.add(task_id)
-                    collected.append(task)
-        else:
-            result = await self.task_api.list_tasks(headers, status=status, tags=tags)
+        filters = self._list_filters(query)
+        if filters is None:
+            return [], None
+        # Status lists, keywords and projection are applied by the task service,
+        # so only matching rows and the requested columns come back.
+        return await self._collect_tasks(headers, **filters, fields=fields)
+
+    async def _collect_tasks(
+        self, headers: dict[str, str], **filters: Any
+    ) -> tuple[list[dict[str, Any]], Optional[ApiResult]]:
+        """Every matching task, following ``nextCursor`` across pages."""
+        tasks: list[dict[str, Any]] = []
+        cursor: Optional[str] = None
+        while True:
+            result = await self.reads.list_tasks(
+                headers, **filters, limit=settings.task_list_page_size, cursor=cursor
+            )
             if not result.ok:
                 return [], result
-            collected = list(result.data or [])
-
-        keyword = query.get("keyword")
-        if keyword:
-            collected = filter_tasks(collected, keyword)
-
-        return collected, None
+            tasks.extend(result.data or [])
+            cursor = result.next_cursor
+            if not cursor:
+                return tasks, None
 
     async def _detail_task(
         self, session_id: str, entities: dict[str, Any], headers: dict[str, str]
@@ -827,7 +1197,7 @@ class AgentCore:
                 },
             }
 
-        result = await self.task_api.get_task(task_id, headers)
+        result = await self.reads.get_task(task_id, headers)
         if not result.ok:
             return self._error_response(result)
 
@@ -843,25 +1213,9 @@ class AgentCore:
     ) -> dict[str, Any]:
         task_ids = entities.get("taskIds") or []
         if task_ids:
-            results: list[dict[str, Any]] = []
-            failed: list[dict[str, Any]] = []
-            for task_id in task_ids:
-                update_result = await self.task_api.update_task(
-                    task_id,
-                    headers,
-                    title=entities.get("title"),
-                    description=entities.get("description"),
-                    status=entities.get("status"),
-                    tags=entities.get("tags"),
-                )
-                if update_result.ok:
-                    results.append(update_result.data or {"taskId": task_id})
-                else:
-                    failed.append({"taskId": task_id, "error": update_result.error})
-
-            assistant_message = f"已更新 {len(results)} 个任务。"
-            if failed:
-                assistant_message += f" 另有 {len(failed)} 个任务更新失败。"
+            results, failed = await self._apply_updates(task_ids, entities, headers)
+
+            assistant_message = _batch_message("更新", results, failed)
             return {
                 "assistantMessage": assistant_message,
                 "execution": {
@@ -880,7 +1234,9 @@ class AgentCore:
         )
 
         if bulk or has_query:
-            tasks, error = await self._get_tasks_for_query(query, headers)
+            tasks, error = await self._get_tasks_for_query(
+                query, headers, fields=CANDIDATE_FIELDS
+            )
             if error is not None:
                 return self._error_response(error)
 
@@ -894,28 +1250,11 @@ class AgentCore:
                 await self.session_store.set_pending(session_id, "update", tasks)
                 return self._clarify_candidates(tasks)
 
-            results: list[dict[str, Any]] = []
-            failed: list[dict[str, Any]] = []
-            for task in tasks:
-                task_id = task.get("taskId") or task.get("id")
-                if not task_id:
-                    continue
-                update_result = await self.task_api.update_task(
-                    task_id,
-                    headers,
-                    title=entities.get("title"),
-                    description=entities.get("description"),
-                    status=entities.get("status"),
-                    tags=entities.get("tags"),
-                )
-                if update_result.ok:
-                    results.append(update_result.data or {"taskId": task_id})
-                else:
-                    failed.append({"taskId": task_id, "error": update_result.error})
-
-            assistant_message = f"已更新 {len(results)} 个任务。"
-            if failed:
-                assistant_message += f" 另有 {len(failed)} 个任务更新失败。"
+            results, failed = await self._apply_updates(
+                _task_ids(tasks), entities, headers
+            )
+
+            assistant_message = _batch_message("更新", results, failed)
             return {
                 "assistantMessage": assistant_message,
                 "execution": {
@@ -962,18 +1301,9 @@ class AgentCore:
     ) -> dict[str, Any]:
         task_ids = entities.get("taskIds") or []
         if task_ids:
-            deleted: list[dict[str, Any]] = []
-            failed: list[dict[str, Any]] = []
-            for task_id in task_ids:
-                delete_result = await self.task_api.delete_task(task_id, headers)
-                if delete_result.ok:
-                    deleted.append({"taskId": task_id})
-                else:
-                    failed.append({"taskId": task_id, "error": delete_result.error})
-
-            assistant_message = f"已删除 {len(deleted)} 个任务。"
-            if failed:
-                assistant_message += f" 另有 {len(failed)} 个任务删除失败。"
+            deleted, failed = await self._apply_deletes(task_ids, headers)
+
+            assistant_message = _batch_message("删除", deleted, failed)
             return {
                 "assistantMessage": assistant_message,
                 "execution": {
@@ -995,7 +1325,9 @@ class AgentCore:
             bulk = True
 
         if bulk or has_query:
-            tasks, error = await self._get_tasks_for_query(query, headers)
+            tasks, error = await self._get_tasks_for_query(
+                query, headers, fields=CANDIDATE_FIELDS
+            )
             if error is not None:
                 return self._error_response(error)
 
@@ -1005,21 +1337,9 @@ class AgentCore:
                     "execution": {"status": "success", "result": []},
                 }
 
-            deleted: list[dict[str, Any]] = []
-            failed: list[dict[str, Any]] = []
-            for task in tasks:
-                task_id = task.get("taskId") or task.get("id")
-                if not task_id:
-                    continue
-                delete_result = await self.task_api.delete_task(task_id, headers)
-                if delete_result.ok:
-                    deleted.append({"taskId": task_id})
-                else:
-                    failed.append({"taskId": task_id, "error": delete_result.error})
-
-            assistant_message = f"已删除 {len(deleted)} 个任务。"
-            if failed:
-                assistant_message += f" 另有 {len(failed)} 个任务删除失败。"
+            deleted, failed = await self._apply_deletes(_task_ids(tasks), headers)
+
+            assistant_message = _batch_message("删除", deleted, failed)
             return {
                 "assistantMessage": assistant_message,
                 "execution": {
@@ -1056,6 +1376,47 @@ class AgentCore:
             },
         }
 
+    async def _apply_updates(
+        self, task_ids: list[str], entities: dict[str, Any], headers: dict[str, str]
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        fields = {
+            "title": entities.get("title"),
+            "description": entities.get("description"),
+            "status": entities.get("status"),
+            "tags": entities.get("tags"),
+        }
+        if not task_ids:
+            return [], []
+        if len(task_ids) == 1:
+            result = await self.task_api.update_task(task_ids[0], headers, **fields)
+            if result.ok:
+                return [result.data or {"taskId": task_ids[0]}], []
+            return [], [{"taskId": task_ids[0], "error": result.error}]
+
+        # One round trip (and one backend transaction) instead of one per task.
+        result = await self.task_api.update_tasks(task_ids, headers, **fields)
+        if not result.ok:
+            return [], [{"taskId": task_id, "error": result.error} for task_id in task_ids]
+        data = result.data or {}
+        return data.get("updated") or [], data.get("failed") or []
+
+    async def _apply_deletes(
+        self, task_ids: list[str], headers: dict[str, str]
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        if not task_ids:
+            return [], []
+        if len(task_ids) == 1:
+            result = await self.task_api.delete_task(task_ids[0], headers)
+            if result.ok:
+                return [{"taskId": task_ids[0]}], []
+            return [], [{"taskId": task_ids[0], "error": result.error}]
+
+        result = await self.task_api.delete_tasks(task_ids, headers)
+        if not result.ok:
+            return [], [{"taskId": task_id, "error": result.error} for task_id in task_ids]
+        data = result.data or {}
+        return data.get("deleted") or [], data.get("failed") or []
+
     async def _resolve_task(
         self, entities: dict[str, Any], headers: dict[str, str]
     ) -> tuple[Optional[str], Optional[list[dict[str, Any]]], Optional[ApiResult]]:
@@ -1067,12 +1428,12 @@ class AgentCore:
         if not keyword:
             return None, None, None
 
-        list_result = await self.task_api.list_tasks(headers)
-        if not list_result.ok:
-            return None, None, list_result
-
-        tasks = list_result.data or []
-        filtered = filter_tasks(tasks, keyword)
+        q = search_keyword(keyword)
+        if q is None:
+            return None, None, None
+        filtered, error = await self._collect_tasks(headers, q=q, fields=CANDIDATE_FIELDS)
+        if error is not None:
+            return None, None, error
 
         if len(filtered) == 1:
             return filtered[0].get("taskId"), None, None
@@ -1106,6 +1467,27 @@ class AgentCore:
         }
 
 
+def _candidate_text(task: TaskRef) -> str:
+    tag_text = f"标签：{', '.join(task.tags)}" if task.tags else "无标签"
+    return f"{task.title or '(无标题)'}（{task.status}，{tag_text}，id: {task.task_id}）"
+
+
+def _batch_message(verb: str, done: list[Any], failed: list[Any]) -> str:
+    if failed and not done:
+        # Batches are all-or-nothing: one bad task leaves the others untouched.
+        return f"有 {len(failed)} 个任务无法{verb}，本次未{verb}任何任务。"
+    message = f"已{verb} {len(done)} 个任务。"
+    if failed:
+        message += f" 另有 {len(failed)} 个任务{verb}失败。"
+    return message
+
+
+def _task_ids(tasks: list[dict[str, Any]]) -> list[str]:
+    return [
+        task_id for task_id in (task.get("taskId") or task.get("id") for task in tasks) if task_id
+    ]
+
+
 def _clean_text(value: Any) -> Optional[str]:
     if value is None:
         return None
@@ -1214,32 +1596,29 @@ def normalize_status(value: Any) -> Optional[str]:
     return None
 
 
-def filter_tasks(tasks: list[dict[str, Any]], keyword: str) -> list[dict[str, Any]]:
-    def _variants(text: str) -> list[str]:
-        base = text.strip()
-        if not base:
-            return []
-        variants = {base}
-        for suffix in ("任务", "事项", "事情"):
-            if base.endswith(suffix) and len(base) > len(suffix):
-                variants.add(base[: -len(suffix)].strip())
-        if len(base) >= 2 and base[0] == base[-1] and base[0] in "\"'“”":
-            variants.add(base[1:-1].strip())
-        return [item for item in variants if item]
-
-    keywords = [item.lower() for item in _variants(keyword)]
-    filtered: list[dict[str, Any]] = []
-    for task in tasks:
-        title = str(task.get("title", "")).lower()
-        description = str(task.get("description", "")).lower()
-        if any(key in title or key in description for key in keywords):
-            filtered.append(task)
-    return filtered
-
-
-def format_task_list(tasks: list[dict[str, Any]]) -> str:
+def search_keyword(keyword: str) -> Optional[str]:
+    """Reduce a user keyword to the substring sent as the task service ``q``.
+
+    Drops a trailing "任务/事项/事情" and surrounding quotes. Every variant
+    contains the shortest one, so matching it matches any of them.
+    """
+    base = keyword.strip()
+    if not base:
+        return None
+    variants = {base}
+    for suffix in ("任务", "事项", "事情"):
+        if base.endswith(suffix) and len(base) > len(suffix):
+            variants.add(base[: -len(suffix)].strip())
+    if len(base) >= 2 and base[0] == base[-1] and base[0] in "\"'“”":
+        variants.add(base[1:-1].strip())
+    variants.discard("")
+    return min(variants, key=len) if variants else None
+
+
+def format_task_list(tasks: list[dict[str, Any]], total: Optional[int] = None) -> str:
     if not tasks:
         return "没有找到符合条件的任务。"
+    total = max(total or 0, len(tasks))
     lines = []
     for idx, task in enumerate(tasks[:8], start=1):
         title = task.get("title") or "(无标题)"
@@ -1247,7 +1626,7 @@ def format_task_list(tasks: list[dict[str, Any]]) -> str:
         tags = task.get("tags") or []
         tag_text = f"，标签：{', '.join(tags)}" if tags else ""
         lines.append(f"{idx}. {title}（{status}{tag_text}）")
-    suffix = "" if len(tasks) <= 8 else f"\n...共 {len(tasks)} 条任务"
+    suffix = "" if total <= 8 else f"\n...共 {total} 条任务"
     return "找到以下任务：\n" + "\n".join(lines) + suffix
 
 
@@ -1270,8 +1649,9 @@ def summarize_execution(execution: dict[str, Any]) -> str:
     if status == "success" and isinstance(result, list):
         if not result:
             return "没有找到符合条件的任务。"
+        total = execution.get("total") or len(result)
         titles = [task.get("title") or "(无标题)" for task in result[:5]]
-        suffix = "" if len(result) <= 5 else f" 等共 {len(result)} 条"
+        suffix = "" if total <= 5 else f" 等共 {total} 条"
         return f"找到任务：{', '.join(titles)}{suffix}"
     if status == "success" and isinstance(result, dict):
         if "updated" in result:
@@ -1288,7 +1668,48 @@ def summarize_execution(execution: dict[str, Any]) -> str:
     return "执行完成。"
 
 
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _result_signature(result: Any) -> Any:
+    """Task results reduce to ids (+ updatedAt); anything else is hashed as is."""
+    if isinstance(result, dict) and (result.get("taskId") or result.get("id")):
+        return (result.get("taskId") or result.get("id"), result.get("updatedAt"))
+    if isinstance(result, list):
+        signature = []
+        for task in result:
+            task_id = (task.get("taskId") or task.get("id")) if isinstance(task, dict) else None
+            if not task_id:
+                return _freeze(result)
+            signature.append(task_id)
+            signature.append(task.get("updatedAt"))
+        return tuple(signature)
+    return _freeze(result)
+
+
+def step_fingerprint(
+    action: str, action_input: dict[str, Any], execution: dict[str, Any]
+) -> tuple[Any, ...]:
+    # The frozen tuple itself, not its hash: a hash collision would end the run.
+    return (
+        action,
+        _freeze(action_input),
+        execution.get("status"),
+        execution.get("total"),
+        _result_signature(execution.get("result")),
+    )
+
+
 def safe_json(value: Any) -> str:
+    # Prompt text: always the standard library, so JSON_CODEC never changes
+    # what the model (or a recorded cassette) sees.
     try:
         return json.dumps(value, ensure_ascii=False)
     except TypeError:
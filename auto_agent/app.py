@@ -1,34 +1,144 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import time
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Any, Callable, Optional
 
 import httpx
-from fastapi import FastAPI, Header, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from . import jsoncodec
+from .admission import AdmissionController, AdmissionRejected
 from .agent_core import AgentCore, ReActPlanner, SessionStore
 from .config import settings
+from .http_pool import InstrumentedTransport, build_client, split_unix_url, warm_up
+from .idempotency import IdempotencyConflict, IdempotencyStore, request_fingerprint
+from .llm_limiter import INTERACTIVE, PRIORITIES
 from .models import ChatMessage, ChatRequest, ChatResponse
+from .resilience import CircuitBreaker, RetryBudget
+from .session_queue import SessionTurnQueue
+from .sqlite_task_api import SqliteTaskApi
 from .task_api import TaskApi
+from .task_replica import TaskReplica
+
+
+def _build_http_task_api() -> tuple[TaskApi, httpx.AsyncClient, InstrumentedTransport]:
+    base_url, uds = split_unix_url(settings.task_api_base_url)
+    client, pool = build_client(
+        settings.request_timeout,
+        max_connections=settings.task_api_max_connections,
+        max_keepalive=settings.task_api_max_keepalive,
+        keepalive_expiry=settings.task_api_keepalive_expiry,
+        http2=settings.task_api_http2,
+        uds=uds,
+    )
+    task_api = TaskApi(
+        base_url,
+        client,
+        breaker=CircuitBreaker(
+            failure_threshold=settings.task_api_breaker_failures,
+            reset_timeout=settings.task_api_breaker_reset,
+        ),
+        retry_budget=RetryBudget(ratio=settings.task_api_retry_ratio),
+        timeouts={
+            "list": settings.task_api_list_timeout,
+            "get": settings.task_api_get_timeout,
+            "write": settings.task_api_write_timeout,
+        },
+        connect_timeout=settings.task_api_connect_timeout,
+        max_retries=settings.task_api_max_retries,
+        cache_entries=settings.task_api_cache_entries,
+    )
+    return task_api, client, pool
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    client = httpx.AsyncClient(timeout=settings.request_timeout)
-    task_api = TaskApi(settings.task_api_base_url, client)
+    client: Optional[httpx.AsyncClient] = None
+    pool: Optional[InstrumentedTransport] = None
+    replica: Optional[TaskReplica] = None
+    if settings.task_store == "sqlite":
+        # Standalone mode: tasks live in-process, no backend hop to cache or replicate.
+        task_api = SqliteTaskApi(
+            settings.task_store_path, auth_token=settings.task_store_auth_token or None
+        )
+    else:
+        task_api, client, pool = _build_http_task_api()
+        if settings.task_replica_enabled:
+            replica = TaskReplica(task_api, max_users=settings.task_replica_max_users)
+    app.state.http_pool = pool
     session_store = SessionStore(settings.max_session_messages)
+    if settings.session_snapshot_path:
+        # Pick up sessions (and their pending candidates) from the previous process.
+        session_store.load_snapshot(settings.session_snapshot_path)
     planner = ReActPlanner()
-    app.state.agent_core = AgentCore(task_api, session_store, planner)
+    session_queue = SessionTurnQueue(merge=settings.session_merge_queued)
+    agent_core = AgentCore(task_api, session_store, planner, session_queue, replica=replica)
+    app.state.agent_core = agent_core
+    app.state.idempotency = IdempotencyStore(
+        settings.idempotency_max_entries, settings.idempotency_ttl
+    )
+    app.state.admission = AdmissionController(
+        max_concurrent=settings.max_concurrent_runs,
+        max_queue=settings.max_queued_runs,
+        queue_timeout=settings.queue_timeout,
+        per_user_limit=settings.max_runs_per_user,
+    )
+    if client is not None:
+        await warm_up(
+            client,
+            f"{task_api.base_url}/tasks",
+            min(settings.task_api_warmup_connections, settings.task_api_max_keepalive),
+            settings.task_api_connect_timeout,
+        )
     try:
         yield
     finally:
-        await client.aclose()
+        try:
+            await agent_core.drain(settings.shutdown_drain_timeout)
+            if settings.session_snapshot_path:
+                session_store.dump_snapshot(settings.session_snapshot_path)
+        finally:
+            if client is not None:
+                await client.aclose()
+            else:
+                task_api.close()
+
+
+class CodecJSONResponse(JSONResponse):
+    """Renders response bodies with the configured JSON codec."""
+
+    def render(self, content: Any) -> bytes:
+        return jsoncodec.dumps_bytes(content)
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """Gives the admission slot back however the response ends.
+
+    The body generator's ``finally`` never runs when the client disconnects
+    before the body starts, and Starlette skips background tasks on a
+    disconnect, so the release is tied to the response call itself. The body
+    is closed first: a disconnect can leave it suspended mid-stream, and
+    closing it is what stops the turn behind it.
+    """
+
+    def __init__(self, content: Any, release: Callable[[], None], **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                await self.body_iterator.aclose()
+            finally:
+                self._release()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=CodecJSONResponse)
 
 
 def _resolve_identity(
@@ -63,22 +173,130 @@ def _auth_headers(
     }
 
 
+async def _admit(user_id: str) -> float:
+    admission: AdmissionController = app.state.admission
+    try:
+        await admission.acquire(user_id)
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=exc.status_code,
+            detail=exc.message,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    return time.monotonic()
+
+
+def _release(user_id: str, admitted_at: float) -> None:
+    admission: AdmissionController = app.state.admission
+    admission.release(user_id, time.monotonic() - admitted_at)
+
+
+def _release_once(user_id: str, admitted_at: float) -> Callable[[], None]:
+    released = False
+
+    def release() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            _release(user_id, admitted_at)
+
+    return release
+
+
+def _no_release() -> None:
+    """Release callback of a request that never took an admission slot."""
+
+
+def _idempotency_conflict() -> HTTPException:
+    return HTTPException(status_code=422, detail="Idempotency-Key 已用于不同的请求")
+
+
 @app.post("/agent/chat", response_model=ChatResponse)
 async def chat(
     req: ChatRequest,
     authorization: Optional[str] = Header(default=None),
     x_user_id: Optional[str] = Header(default=None, alias="X-User-ID"),
     x_device_id: Optional[str] = Header(default=None, alias="X-Device-ID"),
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+    priority: str = Header(default=INTERACTIVE, alias="X-Agent-Priority"),
 ):
     if not req.messages:
         raise HTTPException(status_code=400, detail="messages 不能为空")
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail="X-Agent-Priority 仅支持 interactive/background")
 
     user_id, device_id = _resolve_identity(req.userId, req.deviceId, x_user_id, x_device_id)
     headers = _auth_headers(authorization, user_id, device_id)
 
     agent_core: AgentCore = app.state.agent_core
-    result = await agent_core.handle_chat(req.sessionId, req.messages, headers)
-    return result
+    key = ("chat", user_id, idempotency_key) if idempotency_key else None
+    fingerprint = (
+        request_fingerprint(
+            {
+                "sessionId": req.sessionId,
+                "messages": [msg.model_dump() for msg in req.messages],
+            }
+        )
+        if key
+        else None
+    )
+    if key and app.state.idempotency.completed(key, fingerprint):
+        # Replaying a finished run does no work, so it needs no admission.
+        result, replayed = await _chat(agent_core, req, headers, key, fingerprint, priority)
+        return _chat_response(result, replayed)
+
+    admitted_at = await _admit(user_id)
+    try:
+        result, replayed = await _chat(agent_core, req, headers, key, fingerprint, priority)
+    finally:
+        _release(user_id, admitted_at)
+    return _chat_response(result, replayed)
+
+
+def _chat_response(result: dict[str, Any], replayed: bool = False) -> Response:
+    """Encode the agent result straight to bytes.
+
+    Returning a Response skips FastAPI's ``response_model`` pass, which would
+    validate and re-serialise ``execution.result`` (possibly thousands of
+    tasks) on every call. Only the small envelope is validated here.
+    """
+    execution = result["execution"]
+    ChatResponse.model_validate(
+        {**result, "execution": {"status": execution["status"], "result": None}}
+    )
+    return Response(
+        content=jsoncodec.dumps_bytes(result, default=str),
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"} if replayed else None,
+    )
+
+
+async def _chat(
+    agent_core: AgentCore,
+    req: ChatRequest,
+    headers: dict[str, str],
+    key: Optional[tuple[str, str, str]],
+    fingerprint: Optional[str],
+    priority: str,
+) -> tuple[dict[str, Any], bool]:
+    if not key:
+        result = await agent_core.handle_chat(
+            req.sessionId, req.messages, headers, priority=priority
+        )
+        return result, False
+
+    idempotency: IdempotencyStore = app.state.idempotency
+    try:
+        result, replayed = await idempotency.run(
+            key,
+            fingerprint,
+            lambda: agent_core.handle_chat(
+                req.sessionId, req.messages, headers, priority=priority
+            ),
+        )
+    except IdempotencyConflict:
+        raise _idempotency_conflict()
+    return result, replayed
 
 
 @app.get("/agent/chat/stream")
@@ -87,25 +305,74 @@ async def chat_stream(
     sessionId: Optional[str] = Query(default=None),
     userId: Optional[str] = Query(default=None),
     deviceId: Optional[str] = Query(default=None),
+    timings: bool = Query(default=False),
     authorization: Optional[str] = Header(default=None),
     x_user_id: Optional[str] = Header(default=None, alias="X-User-ID"),
     x_device_id: Optional[str] = Header(default=None, alias="X-Device-ID"),
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
 ):
     user_id, device_id = _resolve_identity(userId, deviceId, x_user_id, x_device_id)
     headers = _auth_headers(authorization, user_id, device_id)
     agent_core: AgentCore = app.state.agent_core
+    messages = [ChatMessage(role="user", content=message)]
+
+    key = ("stream", user_id, idempotency_key) if idempotency_key else None
+    fingerprint = (
+        request_fingerprint(
+            {"sessionId": sessionId, "message": message, **({"timings": True} if timings else {})}
+        )
+        if key
+        else None
+    )
+
+    # Admission is held until the turn behind the stream ends, which may be
+    # after the response: a keyed run keeps going when the client leaves.
+    if key and app.state.idempotency.completed(key, fingerprint):
+        # Replaying a finished run does no work, so it needs no admission.
+        release: Callable[[], None] = _no_release
+    else:
+        release = _release_once(user_id, await _admit(user_id))
+    turns: list[asyncio.Task] = []
+
+    def hold_until_done(task: asyncio.Task) -> None:
+        turns.append(task)
+        task.add_done_callback(lambda _task: release())
+
+    def release_with_response() -> None:
+        # Replays and streams whose turn never started hold no run.
+        if not turns:
+            release()
+
+    response_headers: dict[str, str] = {}
+    if key:
+        idempotency: IdempotencyStore = app.state.idempotency
+        try:
+            events, replayed = idempotency.stream(
+                key,
+                fingerprint,
+                lambda: agent_core.handle_chat_stream(
+                    sessionId, messages, headers, timings, on_turn=hold_until_done
+                ),
+            )
+        except IdempotencyConflict:
+            release()
+            raise _idempotency_conflict()
+        if replayed:
+            response_headers["Idempotent-Replayed"] = "true"
+    else:
+        events = agent_core.handle_chat_stream(
+            sessionId, messages, headers, timings, on_turn=hold_until_done
+        )
 
     async def event_generator():
         try:
-            async for event_type, payload in agent_core.handle_chat_stream(
-                sessionId,
-                [ChatMessage(role="user", content=message)],
-                headers,
-            ):
+            async for event_type, payload in events:
                 if event_type == "delta":
                     yield _sse_event("delta", payload)
                 elif event_type == "action":
                     yield _sse_event("action", payload)
+                elif event_type == "page":
+                    yield _sse_event("page", payload)
                 elif event_type == "execution":
                     yield _sse_event("execution", payload)
                 elif event_type == "done":
@@ -114,8 +381,37 @@ async def chat_stream(
                     yield _sse_event("error", payload)
         except Exception as exc:
             yield _sse_event("error", {"code": "INTERNAL_ERROR", "message": str(exc)})
+        finally:
+            await events.aclose()
 
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+    return AdmittedStreamingResponse(
+        event_generator(),
+        release_with_response,
+        media_type="text/event-stream",
+        headers=response_headers,
+    )
+
+
+@app.get("/agent/metrics")
+async def metrics():
+    agent_core: AgentCore = app.state.agent_core
+    idempotency: IdempotencyStore = app.state.idempotency
+    admission: AdmissionController = app.state.admission
+    return {
+        "admission": admission.stats(),
+        "llm": agent_core.planner.limiter.stats(),
+        "llmEndpoints": agent_core.planner.endpoints.stats(),
+        "plannerCassette": (
+            agent_core.planner.cassette.stats() if agent_core.planner.cassette else None
+        ),
+        "taskApi": agent_core.task_api.stats(),
+        "httpPool": app.state.http_pool.stats() if app.state.http_pool else None,
+        "taskReplica": (
+            agent_core.reads.stats() if agent_core.reads is not agent_core.task_api else None
+        ),
+        "sessionQueue": agent_core.session_queue.stats(),
+        "idempotency": idempotency.stats(),
+    }
 
 
 def _chunk_text(text: str, size: int) -> list[str]:
@@ -125,7 +421,7 @@ def _chunk_text(text: str, size: int) -> list[str]:
 
 
 def _sse_event(event_type: str, data: dict) -> str:
-    payload = json.dumps(data, ensure_ascii=False)
+    payload = jsoncodec.dumps(data)
     return f"event: {event_type}\ndata: {payload}\n\n"
 
 
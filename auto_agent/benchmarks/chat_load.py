@@ -0,0 +1,321 @@
+"""Concurrent load on /agent/chat and /agent/chat/stream with a mixed scenario set.
+
+Run: python -m auto_agent.benchmarks.chat_load [--concurrency 1 8 32] [--requests 200]
+     [--stream-ratio 0.5] [--llm-latency-ms 0] [--output report.json] [--baseline old.json]
+
+By default the agent, ``auto_agent.fakes.llm`` and ``auto_agent.fakes.task_api``
+are started as local uvicorn processes, so runs are offline and repeatable;
+``--agent-url`` (plus ``--llm-url``/``--task-api-url`` for call counts) targets
+running services instead. Each virtual user registers its own device, seeds
+tasks, then cycles through the chat scenarios of ``test_agent_scenarios.py``
+(list, unfinished, create with tag, detail, rename, add tag, bulk status
+update, bulk delete). Per concurrency level the report has throughput,
+p50/p95/p99 latency, time to first SSE event, and LLM / Task API calls per
+request read from the fakes' ``/stats``; with ``--baseline`` each level also
+carries its ratio to the matching level of an earlier report.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import httpx
+
+TOKEN = "default-token"
+SEED_TASKS = 6
+
+# (name, message template); {kw} is the user's keyword, {n} the request number.
+SCENARIOS = [
+    ("list", "请列出包含{kw}的待办任务"),
+    ("unfinished", "列出包含{kw}的未完成任务"),
+    ("create", "请帮我创建一个任务：{kw}-新建{n}，标签为load"),
+    ("detail", "查看{kw}-A任务详情"),
+    ("rename", "把{kw}-B任务改名为{kw}-B{n}"),
+    ("tag", "给{kw}-C任务加上标签t{n}"),
+    ("update", "把包含{kw}-新建的任务都标记为已完成"),
+    ("delete", "删除所有包含{kw}-新建的任务"),
+]
+
+
+@dataclass
+class Sample:
+    scenario: str
+    stream: bool
+    ok: bool
+    latency: float
+    first_event: Optional[float] = None
+
+
+@dataclass
+class User:
+    headers: dict[str, str]
+    keyword: str
+    sent: int = 0
+    samples: list[Sample] = field(default_factory=list)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(target: str, env: dict[str, str], ready_path: str) -> tuple[str, subprocess.Popen]:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    cmd = [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "warning"]
+    if ":create_app" in target:
+        cmd.append("--factory")
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL)
+    deadline = time.time() + 15
+    while time.time() < deadline and proc.poll() is None:
+        try:
+            httpx.get(f"{base_url}{ready_path}", timeout=1)
+            return base_url, proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"Failed to start {target}")
+
+
+def _percentiles(values: list[float]) -> Optional[dict[str, float]]:
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1e3, 2)
+
+    return {
+        "p50": rank(0.50),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "mean": round(sum(ordered) / len(ordered) * 1e3, 2),
+    }
+
+
+async def _stats(client: httpx.AsyncClient, url: Optional[str]) -> Optional[dict[str, Any]]:
+    if not url:
+        return None
+    try:
+        return (await client.get(f"{url.rstrip('/')}/stats")).json()
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+async def _new_user(client: httpx.AsyncClient, task_api: str, index: int) -> User:
+    device_id = str(uuid.uuid4())
+    resp = await client.post(f"{task_api}/device/register", json={"deviceId": device_id})
+    headers = {
+        "Authorization": f"Bearer {TOKEN}",
+        "X-User-ID": resp.json()["userId"],
+        "X-Device-ID": device_id,
+    }
+    user = User(headers, f"压测{index}-{uuid.uuid4().hex[:6]}")
+    for suffix in "ABCDEF"[:SEED_TASKS]:
+        await client.post(
+            f"{task_api}/tasks", json={"title": f"{user.keyword}-{suffix}"}, headers=headers
+        )
+    return user
+
+
+async def _chat(client: httpx.AsyncClient, agent: str, user: User, stream: bool) -> None:
+    name, template = SCENARIOS[user.sent % len(SCENARIOS)]
+    message = template.format(kw=user.keyword, n=user.sent)
+    user.sent += 1
+    started = time.perf_counter()
+    first_event = None
+    try:
+        if stream:
+            async with client.stream(
+                "GET", f"{agent}/agent/chat/stream", params={"message": message},
+                headers=user.headers,
+            ) as resp:
+                ok = resp.status_code == 200
+                async for line in resp.aiter_lines():
+                    if first_event is None and line.startswith("event:"):
+                        first_event = time.perf_counter() - started
+                    if line == "event: error":
+                        ok = False
+        else:
+            resp = await client.post(
+                f"{agent}/agent/chat",
+                json={"messages": [{"role": "user", "content": message}]},
+                headers=user.headers,
+            )
+            ok = resp.status_code == 200
+    except httpx.HTTPError:
+        ok = False
+    user.samples.append(Sample(name, stream, ok, time.perf_counter() - started, first_event))
+
+
+async def _run_level(
+    client: httpx.AsyncClient,
+    urls: dict[str, Optional[str]],
+    concurrency: int,
+    requests: int,
+    stream_ratio: float,
+) -> dict[str, Any]:
+    users = [await _new_user(client, urls["taskApi"], i) for i in range(concurrency)]
+    llm_before = await _stats(client, urls["llm"])
+    task_api_before = await _stats(client, urls["taskApiStats"])
+    issued = 0
+
+    async def worker(user: User) -> None:
+        nonlocal issued
+        while issued < requests:
+            issued += 1
+            # Spread streamed requests evenly instead of front-loading them.
+            stream = int(issued * stream_ratio) != int((issued - 1) * stream_ratio)
+            await _chat(client, urls["agent"], user, stream)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(user) for user in users))
+    elapsed = time.perf_counter() - started
+
+    llm_after = await _stats(client, urls["llm"])
+    task_api_after = await _stats(client, urls["taskApiStats"])
+    samples = [sample for user in users for sample in user.samples]
+    done = len(samples)
+
+    def per_request(before, after, key: str) -> Optional[float]:
+        if not before or not after or not done:
+            return None
+        return round((after[key] - before[key]) / done, 2)
+
+    by_scenario = {}
+    for name, _ in SCENARIOS:
+        latencies = [s.latency for s in samples if s.scenario == name]
+        if latencies:
+            by_scenario[name] = {"requests": len(latencies), **_percentiles(latencies)}
+    return {
+        "concurrency": concurrency,
+        "requests": done,
+        "errors": sum(1 for s in samples if not s.ok),
+        "streamed": sum(1 for s in samples if s.stream),
+        "durationS": round(elapsed, 3),
+        "throughputRps": round(done / elapsed, 2) if elapsed else None,
+        "latencyMs": _percentiles([s.latency for s in samples]),
+        "chatLatencyMs": _percentiles([s.latency for s in samples if not s.stream]),
+        "streamLatencyMs": _percentiles([s.latency for s in samples if s.stream]),
+        "firstEventMs": _percentiles([s.first_event for s in samples if s.first_event]),
+        "llmCallsPerRequest": per_request(llm_before, llm_after, "requests"),
+        "taskApiCallsPerRequest": per_request(task_api_before, task_api_after, "calls"),
+        "byScenario": by_scenario,
+    }
+
+
+def _compare(levels: list[dict[str, Any]], baseline: dict[str, Any]) -> None:
+    previous = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    for level in levels:
+        old = previous.get(level["concurrency"])
+        if not old:
+            continue
+        ratios = {}
+        if old.get("throughputRps") and level["throughputRps"]:
+            ratios["throughput"] = round(level["throughputRps"] / old["throughputRps"], 3)
+        for key in ("latencyMs", "firstEventMs"):
+            if (old.get(key) or {}).get("p95") and (level.get(key) or {}).get("p95"):
+                ratios[f"{key[:-2]}P95"] = round(level[key]["p95"] / old[key]["p95"], 3)
+        level["vsBaseline"] = ratios
+
+
+async def _bench(args: argparse.Namespace, urls: dict[str, Optional[str]]) -> dict[str, Any]:
+    limits = httpx.Limits(max_connections=max(args.concurrency) * 2 + 8)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        if args.warmup:
+            await _run_level(client, urls, 1, args.warmup, args.stream_ratio)
+        levels = [
+            await _run_level(client, urls, concurrency, args.requests, args.stream_ratio)
+            for concurrency in args.concurrency
+        ]
+    return {
+        "benchmark": "chat_load",
+        "startedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "config": {
+            "requests": args.requests,
+            "streamRatio": args.stream_ratio,
+            "llmLatencyMs": args.llm_latency_ms,
+            "llmTokensPerSecond": args.llm_tokens_per_second,
+            "taskApiLatencyMs": args.task_api_latency_ms,
+            "fakes": not args.agent_url,
+        },
+        "levels": levels,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests per level")
+    parser.add_argument("--stream-ratio", type=float, default=0.5)
+    parser.add_argument("--warmup", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--task-api-latency-ms", type=float, default=0.0)
+    parser.add_argument("--agent-url")
+    parser.add_argument("--task-api-url", help="Task API base ending in /api")
+    parser.add_argument("--llm-url", help="base URL serving the fake LLM /stats")
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    args = parser.parse_args()
+
+    procs: list[subprocess.Popen] = []
+    try:
+        if args.agent_url:
+            task_api = (args.task_api_url or os.getenv("TASK_API_BASE_URL", "")).rstrip("/")
+            urls = {
+                "agent": args.agent_url.rstrip("/"),
+                "taskApi": task_api,
+                "taskApiStats": args.task_api_url and task_api.removesuffix("/api"),
+                "llm": args.llm_url,
+            }
+        else:
+            env = dict(os.environ)
+            env["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+            env["FAKE_LLM_TOKENS_PER_SECOND"] = str(args.llm_tokens_per_second)
+            env["FAKE_TASK_API_LATENCY_MS"] = str(args.task_api_latency_ms)
+            llm, proc = _serve("auto_agent.fakes.llm:create_app", env, "/stats")
+            procs.append(proc)
+            task_api_root, proc = _serve("auto_agent.fakes.task_api:create_app", env, "/stats")
+            procs.append(proc)
+            env["DEEPSEEK_BASE_URL"] = llm
+            env["TASK_API_BASE_URL"] = f"{task_api_root}/api"
+            agent, proc = _serve("auto_agent.app:app", env, "/agent/metrics")
+            procs.append(proc)
+            urls = {
+                "agent": agent,
+                "taskApi": f"{task_api_root}/api",
+                "taskApiStats": task_api_root,
+                "llm": llm,
+            }
+        report = asyncio.run(_bench(args, urls))
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            _compare(report["levels"], json.load(handle))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
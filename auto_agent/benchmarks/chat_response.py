@@ -0,0 +1,97 @@
+"""POST /agent/chat response cost by result size: response_model vs. direct bytes.
+
+Run: python -m auto_agent.benchmarks.chat_response [--tasks 10 1000 10000]
+
+``responseModel`` is what FastAPI does for ``response_model=ChatResponse``:
+validate the whole result, dump it in JSON mode and render it. ``direct`` is
+``_chat_response``: validate the envelope only and encode the agent's dict
+once. Also times the full endpoint through ``TestClient`` with a scripted
+agent.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Callable
+
+from fastapi.testclient import TestClient
+
+from auto_agent.app import CodecJSONResponse, _chat_response, app
+from auto_agent.models import ChatResponse
+
+HEADERS = {"Authorization": "Bearer bench", "X-User-ID": "bench-user", "X-Device-ID": "d1"}
+
+
+def _result(count: int) -> dict[str, Any]:
+    return {
+        "sessionId": "bench-session",
+        "assistantMessage": "找到以下任务：...",
+        "action": {"intent": "list", "params": {"query": {"status": "待办"}}},
+        "execution": {
+            "status": "success",
+            "result": [
+                {
+                    "taskId": f"00000000-0000-0000-0000-{idx:012d}",
+                    "userId": "bench-user",
+                    "title": f"周报-{idx:05d}",
+                    "description": "基准测试任务描述" * 4,
+                    "status": "待办",
+                    "tags": ["work", "weekly"],
+                    "createdAt": "2024-01-01T00:00:00Z",
+                    "updatedAt": "2024-01-01T00:00:00Z",
+                }
+                for idx in range(count)
+            ],
+        },
+    }
+
+
+def response_model(result: dict[str, Any]) -> Any:
+    return CodecJSONResponse(ChatResponse.model_validate(result).model_dump(mode="json"))
+
+
+class ScriptedAgent:
+    def __init__(self, result: dict[str, Any]) -> None:
+        self.result = result
+
+    async def handle_chat(self, *_args: Any, **_kwargs: Any) -> dict[str, Any]:
+        return self.result
+
+
+def _per_call_ms(fn: Callable[[], Any], repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return round((time.perf_counter() - started) / repeat * 1e3, 3)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    report = []
+    body = {"messages": [{"role": "user", "content": "列出待办"}]}
+    with TestClient(app) as client:
+        for count in args.tasks:
+            result = _result(count)
+            app.state.agent_core = ScriptedAgent(result)
+            report.append(
+                {
+                    "tasks": count,
+                    "responseModelMs": _per_call_ms(lambda: response_model(result), args.repeat),
+                    "directMs": _per_call_ms(lambda: _chat_response(result), args.repeat),
+                    "endpointMs": _per_call_ms(
+                        lambda: client.post("/agent/chat", json=body, headers=HEADERS),
+                        args.repeat,
+                    ),
+                }
+            )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
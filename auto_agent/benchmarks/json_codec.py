@@ -0,0 +1,107 @@
+"""CPU per request spent in JSON on the agent hot path, per codec backend.
+
+Run: python -m auto_agent.benchmarks.json_codec [--tasks 50] [--repeat 2000]
+
+Times the real call sites (``safe_json``, ``_sse_event``, the FastAPI
+response class, ``TaskApi`` body decoding) with each installed backend,
+then combines them into a per-request estimate for a two-step turn: per
+step one task page decode, three ``safe_json`` calls (action key, result key,
+scratchpad observation) and four SSE events, plus the final response.
+``safe_json`` builds prompt text with the standard library whatever the
+backend, so its share is the same in every row.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Callable
+
+from auto_agent import jsoncodec
+from auto_agent.agent_core import safe_json
+from auto_agent.app import CodecJSONResponse, _sse_event
+from auto_agent.models import ChatResponse
+
+STEPS = 2
+SSE_EVENTS_PER_STEP = 4
+SAFE_JSON_PER_STEP = 3
+
+
+def _tasks(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "taskId": f"00000000-0000-0000-0000-{idx:012d}",
+            "userId": "bench-user",
+            "title": f"周报-{idx:05d}",
+            "description": "基准测试任务描述" * 4,
+            "status": "待办",
+            "tags": ["work", "weekly"],
+            "createdAt": "2024-01-01T00:00:00Z",
+            "updatedAt": "2024-01-01T00:00:00Z",
+        }
+        for idx in range(count)
+    ]
+
+
+def _per_call_us(fn: Callable[[], Any], repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def measure(name: str, tasks: list[dict[str, Any]], repeat: int) -> dict[str, Any]:
+    jsoncodec.codec = jsoncodec.get_codec(name)
+    page = json.dumps(tasks, ensure_ascii=False).encode("utf-8")
+    execution = {"status": "success", "result": tasks}
+    response = ChatResponse(
+        sessionId="bench-session",
+        assistantMessage="找到以下任务：...",
+        action={"intent": "list", "params": {"query": {"status": "待办"}}},
+        execution=execution,
+    ).model_dump(mode="json")
+    renderer = CodecJSONResponse(content=None)
+
+    calls = {
+        "decodePage": _per_call_us(lambda: jsoncodec.loads(page), repeat),
+        "safeJson": _per_call_us(lambda: safe_json(tasks), repeat),
+        "sseEvent": _per_call_us(lambda: _sse_event("execution", execution), repeat),
+        "renderResponse": _per_call_us(lambda: renderer.render(response), repeat),
+    }
+    per_request = (
+        STEPS
+        * (
+            calls["decodePage"]
+            + SAFE_JSON_PER_STEP * calls["safeJson"]
+            + SSE_EVENTS_PER_STEP * calls["sseEvent"]
+        )
+        + calls["renderResponse"]
+    )
+    return {
+        "backend": name,
+        "perCallUs": {key: round(value, 1) for key, value in calls.items()},
+        "perRequestUs": round(per_request, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    tasks = _tasks(args.tasks)
+    results = [
+        measure(name, tasks, args.repeat)
+        for name in jsoncodec.BACKENDS
+        if jsoncodec.available(name)
+    ]
+    baseline = next(item["perRequestUs"] for item in results if item["backend"] == "json")
+    for item in results:
+        item["savedPerRequestUs"] = round(baseline - item["perRequestUs"], 1)
+    print(json.dumps({"tasks": args.tasks, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Memory per large-list request: one full array vs. cursor pages + bounded window.
+
+Run: python -m auto_agent.benchmarks.large_list_memory [--tasks 1000 10000 50000]
+
+Each run sends one "list my pending tasks" turn through AgentCore against an
+in-process stand-in for GET /api/tasks that honours ``limit``/``cursor``.
+``tracemalloc`` reports the peak Python allocation during the turn and what
+is still held by the session afterwards.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tracemalloc
+from typing import Any
+
+import httpx
+
+from auto_agent.agent_core import AgentCore, SessionStore
+from auto_agent.config import settings
+from auto_agent.models import ChatMessage
+from auto_agent.task_api import TaskApi
+
+HEADERS = {"X-User-ID": "bench-user"}
+
+
+class Backend:
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self.bytes_sent = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        limit = int(params.get("limit") or self.count)
+        start = int(params.get("cursor") or 0)
+        end = min(start + limit, self.count)
+        # Rows are rendered per request, like the Go service reading from SQLite.
+        rows = [
+            {
+                "taskId": f"task-{idx:06d}",
+                "userId": "bench-user",
+                "title": f"周报-{idx:06d}",
+                "description": "基准测试任务描述" * 4,
+                "status": "待办",
+                "tags": ["work"],
+                "createdAt": "2024-01-01T00:00:00Z",
+                "updatedAt": "2024-01-01T00:00:00Z",
+            }
+            for idx in range(start, end)
+        ]
+        body = json.dumps(rows, ensure_ascii=False).encode("utf-8")
+        self.bytes_sent += len(body)
+        headers = {"X-Next-Cursor": str(end)} if end < self.count else {}
+        return httpx.Response(200, content=body, headers=headers)
+
+
+class ScriptedPlanner:
+    def __init__(self) -> None:
+        self.steps = [
+            {
+                "thought": "",
+                "action": "list_tasks",
+                "action_input": {"query": {"status": "待办"}},
+                "final": "",
+            }
+        ]
+
+    async def plan(self, _conversation: str, _scratchpad: str) -> dict[str, Any]:
+        if self.steps:
+            return self.steps.pop(0)
+        return {"thought": "", "action": "final", "action_input": {}, "final": "好的。"}
+
+
+async def run_list(count: int, page_size: int, result_limit: int) -> dict[str, Any]:
+    settings.task_list_page_size = page_size
+    settings.task_list_result_limit = result_limit
+    backend = Backend(count)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(backend))
+    task_api = TaskApi("http://backend/api", client, cache_entries=0)
+    session_store = SessionStore(12)
+    agent = AgentCore(task_api, session_store, ScriptedPlanner())
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = await agent.handle_chat(
+        None, [ChatMessage(role="user", content="列出待办")], HEADERS
+    )
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await client.aclose()
+
+    recent = await session_store.get_recent(result["sessionId"])
+    return {
+        "peakKiB": (peak - baseline) // 1024,
+        "retainedKiB": (retained - baseline) // 1024,
+        "resultTasks": len(result["execution"]["result"]),
+        "recentTasks": len(recent),
+        "bytes": backend.bytes_sent,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--result-limit", type=int, default=50)
+    args = parser.parse_args()
+
+    report = []
+    for count in args.tasks:
+        report.append(
+            {
+                "tasks": count,
+                "singleArray": await run_list(count, 0, count),
+                "paged": await run_list(count, args.page_size, args.result_limit),
+            }
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
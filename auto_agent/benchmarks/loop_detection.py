@@ -0,0 +1,85 @@
+"""Per-step cost of ReAct loop detection: JSON string keys vs. step fingerprints.
+
+Run: python -m auto_agent.benchmarks.loop_detection [--tasks 100 1000 10000]
+
+The old check serialised the action input and the whole execution result into
+strings every step just to compare them with the previous step. The
+fingerprint hashes the normalised action input and the result task ids
+(+ ``updatedAt``). Reports time and peak allocation per step.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from auto_agent.agent_core import safe_json, step_fingerprint
+
+ACTION = "list_tasks"
+ACTION_INPUT = {"query": {"status": "待办", "status_list": None, "tags": None, "keyword": None}}
+
+
+def _execution(count: int) -> dict[str, Any]:
+    return {
+        "status": "success",
+        "result": [
+            {
+                "taskId": f"00000000-0000-0000-0000-{idx:012d}",
+                "userId": "bench-user",
+                "title": f"周报-{idx:05d}",
+                "description": "基准测试任务描述" * 4,
+                "status": "待办",
+                "tags": ["work", "weekly"],
+                "createdAt": "2024-01-01T00:00:00Z",
+                "updatedAt": "2024-01-01T00:00:00Z",
+            }
+            for idx in range(count)
+        ],
+    }
+
+
+def string_keys(execution: dict[str, Any]) -> Any:
+    return f"{ACTION}:{safe_json(ACTION_INPUT)}", safe_json(execution.get("result"))
+
+
+def fingerprint(execution: dict[str, Any]) -> Any:
+    return step_fingerprint(ACTION, ACTION_INPUT, execution)
+
+
+def measure(fn: Callable[[dict[str, Any]], Any], execution: dict[str, Any]) -> dict[str, Any]:
+    repeat = 20
+    fn(execution)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(execution)
+    elapsed = (time.perf_counter() - started) / repeat
+
+    tracemalloc.start()
+    fn(execution)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"usPerStep": round(elapsed * 1e6, 1), "peakKiB": peak // 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    report = []
+    for count in args.tasks:
+        execution = _execution(count)
+        report.append(
+            {
+                "tasks": count,
+                "stringKeys": measure(string_keys, execution),
+                "fingerprint": measure(fingerprint, execution),
+            }
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
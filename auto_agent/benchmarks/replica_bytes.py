@@ -0,0 +1,154 @@
+"""Task API bytes transferred per conversation: full list reloads vs. TaskReplica.
+
+Run: python -m auto_agent.benchmarks.replica_bytes [--tasks 1000 10000] [--turns 6]
+
+Each conversation alternates "list my pending tasks" and "mark <title> done"
+turns through AgentCore with a scripted planner. The backend is an in-process
+stand-in for the Go Task API that supports ``since`` deltas and tombstones.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+from typing import Any
+
+import httpx
+
+from auto_agent.agent_core import AgentCore, SessionStore
+from auto_agent.models import ChatMessage
+from auto_agent.task_api import TaskApi
+from auto_agent.task_replica import TaskReplica
+
+HEADERS = {"X-User-ID": "bench-user"}
+
+
+class Backend:
+    def __init__(self, count: int) -> None:
+        self.clock = 1
+        self.rows: dict[str, dict[str, Any]] = {}
+        for idx in range(count):
+            task_id = f"task-{idx:05d}"
+            self.rows[task_id] = {
+                "taskId": task_id,
+                "userId": "bench-user",
+                "title": f"周报-{idx:05d}",
+                "description": "基准测试任务描述" * 4,
+                "status": "待办",
+                "tags": ["work"],
+                "createdAt": "2024-01-01T00:00:00Z",
+                "updatedAt": "2024-01-01T00:00:00Z",
+                "_changed": 0,
+            }
+        self.bytes_sent = 0
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        token = str(self.clock)
+        if request.method == "GET" and request.url.path.endswith("/tasks"):
+            since = request.url.params.get("since")
+            status = request.url.params.get("status")
+            q = request.url.params.get("q")
+            if since:
+                rows = [row for row in self.rows.values() if row["_changed"] >= int(since)]
+            else:
+                rows = [
+                    row
+                    for row in self.rows.values()
+                    if not row.get("deleted")
+                    and (not status or row["status"] == status)
+                    and (not q or q in row["title"])
+                ]
+            return self._json([_public(row) for row in rows], {"X-Sync-Token": token})
+        match = re.search(r"/tasks/([^/]+)$", request.url.path)
+        row = self.rows[match.group(1)]
+        if request.method == "PUT":
+            self.clock += 1
+            row.update(json.loads(request.content), _changed=self.clock)
+        return self._json(_public(row), {})
+
+    def _json(self, payload: Any, headers: dict[str, str]) -> httpx.Response:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.bytes_sent += len(body)
+        return httpx.Response(200, content=body, headers=headers)
+
+
+def _public(row: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in row.items() if key != "_changed"}
+
+
+class ScriptedPlanner:
+    def __init__(self) -> None:
+        self.steps: list[dict[str, Any]] = []
+
+    async def plan(self, _conversation: str, _scratchpad: str) -> dict[str, Any]:
+        if self.steps:
+            return self.steps.pop(0)
+        return {"thought": "", "action": "final", "action_input": {}, "final": "好的。"}
+
+
+async def run_conversation(count: int, turns: int, use_replica: bool) -> dict[str, Any]:
+    backend = Backend(count)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(backend))
+    task_api = TaskApi("http://backend/api", client, cache_entries=0)
+    replica = TaskReplica(task_api) if use_replica else None
+    planner = ScriptedPlanner()
+    agent = AgentCore(task_api, SessionStore(12), planner, replica=replica)
+
+    session_id = "bench-session"
+    for turn in range(turns):
+        if turn % 2 == 0:
+            planner.steps.append(
+                {
+                    "thought": "",
+                    "action": "list_tasks",
+                    "action_input": {"query": {"status": "待办"}},
+                    "final": "",
+                }
+            )
+        else:
+            planner.steps.append(
+                {
+                    "thought": "",
+                    "action": "update_task",
+                    "action_input": {
+                        "status": "已完成",
+                        "query": {"keyword": f"周报-{turn:05d}"},
+                    },
+                    "final": "",
+                }
+            )
+        await agent.handle_chat(
+            session_id, [ChatMessage(role="user", content=f"turn {turn}")], HEADERS
+        )
+    await client.aclose()
+    return {
+        "bytes": backend.bytes_sent,
+        "calls": backend.calls,
+        "bytesPerTurn": backend.bytes_sent // turns,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--turns", type=int, default=6)
+    args = parser.parse_args()
+
+    report = []
+    for count in args.tasks:
+        report.append(
+            {
+                "tasks": count,
+                "turns": args.turns,
+                "fullReload": await run_conversation(count, args.turns, False),
+                "replica": await run_conversation(count, args.turns, True),
+            }
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
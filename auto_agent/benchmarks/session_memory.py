@@ -0,0 +1,106 @@
+"""Bytes per live session: full task dicts + ChatMessage vs. TaskRef + MessageRecord.
+
+Run: python -m auto_agent.benchmarks.session_memory [--sessions 10000] [--tasks 50]
+
+Each session holds a full message window and a recent-candidates list decoded
+from its own task page, as after a "list my tasks" turn. ``before`` keeps
+them the way SessionState used to (backend task dicts, pydantic messages,
+no ``__slots__``); ``after`` goes through SessionStore. ``tracemalloc``
+reports what stays allocated once all sessions are populated.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+
+from auto_agent.agent_core import SessionStore
+from auto_agent.models import ChatMessage
+
+MAX_MESSAGES = 12
+
+
+@dataclass
+class LegacySessionState:
+    session_id: str
+    messages: list[ChatMessage]
+    updated_at: datetime
+    pending_candidates: list[dict[str, Any]] = field(default_factory=list)
+    pending_intent: Optional[str] = None
+    recent_candidates: list[dict[str, Any]] = field(default_factory=list)
+
+
+def _page(count: int) -> bytes:
+    rows = [
+        {
+            "taskId": f"00000000-0000-0000-0000-{idx:012d}",
+            "userId": "bench-user",
+            "title": f"周报-{idx:05d}",
+            "description": "基准测试任务描述" * 4,
+            "status": "待办",
+            "tags": ["work", "weekly"],
+            "createdAt": "2024-01-01T00:00:00Z",
+            "updatedAt": "2024-01-01T00:00:00Z",
+        }
+        for idx in range(count)
+    ]
+    return json.dumps(rows, ensure_ascii=False).encode("utf-8")
+
+
+def _messages(session: int) -> list[ChatMessage]:
+    return [
+        ChatMessage(
+            role="user" if idx % 2 == 0 else "assistant",
+            content=f"第 {session} 个会话的第 {idx} 条消息：列出我本周的待办任务",
+        )
+        for idx in range(MAX_MESSAGES)
+    ]
+
+
+async def populate(kind: str, sessions: int, page: bytes) -> dict[str, Any]:
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    if kind == "before":
+        store: Any = {}
+        for idx in range(sessions):
+            session_id = f"session-{idx}"
+            store[session_id] = LegacySessionState(
+                session_id=session_id,
+                messages=_messages(idx),
+                updated_at=datetime.utcnow(),
+                recent_candidates=json.loads(page),
+            )
+    else:
+        store = SessionStore(MAX_MESSAGES)
+        for idx in range(sessions):
+            session_id = f"session-{idx}"
+            await store.append_messages(session_id, _messages(idx))
+            await store.set_recent(session_id, json.loads(page))
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del store
+    return {"bytesPerSession": retained // sessions, "totalMiB": round(retained / 2**20, 1)}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--tasks", type=int, default=50)
+    args = parser.parse_args()
+
+    page = _page(args.tasks)
+    report = {
+        "sessions": args.sessions,
+        "tasksPerSession": args.tasks,
+        "before": await populate("before", args.sessions, page),
+        "after": await populate("after", args.sessions, page),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""Time to snapshot and restore SessionStore across a restart.
+
+Run: python -m auto_agent.benchmarks.session_snapshot [--sessions 100000] [--tasks 10]
+
+Fills a SessionStore with a full message window, pending candidates and a
+recent task list per session, writes it with ``dump_snapshot`` (what the old
+process does after draining) and reads it back with ``load_snapshot`` (what
+the new process does at startup). Reports both timings and the file size.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Any
+
+from auto_agent import jsoncodec
+from auto_agent.agent_core import SessionStore
+from auto_agent.models import ChatMessage
+
+MAX_MESSAGES = 12
+
+
+def _tasks(session: int, count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "taskId": f"{session:08d}-0000-0000-0000-{idx:012d}",
+            "title": f"周报-{idx:05d}",
+            "status": "待办",
+            "tags": ["work", "weekly"],
+        }
+        for idx in range(count)
+    ]
+
+
+async def populate(sessions: int, tasks: int) -> SessionStore:
+    store = SessionStore(MAX_MESSAGES)
+    for idx in range(sessions):
+        session_id = f"session-{idx}"
+        await store.append_messages(
+            session_id,
+            [
+                ChatMessage(role="user" if turn % 2 == 0 else "assistant", content=f"消息 {turn}")
+                for turn in range(MAX_MESSAGES)
+            ],
+        )
+        await store.set_recent(session_id, _tasks(idx, tasks))
+        await store.set_pending(session_id, "delete", _tasks(idx, 2))
+    return store
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--tasks", type=int, default=10)
+    args = parser.parse_args()
+
+    store = await populate(args.sessions, args.tasks)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.json")
+        started = time.perf_counter()
+        written = store.dump_snapshot(path)
+        dumped = time.perf_counter() - started
+        size = os.path.getsize(path)
+
+        restored_store = SessionStore(MAX_MESSAGES)
+        started = time.perf_counter()
+        restored = restored_store.load_snapshot(path)
+        loaded = time.perf_counter() - started
+
+    report = {
+        "codec": jsoncodec.codec.name,
+        "sessions": written,
+        "restored": restored,
+        "dumpSeconds": round(dumped, 3),
+        "loadSeconds": round(loaded, 3),
+        "fileMiB": round(size / 2**20, 1),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""Full task-list reload vs. conditional GET for a user with many tasks.
+
+Run: python -m auto_agent.benchmarks.task_list_etag [--tasks 10000] [--rounds 50]
+
+The backend is an in-process stand-in for ``GET /api/tasks`` that serialises
+the list and honours ``If-None-Match`` the way the Go handler does, so the
+numbers cover client-side transfer and JSON decoding, not the database.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+
+from auto_agent.task_api import TaskApi
+
+
+def make_tasks(count: int) -> list[dict]:
+    return [
+        {
+            "taskId": str(uuid.uuid4()),
+            "userId": "bench-user",
+            "title": f"任务 {idx}",
+            "description": "基准测试任务描述" * 4,
+            "status": "待办",
+            "tags": ["work", f"tag-{idx % 20}"],
+            "createdAt": "2024-01-01T00:00:00Z",
+            "updatedAt": "2024-01-01T00:00:00Z",
+        }
+        for idx in range(count)
+    ]
+
+
+class Backend:
+    def __init__(self, tasks: list[dict]) -> None:
+        self.body = json.dumps(tasks, ensure_ascii=False).encode("utf-8")
+        self.etag = f'W/"{len(tasks)}-{hashlib.sha1(self.body).hexdigest()[:16]}"'
+        self.bytes_sent = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304, headers={"ETag": self.etag})
+        self.bytes_sent += len(self.body)
+        return httpx.Response(
+            200,
+            content=self.body,
+            headers={"ETag": self.etag, "Content-Type": "application/json"},
+        )
+
+
+async def measure(cache_entries: int, tasks: list[dict], rounds: int) -> dict:
+    backend = Backend(tasks)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(backend))
+    api = TaskApi("http://backend/api", client, cache_entries=cache_entries)
+    headers = {"X-User-ID": "bench-user"}
+    await api.list_tasks(headers)  # warm the cache (when enabled)
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = await api.list_tasks(headers)
+        timings.append(time.perf_counter() - started)
+        assert result.ok and len(result.data) == len(tasks)
+    await client.aclose()
+    return {
+        "p50Ms": round(statistics.median(timings) * 1000, 3),
+        "maxMs": round(max(timings) * 1000, 3),
+        "bytesPerCall": backend.bytes_sent // (rounds + 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.tasks)
+    report = {
+        "tasks": args.tasks,
+        "rounds": args.rounds,
+        "fullReload": await measure(0, tasks, args.rounds),
+        "conditional": await measure(256, tasks, args.rounds),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
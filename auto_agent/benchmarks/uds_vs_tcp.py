@@ -0,0 +1,94 @@
+"""Per-call latency and CPU of the Task API client over TCP loopback vs. a Unix socket.
+
+Run: python -m auto_agent.benchmarks.uds_vs_tcp [--calls 2000] [--payload 2048]
+
+Both transports talk to the same raw asyncio HTTP/1.1 server (keep-alive,
+fixed JSON body) running in this process, so the difference is the socket
+path plus client overhead. CPU is process time (client + server) per call.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from auto_agent.http_pool import build_client
+
+
+def make_handler(body: bytes):
+    response = (
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+        + f"Content-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def measure(url: str, uds: str | None, calls: int) -> dict:
+    client, _pool = build_client(5.0, max_connections=1, max_keepalive=1, uds=uds)
+    for _ in range(50):
+        await client.get(url)
+    timings = []
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    for _ in range(calls):
+        started = time.perf_counter()
+        await client.get(url)
+        timings.append(time.perf_counter() - started)
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+    await client.aclose()
+    timings.sort()
+    return {
+        "p50Us": round(statistics.median(timings) * 1e6, 1),
+        "p99Us": round(timings[int(len(timings) * 0.99) - 1] * 1e6, 1),
+        "callsPerSecond": round(calls / wall),
+        "cpuUsPerCall": round(cpu / calls * 1e6, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--payload", type=int, default=2048)
+    args = parser.parse_args()
+
+    body = json.dumps({"data": "x" * args.payload}).encode()
+    handler = make_handler(body)
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "tasks.sock")
+        tcp_server = await asyncio.start_server(handler, "127.0.0.1", 0)
+        unix_server = await asyncio.start_unix_server(handler, socket_path)
+        port = tcp_server.sockets[0].getsockname()[1]
+        try:
+            report = {
+                "calls": args.calls,
+                "payloadBytes": len(body),
+                "tcp": await measure(f"http://127.0.0.1:{port}/api/tasks", None, args.calls),
+                "unix": await measure("http://localhost/api/tasks", socket_path, args.calls),
+            }
+        finally:
+            await asyncio.sleep(0.1)  # let handlers see the clients' EOF
+            tcp_server.close()
+            unix_server.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
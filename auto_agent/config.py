@@ -24,6 +24,13 @@ def _get_float(name: str, default: float) -> float:
         return default
 
 
+def _get_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
 class Settings:
     def __init__(self) -> None:
         # self.llm_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1")
@@ -36,10 +43,61 @@ class Settings:
         self.task_api_base_url = os.getenv(
             "TASK_API_BASE_URL", "http://localhost:8080/api"
         )
+        self.task_store = os.getenv("TASK_STORE", "http").strip().lower()
+        self.task_store_path = os.getenv("TASK_STORE_PATH", "./auto_agent_tasks.db")
+        self.task_store_auth_token = os.getenv("TASK_STORE_AUTH_TOKEN", "")
         self.request_timeout = _get_float("TASK_API_TIMEOUT", 60.0)
+        self.task_api_connect_timeout = _get_float("TASK_API_CONNECT_TIMEOUT", 2.0)
+        self.task_api_list_timeout = _get_float("TASK_API_LIST_TIMEOUT", 10.0)
+        self.task_api_get_timeout = _get_float("TASK_API_GET_TIMEOUT", 5.0)
+        self.task_api_write_timeout = _get_float("TASK_API_WRITE_TIMEOUT", 10.0)
+        self.task_api_max_retries = _get_int("TASK_API_MAX_RETRIES", 2)
+        self.task_api_retry_ratio = _get_float("TASK_API_RETRY_RATIO", 0.2)
+        self.task_api_breaker_failures = _get_int("TASK_API_BREAKER_FAILURES", 5)
+        self.task_api_breaker_reset = _get_float("TASK_API_BREAKER_RESET_SECONDS", 10.0)
+        self.task_api_cache_entries = _get_int("TASK_API_CACHE_ENTRIES", 256)
+        self.task_api_max_connections = _get_int("TASK_API_MAX_CONNECTIONS", 100)
+        self.task_api_max_keepalive = _get_int("TASK_API_MAX_KEEPALIVE", 20)
+        self.task_api_keepalive_expiry = _get_float("TASK_API_KEEPALIVE_EXPIRY_SECONDS", 30.0)
+        self.task_api_http2 = _get_bool("TASK_API_HTTP2", False)
+        self.task_api_warmup_connections = _get_int("TASK_API_WARMUP_CONNECTIONS", 4)
+        self.task_replica_enabled = _get_bool("TASK_REPLICA_ENABLED", False)
+        self.task_replica_max_users = _get_int("TASK_REPLICA_MAX_USERS", 1000)
+        self.task_list_page_size = _get_int("TASK_LIST_PAGE_SIZE", 200)
+        self.task_list_result_limit = _get_int("TASK_LIST_RESULT_LIMIT", 50)
         self.max_session_messages = _get_int("AGENT_MAX_SESSION_MESSAGES", 12)
+        self.session_snapshot_path = os.getenv("SESSION_SNAPSHOT_PATH", "")
+        self.shutdown_drain_timeout = _get_float("AGENT_DRAIN_TIMEOUT_SECONDS", 20.0)
         self.react_max_steps = _get_int("REACT_MAX_STEPS", 10)
         self.sse_chunk_size = _get_int("SSE_CHUNK_SIZE", 20)
+        self.json_codec = os.getenv("JSON_CODEC", "auto").strip().lower()
+        self.tracing_exporter = os.getenv("TRACING_EXPORTER", "none").strip().lower()
+        self.idempotency_ttl = _get_float("IDEMPOTENCY_TTL_SECONDS", 600.0)
+        self.idempotency_max_entries = _get_int("IDEMPOTENCY_MAX_ENTRIES", 10000)
+        self.session_merge_queued = _get_bool("SESSION_MERGE_QUEUED", False)
+        self.max_concurrent_runs = _get_int("AGENT_MAX_CONCURRENT_RUNS", 32)
+        self.max_queued_runs = _get_int("AGENT_MAX_QUEUED_RUNS", 128)
+        self.queue_timeout = _get_float("AGENT_QUEUE_TIMEOUT_SECONDS", 10.0)
+        self.max_runs_per_user = _get_int("AGENT_MAX_RUNS_PER_USER", 8)
+        self.llm_initial_concurrency = _get_int("LLM_INITIAL_CONCURRENCY", 4)
+        self.llm_max_concurrency = _get_int("LLM_MAX_CONCURRENCY", 32)
+        self.llm_max_queued = _get_int("LLM_MAX_QUEUED", 256)
+        self.llm_queue_timeout = _get_float("LLM_QUEUE_TIMEOUT_SECONDS", 30.0)
+        self.llm_rate_per_second = _get_float("LLM_RATE_PER_SECOND", 0.0)
+        self.llm_rate_burst = _get_int("LLM_RATE_BURST", 10)
+        self.llm_throttle_retries = _get_int("LLM_THROTTLE_RETRIES", 3)
+        self.llm_interactive_reserve = _get_int("LLM_INTERACTIVE_RESERVE", 1)
+        self.llm_starvation_timeout = _get_float("LLM_STARVATION_TIMEOUT_SECONDS", 5.0)
+        self.llm_endpoints = os.getenv("LLM_ENDPOINTS", "")
+        self.llm_endpoint_failure_threshold = _get_int("LLM_ENDPOINT_FAILURE_THRESHOLD", 3)
+        self.llm_endpoint_cooldown = _get_float("LLM_ENDPOINT_COOLDOWN_SECONDS", 30.0)
+        self.llm_hedge_enabled = _get_bool("LLM_HEDGE_ENABLED", False)
+        self.llm_hedge_quantile = _get_float("LLM_HEDGE_QUANTILE", 0.95)
+        self.llm_hedge_min_delay = _get_float("LLM_HEDGE_MIN_DELAY_SECONDS", 1.0)
+        # off | record | replay; see planner_cassette.PlannerCassette.
+        self.planner_cassette_mode = os.getenv("PLANNER_CASSETTE_MODE", "off").lower()
+        self.planner_cassette_path = os.getenv("PLANNER_CASSETTE_PATH", "planner-cassette.jsonl")
+        self.planner_cassette_delay_scale = _get_float("PLANNER_CASSETTE_DELAY_SCALE", 1.0)
 
 
 settings = Settings()
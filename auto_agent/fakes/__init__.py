@@ -0,0 +1,11 @@
+"""Local stand-ins for the agent's dependencies, for deterministic tests and load runs.
+
+``llm.create_app`` is an OpenAI-compatible chat completions server with
+scripted/ruled plans and configurable latency and token rate;
+``task_api.create_app`` serves the Task API routes from an in-memory store.
+"""
+from .llm import FakeLlm, Rule
+from .llm import create_app as create_llm_app
+from .task_api import create_app as create_task_api_app
+
+__all__ = ["FakeLlm", "Rule", "create_llm_app", "create_task_api_app"]
@@ -0,0 +1,272 @@
+"""OpenAI-compatible stand-in for the planner LLM.
+
+Serves ``POST /chat/completions`` (streamed or not) with ReAct plans picked by
+rules over the last user message of the agent's prompt, so the agent can be
+exercised end to end without tokens or network jitter. Once the prompt holds
+an observation the answer is ``final``. A script (plans returned in order
+before rules apply), extra rules, first-token latency and a token rate make
+runs repeatable and load shapes adjustable.
+
+Run: python -m uvicorn --factory auto_agent.fakes.llm:create_app --port 11434
+Env: FAKE_LLM_LATENCY_MS, FAKE_LLM_TOKENS_PER_SECOND, FAKE_LLM_RULES (JSON file
+of ``[{"pattern": ..., "plan": ...}]``), FAKE_LLM_SCRIPT (JSON file of plans).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+UNFINISHED = ["待办", "进行中", "已延期"]
+# Rough token size: one token per few characters is close enough for pacing.
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class Rule:
+    pattern: re.Pattern[str]
+    plan: dict[str, Any]
+
+
+def _rule(pattern: str, action: str, action_input: dict[str, Any]) -> Rule:
+    # Every key the planner asks for is present, otherwise the client retries.
+    plan = {"thought": "", "action": action, "action_input": action_input, "final": ""}
+    return Rule(re.compile(pattern), plan)
+
+
+DEFAULT_RULES = [
+    _rule(
+        r"创建(?:一个)?任务[：:]\s*(?P<title>[^，,。]+?)"
+        r"(?:[，,]\s*标签(?:为|是)?\s*(?P<tag>[^，,。\s]+))?\s*$",
+        "create_task",
+        {"title": "{title}", "tags": ["{tag}"]},
+    ),
+    _rule(
+        r"把(?P<keyword>.+?)(?:任务)?改名为(?P<title>.+?)\s*$",
+        "update_task",
+        {"title": "{title}", "query": {"keyword": "{keyword}"}},
+    ),
+    _rule(
+        r"给(?P<keyword>.+)任务加上?标签(?P<tag>[^，,。\s]+)",
+        "update_task",
+        {"tags": ["{tag}"], "query": {"keyword": "{keyword}"}},
+    ),
+    _rule(
+        r"把(?:包含)?(?P<keyword>.+?)的?任务都?标记为(?P<status>待办|进行中|已完成|已延期|已取消)",
+        "update_task",
+        {"status": "{status}", "bulk": True, "query": {"keyword": "{keyword}"}},
+    ),
+    _rule(
+        r"(?:删除|移除|清理掉?|清除|清空)(?:所有)?(?:包含)?(?P<keyword>.+?)的?任务",
+        "delete_task",
+        {"bulk": True, "query": {"keyword": "{keyword}"}},
+    ),
+    _rule(r"查看(?P<keyword>.+?)任务(?:的)?详情", "get_task", {"query": {"keyword": "{keyword}"}}),
+    _rule(
+        r"列出(?:包含)?(?P<keyword>.*?)的?未完成(?:的)?任务",
+        "list_tasks",
+        {"query": {"status_list": UNFINISHED, "keyword": "{keyword}"}},
+    ),
+    _rule(r"列出标签为(?P<tag>[^，,。\s]+?)的任务", "list_tasks", {"query": {"tags": ["{tag}"]}}),
+    _rule(
+        r"列出(?:包含)?(?P<keyword>.*?)的?(?P<status>待办|进行中|已完成|已延期|已取消)(?:的)?任务",
+        "list_tasks",
+        {"query": {"status": "{status}", "keyword": "{keyword}"}},
+    ),
+    _rule(
+        r"(?:列出|有哪些|查看)(?:包含)?(?P<keyword>.*?)的?任务",
+        "list_tasks",
+        {"query": {"keyword": "{keyword}"}},
+    ),
+]
+
+CLARIFY = {
+    "thought": "",
+    "action": "final",
+    "action_input": {},
+    "final": "请告诉我要对哪些任务做什么操作。",
+}
+FINAL = {"thought": "", "action": "final", "action_input": {}, "final": "已完成。"}
+
+
+class FakeLlm:
+    def __init__(
+        self,
+        rules: Optional[list[Rule]] = None,
+        script: Optional[list[dict[str, Any]]] = None,
+        latency: float = 0.0,
+        tokens_per_second: float = 0.0,
+    ) -> None:
+        self.rules = [*(rules or []), *DEFAULT_RULES]
+        self.script = list(script or [])
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.requests = 0
+        self.completion_tokens = 0
+
+    def plan(self, prompt: str) -> dict[str, Any]:
+        if self.script:
+            return self.script.pop(0)
+        conversation, _, scratchpad = prompt.partition("已有思考与观察：")
+        if "Observation:" in scratchpad:
+            return FINAL
+        message = _last_user_message(conversation)
+        for rule in self.rules:
+            match = rule.pattern.search(message)
+            if match:
+                return _render(rule.plan, match.groupdict())
+        return CLARIFY
+
+    def stats(self) -> dict[str, Any]:
+        return {"requests": self.requests, "completionTokens": self.completion_tokens}
+
+
+def _last_user_message(conversation: str) -> str:
+    for line in reversed(conversation.splitlines()):
+        if line.startswith("user: "):
+            return line[len("user: ") :].strip()
+    return ""
+
+
+def _render(template: Any, groups: dict[str, Optional[str]]) -> Any:
+    """Fill ``{name}`` placeholders; a placeholder whose group is empty drops out."""
+    if isinstance(template, dict):
+        rendered = {key: _render(value, groups) for key, value in template.items()}
+        return {key: value for key, value in rendered.items() if value is not None}
+    if isinstance(template, list):
+        items = [_render(item, groups) for item in template]
+        return [item for item in items if item is not None] or None
+    if isinstance(template, str):
+        name = template[1:-1] if template.startswith("{") and template.endswith("}") else None
+        if name is not None and name in groups:
+            return (groups[name] or "").strip() or None
+        return template.format_map({key: value or "" for key, value in groups.items()})
+    return template
+
+
+def _tokens(content: str) -> list[str]:
+    return [content[i : i + CHARS_PER_TOKEN] for i in range(0, len(content), CHARS_PER_TOKEN)]
+
+
+def _prompt_text(body: dict[str, Any]) -> str:
+    parts = []
+    for message in body.get("messages") or []:
+        content = message.get("content")
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(str(content or ""))
+    return "\n".join(parts)
+
+
+def _load_json(path: str) -> Any:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _from_env() -> FakeLlm:
+    rules_path = os.getenv("FAKE_LLM_RULES")
+    script_path = os.getenv("FAKE_LLM_SCRIPT")
+    rules = [
+        Rule(re.compile(item["pattern"]), item["plan"])
+        for item in (_load_json(rules_path) if rules_path else [])
+    ]
+    return FakeLlm(
+        rules=rules,
+        script=_load_json(script_path) if script_path else None,
+        latency=float(os.getenv("FAKE_LLM_LATENCY_MS") or 0) / 1000,
+        tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND") or 0),
+    )
+
+
+def create_app(llm: Optional[FakeLlm] = None) -> FastAPI:
+    llm = llm or _from_env()
+    app = FastAPI()
+    app.state.llm = llm
+
+    @app.post("/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = _prompt_text(body)
+        content = json.dumps(llm.plan(prompt), ensure_ascii=False)
+        tokens = _tokens(content)
+        llm.requests += 1
+        llm.completion_tokens += len(tokens)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model") or "fake"
+        usage = {
+            "prompt_tokens": len(prompt) // CHARS_PER_TOKEN,
+            "completion_tokens": len(tokens),
+            "total_tokens": len(prompt) // CHARS_PER_TOKEN + len(tokens),
+        }
+        if llm.latency:
+            await asyncio.sleep(llm.latency)
+
+        if not body.get("stream"):
+            if llm.tokens_per_second:
+                await asyncio.sleep(len(tokens) / llm.tokens_per_second)
+            return JSONResponse(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": usage,
+                }
+            )
+
+        async def stream() -> AsyncIterator[str]:
+            for index, token in enumerate(tokens):
+                if llm.tokens_per_second:
+                    await asyncio.sleep(1 / llm.tokens_per_second)
+                delta = {"content": token, **({"role": "assistant"} if index == 0 else {})}
+                yield _chunk(completion_id, model, {"index": 0, "delta": delta})
+            yield _chunk(
+                completion_id,
+                model,
+                {"index": 0, "delta": {}, "finish_reason": "stop"},
+                usage=usage,
+            )
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/models")
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "fake", "object": "model"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return llm.stats()
+
+    return app
+
+
+def _chunk(
+    completion_id: str, model: str, choice: dict[str, Any], usage: Optional[dict[str, Any]] = None
+) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [choice],
+        **({"usage": usage} if usage else {}),
+    }
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
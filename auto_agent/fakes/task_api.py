@@ -0,0 +1,170 @@
+"""In-memory stand-in for the Go Task API, served over HTTP on the same routes.
+
+Requests are translated onto ``SqliteTaskApi(":memory:")``, which already
+mirrors the Go service's semantics, so the agent's ``TaskApi`` client, the
+replica and the integration scenarios see the same statuses, headers
+(``ETag``/``X-Sync-Token``/``X-Next-Cursor``), error bodies and pagination.
+``FAKE_TASK_API_LATENCY_MS`` adds a fixed delay per request.
+
+Run: python -m uvicorn --factory auto_agent.fakes.task_api:create_app --port 8080
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import Any, Optional
+
+from fastapi import FastAPI, Request, Response
+
+from .. import jsoncodec
+from ..sqlite_task_api import SqliteTaskApi
+from ..task_api import ApiResult
+
+DEFAULT_TOKEN = "default-token"
+
+
+def _split(value: Optional[str]) -> Optional[list[str]]:
+    items = [item.strip() for item in (value or "").split(",") if item.strip()]
+    return items or None
+
+
+def _json(status_code: int, body: Any, headers: Optional[dict[str, str]] = None) -> Response:
+    return Response(
+        jsoncodec.dumps_bytes(body),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def _result(result: ApiResult) -> Response:
+    if not result.ok:
+        return _json(result.status_code, {"error": result.error})
+    return _json(result.status_code, result.data)
+
+
+def _error(status_code: int, code: str, message: str) -> Response:
+    return _json(status_code, {"error": {"code": code, "message": message}})
+
+
+def create_app(
+    store: Optional[SqliteTaskApi] = None, latency: Optional[float] = None
+) -> FastAPI:
+    store = store or SqliteTaskApi(
+        ":memory:", auth_token=os.getenv("FAKE_TASK_API_TOKEN", DEFAULT_TOKEN)
+    )
+    if latency is None:
+        latency = float(os.getenv("FAKE_TASK_API_LATENCY_MS") or 0) / 1000
+    devices: dict[str, str] = {}
+    app = FastAPI()
+    app.state.store = store
+
+    @app.middleware("http")
+    async def delay(request: Request, call_next):
+        if latency:
+            await asyncio.sleep(latency)
+        return await call_next(request)
+
+    async def body_of(request: Request) -> dict[str, Any]:
+        try:
+            body = jsoncodec.loads(await request.body())
+        except ValueError:
+            return {}
+        return body if isinstance(body, dict) else {}
+
+    @app.post("/api/device/register")
+    async def register_device(request: Request):
+        device_id = str((await body_of(request)).get("deviceId") or "")
+        try:
+            uuid.UUID(device_id)
+        except ValueError:
+            return _error(400, "INVALID_DEVICE_ID", "设备ID格式错误")
+        user_id = devices.setdefault(device_id, str(uuid.uuid4()))
+        return _json(200, {"deviceId": device_id, "userId": user_id, "message": "注册成功"})
+
+    @app.get("/api/tasks")
+    async def list_tasks(request: Request):
+        params = request.query_params
+        limit = params.get("limit")
+        if limit is not None and not limit.isdigit():
+            return _error(400, "INVALID_REQUEST", "无效的分页参数")
+        result = await store.list_tasks(
+            dict(request.headers),
+            status=params.get("status"),
+            tags=_split(params.get("tags")),
+            since=params.get("since"),
+            statuses=_split(params.get("statuses")),
+            q=params.get("q"),
+            fields=_split(params.get("fields")),
+            limit=int(limit) if limit else None,
+            cursor=params.get("cursor"),
+        )
+        if not result.ok:
+            return _result(result)
+        body = jsoncodec.dumps_bytes(result.data)
+        etag = f'W/"{len(result.data)}-{hashlib.sha1(body).hexdigest()[:16]}"'
+        headers = {"ETag": etag, "X-Sync-Token": result.sync_token or ""}
+        if result.next_cursor:
+            headers["X-Next-Cursor"] = result.next_cursor
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+
+    @app.post("/api/tasks")
+    async def create_task(request: Request):
+        body = await body_of(request)
+        return _result(
+            await store.create_task(
+                dict(request.headers), body.get("title"), body.get("description"), body.get("tags")
+            )
+        )
+
+    # Registered before /api/tasks/{task_id} so "batch" is not taken for an id.
+    @app.put("/api/tasks/batch")
+    async def update_tasks(request: Request):
+        body = await body_of(request)
+        return _result(
+            await store.update_tasks(
+                body.get("taskIds") or [],
+                dict(request.headers),
+                body.get("title"),
+                body.get("description"),
+                body.get("status"),
+                body.get("tags"),
+            )
+        )
+
+    @app.post("/api/tasks/batch/delete")
+    async def delete_tasks(request: Request):
+        body = await body_of(request)
+        return _result(await store.delete_tasks(body.get("taskIds") or [], dict(request.headers)))
+
+    @app.get("/api/tasks/{task_id}")
+    async def get_task(task_id: str, request: Request):
+        return _result(await store.get_task(task_id, dict(request.headers)))
+
+    @app.put("/api/tasks/{task_id}")
+    async def update_task(task_id: str, request: Request):
+        body = await body_of(request)
+        return _result(
+            await store.update_task(
+                task_id,
+                dict(request.headers),
+                body.get("title"),
+                body.get("description"),
+                body.get("status"),
+                body.get("tags"),
+            )
+        )
+
+    @app.delete("/api/tasks/{task_id}")
+    async def delete_task(task_id: str, request: Request):
+        return _result(await store.delete_task(task_id, dict(request.headers)))
+
+    @app.get("/stats")
+    async def stats():
+        return store.stats()
+
+    return app
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import time
+from typing import Any, Optional
+from urllib.parse import unquote, urlsplit
+
+import httpx
+
+from .llm_limiter import LatencyHistogram
+
+UNIX_SCHEME = "http+unix"
+
+_CONNECTED = {
+    "connection.connect_tcp.complete",
+    "connection.connect_unix_socket.complete",
+}
+_HEADERS_SENT = {
+    "http11.send_request_headers.started",
+    "http2.send_request_headers.started",
+}
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wraps the pooled transport to report utilization and pool wait time.
+
+    "Wait" is the time from handing a request to the pool until its headers
+    start going out, i.e. queueing for a free connection plus connecting when
+    a new one has to be opened. Uses httpcore's ``trace`` extension.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_connections: int) -> None:
+        self._transport = transport
+        self._max_connections = max_connections
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.connections_opened = 0
+        self.wait_latency = LatencyHistogram()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        waited: list[float] = []
+        outer_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            if event_name in _CONNECTED:
+                self.connections_opened += 1
+            elif event_name in _HEADERS_SENT and not waited:
+                waited.append(time.monotonic() - started)
+            if outer_trace is not None:
+                await outer_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await self._transport.handle_async_request(request)
+        finally:
+            self.in_flight -= 1
+            if waited:
+                self.wait_latency.observe(waited[0])
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "maxConnections": self._max_connections,
+            "inFlight": self.in_flight,
+            "peakInFlight": self.peak_in_flight,
+            "utilization": round(self.in_flight / self._max_connections, 3),
+            "requests": self.requests,
+            "connectionsOpened": self.connections_opened,
+            "poolWait": self.wait_latency.as_dict(),
+        }
+
+
+def split_unix_url(base_url: str) -> tuple[str, Optional[str]]:
+    """Map ``http+unix://<percent-encoded socket path>/api`` to an HTTP URL + socket.
+
+    e.g. ``http+unix://%2Frun%2Fnexustodo.sock/api`` ->
+    (``http://localhost/api``, ``/run/nexustodo.sock``). Other URLs pass through.
+    """
+    parts = urlsplit(base_url)
+    if parts.scheme != UNIX_SCHEME:
+        return base_url, None
+    return f"http://localhost{parts.path}", unquote(parts.netloc)
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_client(
+    timeout: float,
+    max_connections: int = 100,
+    max_keepalive: int = 20,
+    keepalive_expiry: float = 30.0,
+    http2: bool = False,
+    uds: Optional[str] = None,
+) -> tuple[httpx.AsyncClient, InstrumentedTransport]:
+    """Shared client with explicit pool limits.
+
+    ``http2`` needs the optional ``h2`` package (``pip install httpx[http2]``);
+    without it the client stays on HTTP/1.1. Over plain ``http://`` HTTP/2 is
+    spoken with prior knowledge, so the backend must accept h2c. ``uds``
+    routes every connection through that Unix domain socket.
+    """
+    use_http2 = http2 and http2_available()
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        http1=not use_http2,
+        http2=use_http2,
+        uds=uds,
+    )
+    instrumented = InstrumentedTransport(transport, max_connections)
+    return httpx.AsyncClient(timeout=timeout, transport=instrumented), instrumented
+
+
+async def warm_up(client: httpx.AsyncClient, url: str, connections: int, timeout: float) -> int:
+    """Open up to ``connections`` pooled connections before traffic arrives.
+
+    Sends concurrent ``OPTIONS`` requests, which no backend route answers
+    with database work. Failures are ignored: the backend may simply not be
+    up yet. Returns how many requests got a response.
+    """
+    if connections <= 0:
+        return 0
+
+    async def _one() -> bool:
+        try:
+            await client.request("OPTIONS", url, timeout=timeout)
+        except httpx.HTTPError:
+            return False
+        return True
+
+    results = await asyncio.gather(*(_one() for _ in range(connections)))
+    return sum(results)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Optional
+
+from . import jsoncodec
+
+
+class IdempotencyConflict(Exception):
+    """The Idempotency-Key was already used for a different request."""
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    task: Optional[asyncio.Future] = None
+    events: list[tuple[str, dict[str, Any]]] = field(default_factory=list)
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+    completed_at: Optional[float] = None
+
+
+class IdempotencyStore:
+    """Single-flight + TTL cache for chat runs keyed by Idempotency-Key.
+
+    Concurrent duplicates attach to the in-flight run; completed runs are
+    replayed until ``ttl_seconds`` after completion. Failed runs are dropped so
+    a retry executes again. At most ``max_entries`` completed runs are kept.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        # Completed runs, oldest completion first: expiry and eviction pop the front.
+        self._completed: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._max_entries = max(1, max_entries)
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self.hits = 0
+        self.joined = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def run(
+        self,
+        key: Hashable,
+        fingerprint: str,
+        factory: Callable[[], Awaitable[Any]],
+    ) -> tuple[Any, bool]:
+        """Return ``(result, replayed)`` for a request/response run."""
+        entry, created = self._get_or_start(key, fingerprint, lambda _entry: factory())
+        if not created:
+            self._count_reuse(entry)
+        return await asyncio.shield(entry.task), not created
+
+    def completed(self, key: Hashable, fingerprint: str) -> bool:
+        """True if ``key`` holds a finished run of this request, so serving it
+        is a replay that starts no work."""
+        self._purge()
+        entry = self._completed.get(key)
+        return entry is not None and entry.fingerprint == fingerprint
+
+    def stream(
+        self,
+        key: Hashable,
+        fingerprint: str,
+        factory: Callable[[], AsyncIterator[tuple[str, dict[str, Any]]]],
+    ) -> tuple[AsyncIterator[tuple[str, dict[str, Any]]], bool]:
+        """Return ``(events, replayed)`` for a streaming run.
+
+        Events are recorded as the producer yields them, so a duplicate that
+        arrives mid-run first replays what was already sent and then follows
+        the live run.
+        """
+
+        async def produce(entry: _Entry) -> None:
+            async for event in factory():
+                entry.events.append(event)
+                self._notify(entry)
+
+        entry, created = self._get_or_start(key, fingerprint, produce)
+        if not created:
+            self._count_reuse(entry)
+        return self._follow(entry), not created
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "joined": self.joined,
+            "misses": self.misses,
+        }
+
+    def _get_or_start(
+        self,
+        key: Hashable,
+        fingerprint: str,
+        start: Callable[[_Entry], Awaitable[Any]],
+    ) -> tuple[_Entry, bool]:
+        self._purge()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyConflict(key)
+            return entry, False
+
+        self.misses += 1
+        entry = _Entry(fingerprint=fingerprint)
+        entry.task = asyncio.ensure_future(start(entry))
+        entry.task.add_done_callback(lambda task: self._on_done(key, entry, task))
+        self._entries[key] = entry
+        self._evict()
+        return entry, True
+
+    def _on_done(self, key: Hashable, entry: _Entry, task: asyncio.Future) -> None:
+        entry.completed_at = self._clock()
+        self._notify(entry)
+        if self._entries.get(key) is not entry:
+            return
+        if task.cancelled() or task.exception() is not None:
+            del self._entries[key]
+        else:
+            self._completed[key] = entry
+
+    def _count_reuse(self, entry: _Entry) -> None:
+        if entry.task.done():
+            self.hits += 1
+        else:
+            self.joined += 1
+
+    async def _follow(
+        self, entry: _Entry
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        index = 0
+        while True:
+            while index < len(entry.events):
+                yield entry.events[index]
+                index += 1
+            if entry.task.done():
+                break
+            await entry.changed.wait()
+        # Re-raise producer failures so callers surface them like a fresh run.
+        await entry.task
+
+    def _notify(self, entry: _Entry) -> None:
+        changed = entry.changed
+        entry.changed = asyncio.Event()
+        changed.set()
+
+    def _purge(self) -> None:
+        now = self._clock()
+        while self._completed:
+            key, entry = next(iter(self._completed.items()))
+            if now - entry.completed_at < self._ttl:
+                break
+            self._drop_completed(key)
+
+    def _evict(self) -> None:
+        # In-flight runs are never evicted; their waiters still need them.
+        while len(self._entries) > self._max_entries and self._completed:
+            self._drop_completed(next(iter(self._completed)))
+
+    def _drop_completed(self, key: Hashable) -> None:
+        del self._completed[key]
+        del self._entries[key]
+
+
+def request_fingerprint(payload: Any) -> str:
+    raw = jsoncodec.dumps_bytes(payload, default=str, sort_keys=True)
+    return hashlib.sha256(raw).hexdigest()
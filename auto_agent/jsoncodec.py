@@ -0,0 +1,116 @@
+"""JSON encoding/decoding for the agent hot path.
+
+Uses ``orjson`` or ``msgspec`` when installed (``pip install orjson``) and
+falls back to the standard library. Every backend produces compact UTF-8
+output with non-ASCII characters kept as is and decodes to the same values,
+but the bytes are not guaranteed identical (float formatting, non-string
+keys), so text that must not change with the backend, such as the planner
+prompt, is not built here. ``JSON_CODEC`` forces a backend
+(``orjson``/``msgspec``/``json``); the default ``auto`` picks the first one
+available.
+"""
+from __future__ import annotations
+
+import importlib.util
+import json
+from typing import Any, Callable, Optional
+
+from .config import settings
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+Default = Optional[Callable[[Any], Any]]
+
+
+class JsonCodec:
+    """Standard library backend; subclasses swap in faster implementations."""
+
+    name = "json"
+
+    def dumps_bytes(self, value: Any, default: Default = None, sort_keys: bool = False) -> bytes:
+        return json.dumps(
+            value,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=default,
+            sort_keys=sort_keys,
+        ).encode("utf-8")
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps_bytes(self, value: Any, default: Default = None, sort_keys: bool = False) -> bytes:
+        option = self._orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= self._orjson.OPT_SORT_KEYS
+        return self._orjson.dumps(value, default=default, option=option)
+
+    def loads(self, data: bytes | str) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._msgspec = msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps_bytes(self, value: Any, default: Default = None, sort_keys: bool = False) -> bytes:
+        if default is None and not sort_keys:
+            return self._encoder.encode(value)
+        return self._msgspec.json.encode(
+            value, enc_hook=default, order="sorted" if sort_keys else None
+        )
+
+    def loads(self, data: bytes | str) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._msgspec.DecodeError as exc:
+            raise ValueError(str(exc)) from exc
+
+
+_CODECS = {"orjson": OrjsonCodec, "msgspec": MsgspecCodec, "json": JsonCodec}
+
+
+def available(name: str) -> bool:
+    return name == "json" or importlib.util.find_spec(name) is not None
+
+
+def get_codec(name: str = "auto") -> JsonCodec:
+    """The named backend if installed, otherwise the fastest available one."""
+    if name in _CODECS and available(name):
+        return _CODECS[name]()
+    for candidate in BACKENDS:
+        if available(candidate):
+            return _CODECS[candidate]()
+    return JsonCodec()
+
+
+codec = get_codec(settings.json_codec)
+
+
+def dumps_bytes(value: Any, default: Default = None, sort_keys: bool = False) -> bytes:
+    """Encode to UTF-8 JSON. Raises ``TypeError`` for unsupported values."""
+    return codec.dumps_bytes(value, default, sort_keys)
+
+
+def dumps(value: Any, default: Default = None, sort_keys: bool = False) -> str:
+    return codec.dumps_bytes(value, default, sort_keys).decode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode JSON. Raises ``ValueError`` for invalid or empty input."""
+    return codec.loads(data)
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from .llm_limiter import is_rate_limited
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class LlmEndpoint:
+    name: str
+    base_url: str
+    model: str
+    api_key: str
+
+
+@dataclass
+class EndpointHealth:
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    successes: int = 0
+    failures: int = 0
+    hedges_won: int = 0
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+
+def parse_endpoints(
+    raw: str, default_url: str, default_model: str, default_key: str
+) -> list[LlmEndpoint]:
+    """Parse ``LLM_ENDPOINTS``: comma-separated ``base_url[|model[|api_key]]``."""
+    endpoints: list[LlmEndpoint] = []
+    for index, item in enumerate(part.strip() for part in raw.split(",")):
+        if not item:
+            continue
+        url, _, rest = item.partition("|")
+        model, _, api_key = rest.partition("|")
+        endpoints.append(
+            LlmEndpoint(
+                name=f"llm-{index}",
+                base_url=url.strip(),
+                model=model.strip() or default_model,
+                api_key=api_key.strip() or default_key,
+            )
+        )
+    if not endpoints:
+        endpoints.append(
+            LlmEndpoint(
+                name="llm-0", base_url=default_url, model=default_model, api_key=default_key
+            )
+        )
+    return endpoints
+
+
+class EndpointPool:
+    """Failover and optional hedging across OpenAI-compatible endpoints.
+
+    Endpoints are tried in configured order, skipping ones that failed
+    ``failure_threshold`` times in a row until ``cooldown`` has passed; a 429
+    still fails over but does not count towards that: the endpoint is up,
+    just busy. With ``hedge`` enabled and at least ``hedge_min_samples`` latencies
+    seen for the primary, a second request goes to the next endpoint once the
+    first has been outstanding longer than the primary's latency quantile
+    (never sooner than ``hedge_min_delay``). Whichever succeeds first wins;
+    the other attempt is cancelled at the asyncio level only, so a provider
+    call already running in a worker thread keeps running and its answer is
+    dropped.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[LlmEndpoint],
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 0.5,
+        hedge_min_samples: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("at least one endpoint is required")
+        self.endpoints = endpoints
+        self._failure_threshold = max(1, failure_threshold)
+        self._cooldown = cooldown
+        self._hedge = hedge
+        self._hedge_quantile = hedge_quantile
+        self._hedge_min_delay = hedge_min_delay
+        self._hedge_min_samples = max(1, hedge_min_samples)
+        self._clock = clock
+        self._health = {endpoint.name: EndpointHealth() for endpoint in endpoints}
+        self.hedges_sent = 0
+        self.failovers = 0
+
+    async def call(self, fn: Callable[[LlmEndpoint], Awaitable[T]]) -> T:
+        candidates = self.candidates()
+        if self._hedge and len(candidates) > 1:
+            delay = self.hedge_delay(candidates[0])
+            if delay is not None:
+                return await self._call_hedged(fn, candidates, delay)
+
+        last_error: Optional[BaseException] = None
+        for index, endpoint in enumerate(candidates):
+            if index:
+                self.failovers += 1
+            try:
+                return await self._attempt(endpoint, fn)
+            except Exception as exc:
+                last_error = exc
+        assert last_error is not None
+        raise last_error
+
+    def candidates(self) -> list[LlmEndpoint]:
+        now = self._clock()
+        healthy = [ep for ep in self.endpoints if self._health[ep.name].open_until <= now]
+        # With everything marked down, still try all of them rather than fail fast.
+        return healthy or list(self.endpoints)
+
+    def hedge_delay(self, endpoint: LlmEndpoint) -> Optional[float]:
+        """Seconds to wait before hedging, or None until enough samples exist."""
+        samples = self._health[endpoint.name].latencies
+        if len(samples) < self._hedge_min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(self._hedge_quantile * len(ordered)))
+        return max(ordered[index], self._hedge_min_delay)
+
+    def stats(self) -> dict[str, Any]:
+        now = self._clock()
+        return {
+            "hedgesSent": self.hedges_sent,
+            "failovers": self.failovers,
+            "endpoints": [
+                {
+                    "name": ep.name,
+                    "baseUrl": ep.base_url,
+                    "healthy": self._health[ep.name].open_until <= now,
+                    "successes": self._health[ep.name].successes,
+                    "failures": self._health[ep.name].failures,
+                    "hedgesWon": self._health[ep.name].hedges_won,
+                    "hedgeDelayMs": _millis(self.hedge_delay(ep)),
+                }
+                for ep in self.endpoints
+            ],
+        }
+
+    async def _attempt(
+        self, endpoint: LlmEndpoint, fn: Callable[[LlmEndpoint], Awaitable[T]]
+    ) -> T:
+        started = self._clock()
+        try:
+            result = await fn(endpoint)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            if not is_rate_limited(exc):
+                self._record_failure(endpoint)
+            raise
+        self._record_success(endpoint, self._clock() - started)
+        return result
+
+    async def _call_hedged(
+        self,
+        fn: Callable[[LlmEndpoint], Awaitable[T]],
+        candidates: list[LlmEndpoint],
+        delay: float,
+    ) -> T:
+        remaining = list(candidates)
+        primary = remaining.pop(0)
+        running: dict[asyncio.Task, LlmEndpoint] = {
+            asyncio.ensure_future(self._attempt(primary, fn)): primary
+        }
+        last_error: Optional[BaseException] = None
+        try:
+            done, _ = await asyncio.wait(set(running), timeout=delay)
+            if not done and remaining:
+                self.hedges_sent += 1
+                backup = remaining.pop(0)
+                running[asyncio.ensure_future(self._attempt(backup, fn))] = backup
+
+            while running:
+                done, _ = await asyncio.wait(
+                    set(running), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    endpoint = running.pop(task)
+                    if task.exception() is None:
+                        if endpoint is not primary:
+                            self._health[endpoint.name].hedges_won += 1
+                        return task.result()
+                    last_error = task.exception()
+                if not running and remaining:
+                    # Both in-flight attempts failed: fail over sequentially.
+                    self.failovers += 1
+                    endpoint = remaining.pop(0)
+                    running[asyncio.ensure_future(self._attempt(endpoint, fn))] = endpoint
+        finally:
+            for task in running:
+                task.cancel()
+        assert last_error is not None
+        raise last_error
+
+    def _record_success(self, endpoint: LlmEndpoint, latency: float) -> None:
+        health = self._health[endpoint.name]
+        health.consecutive_failures = 0
+        health.open_until = 0.0
+        health.successes += 1
+        health.latencies.append(latency)
+
+    def _record_failure(self, endpoint: LlmEndpoint) -> None:
+        health = self._health[endpoint.name]
+        health.failures += 1
+        health.consecutive_failures += 1
+        if health.consecutive_failures >= self._failure_threshold:
+            health.open_until = self._clock() + self._cooldown
+
+
+def _millis(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
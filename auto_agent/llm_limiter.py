@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+_priority: ContextVar[str] = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+@contextmanager
+def use_priority(priority: str) -> Iterator[None]:
+    """Mark model calls made inside the block as ``interactive`` or ``background``."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"unknown priority: {priority}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class LimiterRejected(Exception):
+    """The call could not get a slot before its queue deadline."""
+
+
+class TokenBucket:
+    """Classic token bucket; ``rate <= 0`` disables rate limiting."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._rate = rate
+        self._burst = max(1, burst)
+        self._clock = clock
+        self._tokens = float(self._burst)
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def take(self) -> float:
+        """Take one token, sleeping until it is available. Returns seconds waited."""
+        if self._rate <= 0:
+            return 0.0
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._tokens = min(
+                    self._burst, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self._rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (milliseconds) with percentile estimates."""
+
+    BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+    def __init__(self) -> None:
+        self._counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        value = seconds * 1000
+        self._counts[bisect.bisect_left(self.BOUNDS_MS, value)] += 1
+        self.count += 1
+        self.total_ms += value
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples.
+
+        The overflow bucket reports the top bound: ``inf`` is not valid JSON.
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self._counts[:-1]):
+            seen += bucket_count
+            if seen >= rank:
+                return float(self.BOUNDS_MS[index])
+        return float(self.BOUNDS_MS[-1])
+
+    def as_dict(self) -> dict[str, Any]:
+        labels = [f"le{bound}" for bound in self.BOUNDS_MS] + ["inf"]
+        return {
+            "count": self.count,
+            "avgMs": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50Ms": self.percentile(0.5),
+            "p95Ms": self.percentile(0.95),
+            "p99Ms": self.percentile(0.99),
+            "buckets": dict(zip(labels, self._counts)),
+        }
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for calls to the model provider.
+
+    The limit grows by ``1 / limit`` per successful call (about +1 per round
+    trip) and is cut multiplicatively when the provider throttles us or when
+    latency drifts above ``latency_tolerance`` times the observed baseline.
+    Callers above the limit wait instead of failing, up to ``max_queue``
+    waiters and ``queue_timeout`` seconds each.
+
+    Waiters are scheduled by priority: interactive calls go first, and
+    background calls may only use the capacity left after
+    ``interactive_reserve`` slots. A background call that has waited
+    ``starvation_timeout`` seconds is served next regardless.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        max_queue: int = 256,
+        queue_timeout: float = 30.0,
+        interactive_reserve: int = 1,
+        starvation_timeout: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._min_limit = max(1, min_limit)
+        self._max_limit = max(self._min_limit, max_limit)
+        self._limit = float(min(max(initial_limit, self._min_limit), self._max_limit))
+        self._backoff = backoff
+        self._latency_tolerance = latency_tolerance
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._clock = clock
+        self._interactive_reserve = max(0, interactive_reserve)
+        self._starvation_timeout = starvation_timeout
+        self._in_flight = 0
+        self._waiters: dict[str, deque[tuple[float, asyncio.Future]]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+        self.wait_latency = {priority: LatencyHistogram() for priority in PRIORITIES}
+        self.call_latency = {priority: LatencyHistogram() for priority in PRIORITIES}
+        self._baseline: Optional[float] = None
+        self.throttled = 0
+        self.rejected = 0
+        self.completed = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    async def acquire(self, priority: str = INTERACTIVE) -> float:
+        """Wait for a slot; returns the seconds spent queued."""
+        queue = self._waiters[priority]
+        ahead = queue if priority == INTERACTIVE else self._queued()
+        if not ahead and self._has_room(priority):
+            self._in_flight += 1
+            self.wait_latency[priority].observe(0.0)
+            return 0.0
+        if self._queued() >= self._max_queue:
+            self.rejected += 1
+            raise LimiterRejected("model request queue is full")
+
+        enqueued_at = self._clock()
+        waiter: asyncio.Future = asyncio.get_running_loop().create_future()
+        entry = (enqueued_at, waiter)
+        queue.append(entry)
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=self._queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(queue, entry)
+            raise
+        if not done:
+            self._abandon(queue, entry)
+            self.rejected += 1
+            raise LimiterRejected("timed out waiting for a model request slot")
+        waited = self._clock() - enqueued_at
+        self.wait_latency[priority].observe(waited)
+        return waited
+
+    def observe_call(self, priority: str, seconds: float) -> None:
+        self.call_latency[priority].observe(seconds)
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False) -> None:
+        self._in_flight -= 1
+        if throttled:
+            self.throttled += 1
+            self._limit = max(self._min_limit, self._limit * self._backoff)
+        elif latency is not None:
+            self.completed += 1
+            self._on_latency(latency)
+        self._wake()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "inFlight": self._in_flight,
+            "queued": self._queued(),
+            "queuedByPriority": {
+                priority: len(queue) for priority, queue in self._waiters.items()
+            },
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "baselineLatencyMs": round((self._baseline or 0.0) * 1000, 3),
+            "waitLatency": {
+                priority: hist.as_dict() for priority, hist in self.wait_latency.items()
+            },
+            "callLatency": {
+                priority: hist.as_dict() for priority, hist in self.call_latency.items()
+            },
+        }
+
+    def _on_latency(self, latency: float) -> None:
+        if self._baseline is None:
+            self._baseline = latency
+            return
+        if latency > self._baseline * self._latency_tolerance:
+            # Queueing at the provider: back off gently before it starts 429ing.
+            self._limit = max(self._min_limit, self._limit * 0.9)
+        else:
+            self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+        # Track the fast path: drop quickly, drift up slowly.
+        if latency < self._baseline:
+            self._baseline = latency
+        else:
+            self._baseline = 0.95 * self._baseline + 0.05 * latency
+
+    def _queued(self) -> int:
+        return sum(len(queue) for queue in self._waiters.values())
+
+    def _has_room(self, priority: str) -> bool:
+        if priority == INTERACTIVE:
+            return self._in_flight < self.limit
+        # Keep headroom for interactive traffic, but never lock background out.
+        return self._in_flight < max(1, self.limit - self._interactive_reserve)
+
+    def _wake(self) -> None:
+        interactive = self._waiters[INTERACTIVE]
+        background = self._waiters[BACKGROUND]
+        while self._in_flight < self.limit:
+            if background and (
+                self._clock() - background[0][0] >= self._starvation_timeout
+            ):
+                queue = background
+            elif interactive:
+                queue = interactive
+            elif background and self._has_room(BACKGROUND):
+                queue = background
+            else:
+                break
+            _enqueued_at, waiter = queue.popleft()
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def _abandon(
+        self, queue: deque[tuple[float, asyncio.Future]], entry: tuple[float, asyncio.Future]
+    ) -> None:
+        waiter = entry[1]
+        if waiter.done() and not waiter.cancelled():
+            self.release()
+            return
+        waiter.cancel()
+        if entry in queue:
+            queue.remove(entry)
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    status = getattr(exc, "status_code", None)
+    response = getattr(exc, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    if status == 429:
+        return True
+    text = str(exc).lower()
+    return "status code: 429" in text or "rate limit" in text or "too many requests" in text
@@ -23,6 +23,7 @@ class Action(BaseModel):
 class Execution(BaseModel):
     status: Literal["success", "failed", "skipped"]
     result: Any = Field(default_factory=dict)
+    total: Optional[int] = None
 
 
 class ChatResponse(BaseModel):
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import threading
+from collections import defaultdict
+from typing import Any, Optional
+
+from . import jsoncodec
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _step(scratchpad: str) -> int:
+    return scratchpad.count("\nObservation: ")
+
+
+class PlannerCassette:
+    """Planner responses captured to / served from a JSON lines file.
+
+    ``record`` appends one line per plan: the prompt hash, the hash of the
+    conversation plus the ReAct step it was asked at, the structured plan and
+    the model latency. ``replay`` serves plans without touching the network,
+    matching on the prompt hash first and on conversation + step when the
+    observations differ (e.g. task ids from another store). Both indexes
+    point into one entry list, so an entry served through one key is not
+    served again through the other while unused entries still match;
+    repeated keys are served in recorded order, the last entry sticking once
+    the rest are used. Each answer is delayed by the recorded latency times
+    ``delay_scale``. Recording writes each line in a worker thread.
+    """
+
+    def __init__(self, path: str, mode: str, delay_scale: float = 1.0) -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.delay_scale = max(0.0, delay_scale)
+        self._entries: list[dict[str, Any]] = []
+        self._used: list[bool] = []
+        self._by_prompt: dict[str, list[int]] = defaultdict(list)
+        self._by_turn: dict[str, list[int]] = defaultdict(list)
+        self._write_lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        if mode == "replay":
+            self._load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    async def record(
+        self, prompt: str, conversation: str, scratchpad: str, plan: dict[str, Any], latency: float
+    ) -> None:
+        entry = {
+            "prompt": _digest(prompt),
+            "turn": _digest(conversation),
+            "step": _step(scratchpad),
+            "plan": plan,
+            "latency": round(latency, 4),
+        }
+        await asyncio.to_thread(self._append, jsoncodec.dumps(entry, default=str) + "\n")
+        self.recorded += 1
+
+    async def replay(
+        self, prompt: str, conversation: str, scratchpad: str
+    ) -> Optional[dict[str, Any]]:
+        prompt_key = _digest(prompt)
+        turn_key = f"{_digest(conversation)}:{_step(scratchpad)}"
+        entry = (
+            self._take(self._by_prompt.get(prompt_key))
+            or self._take(self._by_turn.get(turn_key))
+            or self._last(self._by_prompt.get(prompt_key))
+            or self._last(self._by_turn.get(turn_key))
+        )
+        if entry is None:
+            self.misses += 1
+            return None
+        self.replayed += 1
+        if self.delay_scale and entry.get("latency"):
+            await asyncio.sleep(entry["latency"] * self.delay_scale)
+        return copy.deepcopy(entry["plan"])
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "path": self.path,
+            "entries": len(self._entries),
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "misses": self.misses,
+        }
+
+    def _take(self, indexes: Optional[list[int]]) -> Optional[dict[str, Any]]:
+        """First unused entry under a key, marking it used."""
+        for index in indexes or ():
+            if not self._used[index]:
+                self._used[index] = True
+                return self._entries[index]
+        return None
+
+    def _last(self, indexes: Optional[list[int]]) -> Optional[dict[str, Any]]:
+        return self._entries[indexes[-1]] if indexes else None
+
+    def _append(self, line: str) -> None:
+        with self._write_lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(line)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                lines = handle.readlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                entry = jsoncodec.loads(line)
+                prompt_key, turn_key = entry["prompt"], f"{entry['turn']}:{entry['step']}"
+            except (ValueError, TypeError, KeyError):
+                # A torn last line from an interrupted recording is skipped.
+                continue
+            if not isinstance(entry.get("plan"), dict):
+                continue
+            self._by_prompt[prompt_key].append(len(self._entries))
+            self._by_turn[turn_key].append(len(self._entries))
+            self._entries.append(entry)
+            self._used.append(False)
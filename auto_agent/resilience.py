@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for calls to a downstream service.
+
+    ``failure_threshold`` consecutive failures open the circuit; while open
+    every call is refused immediately. After ``reset_timeout`` seconds up to
+    ``half_open_probes`` trial calls are let through: one success closes the
+    circuit again, a failure re-opens it for another ``reset_timeout``. A
+    call that ends with neither must ``abandon()`` so its probe is reused.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = max(1, failure_threshold)
+        self._reset_timeout = reset_timeout
+        self._half_open_probes = max(1, half_open_probes)
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.opened = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self._reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probes < self._half_open_probes:
+            self._probes += 1
+            return True
+        self.short_circuited += 1
+        return False
+
+    def record_success(self) -> None:
+        self._state = CLOSED
+        self._failures = 0
+        self._probes = 0
+
+    def abandon(self) -> None:
+        """A call ended without an outcome (e.g. cancelled): free its probe."""
+        if self._state == HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def record_failure(self) -> None:
+        if self._state == HALF_OPEN:
+            self._open()
+            return
+        self._failures += 1
+        if self._state == CLOSED and self._failures >= self._failure_threshold:
+            self._open()
+
+    def retry_after(self) -> float:
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self._reset_timeout - self._clock())
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutiveFailures": self._failures,
+            "opened": self.opened,
+            "shortCircuited": self.short_circuited,
+        }
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._failures = 0
+        self._probes = 0
+        self.opened += 1
+
+
+class RetryBudget:
+    """Shared retry allowance: retries may add at most ``ratio`` extra load.
+
+    Every first attempt deposits ``ratio`` tokens (capped at ``max_tokens``),
+    every retry spends one. During an outage the budget drains after a few
+    retries instead of multiplying traffic on a struggling backend.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0) -> None:
+        self._ratio = ratio
+        self._max_tokens = max_tokens
+        self._tokens = max_tokens
+        self.retries = 0
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        self._tokens = min(self._max_tokens, self._tokens + self._ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens >= 1:
+            self._tokens -= 1
+            self.retries += 1
+            return True
+        self.exhausted += 1
+        return False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "tokens": round(self._tokens, 3),
+            "retries": self.retries,
+            "exhausted": self.exhausted,
+        }
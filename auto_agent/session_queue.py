@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Awaitable, Callable, Optional
+
+from .models import ChatMessage
+
+Emit = Callable[[str, dict[str, Any]], Awaitable[None]]
+RunTurn = Callable[
+    [list[ChatMessage], dict[str, str], Optional[Emit]], Awaitable[dict[str, Any]]
+]
+
+
+@dataclass
+class _Turn:
+    messages: list[ChatMessage]
+    headers: dict[str, str]
+    emit: Optional[Emit]
+    run: RunTurn
+    future: asyncio.Future
+    enqueued_at: float
+    # The submitter's contextvars (priority, tracing span), not the drain task's.
+    context: contextvars.Context
+
+
+@dataclass
+class QueueStats:
+    queued: int = 0
+    max_queued: int = 0
+    turns: int = 0
+    merged: int = 0
+    waits: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    active_sessions: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        avg = self.wait_total / self.waits if self.waits else 0.0
+        return {
+            "queued": self.queued,
+            "maxQueued": self.max_queued,
+            "activeSessions": self.active_sessions,
+            "turns": self.turns,
+            "merged": self.merged,
+            "waitAvgMs": round(avg * 1000, 3),
+            "waitMaxMs": round(self.wait_max * 1000, 3),
+        }
+
+
+class SessionTurnQueue:
+    """Runs turns of the same session one at a time, in arrival order.
+
+    Different sessions never wait on each other. With ``merge`` enabled, user
+    messages that queued up behind a running turn are folded into a single
+    follow-up turn and every caller receives that turn's result. A running turn
+    whose callers have all been cancelled is cancelled too.
+    """
+
+    def __init__(
+        self, merge: bool = False, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._merge = merge
+        self._clock = clock
+        self._queues: dict[str, deque[_Turn]] = {}
+        self._drains: set[asyncio.Task] = set()
+        self._stats = QueueStats()
+
+    def depth(self, session_id: str) -> int:
+        queue = self._queues.get(session_id)
+        return len(queue) if queue else 0
+
+    def stats(self) -> dict[str, Any]:
+        self._stats.active_sessions = len(self._queues)
+        return self._stats.as_dict()
+
+    async def submit(
+        self,
+        session_id: Optional[str],
+        messages: list[ChatMessage],
+        headers: dict[str, str],
+        emit: Optional[Emit],
+        run: RunTurn,
+    ) -> dict[str, Any]:
+        if not session_id:
+            # A new session id is minted inside the run, nobody can race on it.
+            return await run(messages, headers, emit)
+
+        turn = _Turn(
+            messages=messages,
+            headers=headers,
+            emit=emit,
+            run=run,
+            future=asyncio.get_running_loop().create_future(),
+            enqueued_at=self._clock(),
+            context=contextvars.copy_context(),
+        )
+        queue = self._queues.get(session_id)
+        if queue is None:
+            queue = deque()
+            self._queues[session_id] = queue
+            queue.append(turn)
+            drain = asyncio.create_task(self._drain(session_id, queue))
+            self._drains.add(drain)
+            drain.add_done_callback(self._drains.discard)
+        else:
+            queue.append(turn)
+        self._stats.queued += 1
+        self._stats.max_queued = max(self._stats.max_queued, self._stats.queued)
+        return await turn.future
+
+    async def _drain(self, session_id: str, queue: deque[_Turn]) -> None:
+        batch: list[_Turn] = []
+        try:
+            while queue:
+                batch = self._take(queue)
+                if not batch:
+                    continue
+                now = self._clock()
+                for turn in batch:
+                    wait = now - turn.enqueued_at
+                    self._stats.wait_total += wait
+                    self._stats.wait_max = max(self._stats.wait_max, wait)
+                    self._stats.waits += 1
+                self._stats.turns += 1
+                self._stats.merged += len(batch) - 1
+
+                head = batch[0]
+                running = asyncio.create_task(
+                    head.run(_merge_messages(batch), head.headers, _fan_out(batch)),
+                    context=head.context,
+                )
+                for turn in batch:
+                    turn.future.add_done_callback(partial(_stop_if_abandoned, batch, running))
+                try:
+                    result = await running
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        raise
+                    # The run was cancelled, not the drain (normally because
+                    # every caller went away); the next turn still runs.
+                    for turn in batch:
+                        turn.future.cancel()
+                    continue
+                except Exception as exc:
+                    for turn in batch:
+                        if not turn.future.done():
+                            turn.future.set_exception(exc)
+                    continue
+                for turn in batch:
+                    if not turn.future.done():
+                        turn.future.set_result(result)
+        except asyncio.CancelledError:
+            # Nothing will run these turns any more; don't leave callers hanging.
+            for turn in [*batch, *queue]:
+                turn.future.cancel()
+            self._stats.queued -= len(queue)
+            queue.clear()
+            raise
+        finally:
+            if self._queues.get(session_id) is queue:
+                del self._queues[session_id]
+
+    def _take(self, queue: deque[_Turn]) -> list[_Turn]:
+        batch: list[_Turn] = []
+        while queue:
+            turn = queue[0]
+            if turn.future.cancelled():
+                queue.popleft()
+                self._stats.queued -= 1
+                continue
+            if batch and not (
+                self._merge
+                and len(turn.messages) == 1
+                and len(batch[0].messages) == 1
+                and turn.headers == batch[0].headers
+            ):
+                break
+            queue.popleft()
+            self._stats.queued -= 1
+            batch.append(turn)
+            if not self._merge:
+                break
+        return batch
+
+
+def _stop_if_abandoned(
+    batch: list[_Turn], running: asyncio.Task, _future: asyncio.Future
+) -> None:
+    if all(turn.future.cancelled() for turn in batch):
+        running.cancel()
+
+
+def _merge_messages(batch: list[_Turn]) -> list[ChatMessage]:
+    if len(batch) == 1:
+        return batch[0].messages
+    # A multi-message list means "replace history" to the agent, so fold the
+    # queued user inputs into one message to keep append semantics.
+    content = "\n".join(turn.messages[0].content for turn in batch)
+    return [ChatMessage(role="user", content=content)]
+
+
+def _fan_out(batch: list[_Turn]) -> Optional[Emit]:
+    emits = [turn.emit for turn in batch if turn.emit is not None]
+    if not emits:
+        return None
+    if len(emits) == 1:
+        return emits[0]
+
+    async def emit(event_type: str, payload: dict[str, Any]) -> None:
+        for target in emits:
+            await target(event_type, payload)
+
+    return emit
@@ -0,0 +1,406 @@
+from __future__ import annotations
+
+import base64
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from . import jsoncodec
+from .task_api import BATCH_LIMIT, MAX_PAGE_SIZE, TASK_FIELDS, ApiResult, project_task
+
+VALID_STATUSES = ("待办", "进行中", "已完成", "已延期", "已取消")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '待办',
+    tags TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    deleted_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_id ON tasks (user_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_deleted_at ON tasks (deleted_at);
+"""
+
+
+class SqliteTaskApi:
+    """In-process task store with the same contract as ``TaskApi``.
+
+    Mirrors the Go service (``backend/services/task.go`` and
+    ``backend/api/task.go``): per-user ownership, status validation, tag
+    filtering via ``LIKE`` on the JSON array, ``created_at`` ordering, soft
+    deletes, all-or-nothing batch mutations and ``since`` deltas with
+    tombstones. Queries run directly on the event loop; they are short enough
+    that a thread hop would cost more.
+    """
+
+    def __init__(self, path: str, auth_token: Optional[str] = None) -> None:
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._auth_token = auth_token
+        self.calls = 0
+
+    async def list_tasks(
+        self,
+        headers: dict[str, str],
+        status: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        since: Optional[str] = None,
+        statuses: Optional[list[str]] = None,
+        q: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ApiResult:
+        user_id, error = self._authorize(headers)
+        if error is not None:
+            return error
+        if not user_id:
+            return _error(400, "INVALID_REQUEST", "用户ID不能为空")
+        if fields and any(name not in TASK_FIELDS for name in fields):
+            return _error(400, "INVALID_REQUEST", "无效的 fields 参数")
+        after = _decode_cursor(cursor) if cursor else None
+        if (limit is not None and not 1 <= limit <= MAX_PAGE_SIZE) or (cursor and not after):
+            return _error(400, "INVALID_REQUEST", "无效的分页参数")
+        if cursor and not limit:
+            limit = MAX_PAGE_SIZE
+
+        if since:
+            try:
+                since = _normalize(since)
+            except ValueError:
+                return _error(400, "INVALID_REQUEST", "无效的 since 参数")
+            rows = self._db.execute(
+                "SELECT * FROM tasks WHERE user_id = ? AND (updated_at >= ? OR deleted_at >= ?)"
+                " ORDER BY created_at ASC",
+                (user_id, since, since),
+            ).fetchall()
+            return _ok(
+                200,
+                [project_task(_to_response(row), fields) for row in rows],
+                _sync_token(rows) or since,
+            )
+
+        sql = "SELECT * FROM tasks WHERE user_id = ? AND deleted_at IS NULL"
+        params: list[Any] = [user_id]
+        wanted = [*([status] if status else []), *(statuses or [])]
+        if any(value not in VALID_STATUSES for value in wanted):
+            return _error(400, "INVALID_REQUEST", "无效的状态参数")
+        if wanted:
+            sql += f" AND status IN ({', '.join('?' * len(wanted))})"
+            params.extend(wanted)
+        for tag in tags or []:
+            sql += " AND json_array_length(tags) > 0 AND json_extract(tags, '$') LIKE ?"
+            params.append(f"%{tag.strip()}%")
+        if q and q.strip():
+            pattern = f"%{_escape_like(q.strip())}%"
+            sql += " AND (title LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')"
+            params.extend([pattern, pattern])
+        if after:
+            sql += " AND (created_at > ? OR (created_at = ? AND id > ?))"
+            params.extend([after[0], after[0], after[1]])
+        sql += " ORDER BY created_at ASC, id ASC"
+        if not limit:
+            rows = self._db.execute(sql, params).fetchall()
+            # Only the full, unfiltered list is a base that deltas can build on.
+            full = len(params) == 1
+            return _ok(
+                200,
+                [project_task(_to_response(row), fields) for row in rows],
+                _sync_token(rows) if full else None,
+            )
+
+        rows = self._db.execute(sql + " LIMIT ?", (*params, limit + 1)).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1])
+        result = _ok(200, [project_task(_to_response(row), fields) for row in rows])
+        result.next_cursor = next_cursor
+        return result
+
+    async def get_task(self, task_id: str, headers: dict[str, str]) -> ApiResult:
+        user_id, error = self._authorize(headers)
+        if error is not None:
+            return error
+        row, error = self._owned(task_id, user_id)
+        if error is not None:
+            return error
+        return _ok(200, _to_response(row))
+
+    async def create_task(
+        self,
+        headers: dict[str, str],
+        title: str,
+        description: Optional[str],
+        tags: Optional[list[str]],
+    ) -> ApiResult:
+        user_id, error = self._authorize(headers)
+        if error is not None:
+            return error
+        if not user_id:
+            return _error(400, "INVALID_REQUEST", "用户ID不能为空")
+        if not title or not title.strip():
+            return _error(400, "INVALID_REQUEST", "标题不能为空")
+
+        now = _now()
+        task_id = str(uuid.uuid4())
+        self._db.execute(
+            "INSERT INTO tasks (id, user_id, title, description, status, tags, created_at,"
+            " updated_at) VALUES (?, ?, ?, ?, '待办', ?, ?, ?)",
+            (task_id, user_id, title, description or "", _dump_tags(tags), now, now),
+        )
+        row = self._db.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return _ok(201, _to_response(row))
+
+    async def update_task(
+        self,
+        task_id: str,
+        headers: dict[str, str],
+        title: Optional[str],
+        description: Optional[str],
+        status: Optional[str],
+        tags: Optional[list[str]],
+    ) -> ApiResult:
+        user_id, error = self._authorize(headers)
+        if error is not None:
+            return error
+        if status and status not in VALID_STATUSES:
+            return _error(400, "INVALID_STATUS", "无效的任务状态")
+        row, error = self._owned(task_id, user_id)
+        if error is not None:
+            return error
+
+        # Same as the Go handler: empty strings mean "leave unchanged".
+        updates: dict[str, Any] = {"updated_at": _now()}
+        if title:
+            updates["title"] = title
+        if description:
+            updates["description"] = description
+        if status:
+            updates["status"] = status
+        if tags is not None:
+            updates["tags"] = _dump_tags(tags)
+        assignments = ", ".join(f"{column} = ?" for column in updates)
+        self._db.execute(
+            f"UPDATE tasks SET {assignments} WHERE id = ?", (*updates.values(), task_id)
+        )
+        row = self._db.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return _ok(200, _to_response(row))
+
+    async def delete_task(self, task_id: str, headers: dict[str, str]) -> ApiResult:
+        user_id, error = self._authorize(headers)
+        if error is not None:
+            return error
+        _row, error = self._owned(task_id, user_id)
+        if error is not None:
+            return error
+        self._db.execute("UPDATE tasks SET deleted_at = ? WHERE id = ?", (_now(), task_id))
+        return _ok(200, {"message": "删除成功"})
+
+    async def update_tasks(
+        self,
+        task_ids: list[str],
+        headers: dict[str, str],
+        title: Optional[str],
+        description: Optional[str],
+        status: Optional[str],
+        tags: Optional[list[str]],
+    ) -> ApiResult:
+        user_id, error = self._authorize(headers)
+        if error is not None:
+            return error
+        task_ids = list(dict.fromkeys(task_ids))
+        if not task_ids or len(task_ids) > BATCH_LIMIT:
+            return _error(400, "INVALID_REQUEST", "请求参数错误")
+        if status and status not in VALID_STATUSES:
+            return _error(400, "INVALID_REQUEST", "请求参数错误")
+
+        updates: dict[str, Any] = {"updated_at": _now()}
+        if title:
+            updates["title"] = title
+        if description:
+            updates["description"] = description
+        if status:
+            updates["status"] = status
+        if tags is not None:
+            updates["tags"] = _dump_tags(tags)
+        assignments = ", ".join(f"{column} = ?" for column in updates)
+
+        self._db.execute("BEGIN")
+        try:
+            owned, failed = self._owned_many(task_ids, user_id)
+            rows: list[sqlite3.Row] = []
+            # All-or-nothing, like the Go service: one bad id updates nothing.
+            if not failed:
+                marks = ", ".join("?" * len(owned))
+                self._db.execute(
+                    f"UPDATE tasks SET {assignments} WHERE id IN ({marks})",
+                    (*updates.values(), *owned),
+                )
+                rows = self._db.execute(
+                    f"SELECT * FROM tasks WHERE id IN ({marks}) ORDER BY created_at ASC", owned
+                ).fetchall()
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return _ok(200, {"updated": [_to_response(row) for row in rows], "failed": failed})
+
+    async def delete_tasks(self, task_ids: list[str], headers: dict[str, str]) -> ApiResult:
+        user_id, error = self._authorize(headers)
+        if error is not None:
+            return error
+        task_ids = list(dict.fromkeys(task_ids))
+        if not task_ids or len(task_ids) > BATCH_LIMIT:
+            return _error(400, "INVALID_REQUEST", "请求参数错误")
+
+        self._db.execute("BEGIN")
+        try:
+            owned, failed = self._owned_many(task_ids, user_id)
+            if failed:
+                owned = []
+            else:
+                marks = ", ".join("?" * len(owned))
+                self._db.execute(
+                    f"UPDATE tasks SET deleted_at = ? WHERE id IN ({marks})", (_now(), *owned)
+                )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return _ok(200, {"deleted": [{"taskId": task_id} for task_id in owned], "failed": failed})
+
+    def stats(self) -> dict[str, Any]:
+        (count,) = self._db.execute(
+            "SELECT COUNT(*) FROM tasks WHERE deleted_at IS NULL"
+        ).fetchone()
+        return {"store": "sqlite", "tasks": count, "calls": self.calls}
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _authorize(self, headers: dict[str, str]) -> tuple[str, Optional[ApiResult]]:
+        self.calls += 1
+        normalized = {key.lower(): value for key, value in headers.items()}
+        if self._auth_token and normalized.get("authorization") != f"Bearer {self._auth_token}":
+            return "", _error(401, "UNAUTHORIZED", "认证失败")
+        return normalized.get("x-user-id", ""), None
+
+    def _owned(
+        self, task_id: str, user_id: str
+    ) -> tuple[Optional[sqlite3.Row], Optional[ApiResult]]:
+        row = self._db.execute(
+            "SELECT * FROM tasks WHERE id = ? AND deleted_at IS NULL", (task_id,)
+        ).fetchone()
+        if row is None:
+            return None, _error(404, "TASK_NOT_FOUND", "任务不存在")
+        if row["user_id"] != user_id:
+            return None, _error(403, "FORBIDDEN", "无权访问该任务")
+        return row, None
+
+    def _owned_many(
+        self, task_ids: list[str], user_id: str
+    ) -> tuple[list[str], list[dict[str, Any]]]:
+        marks = ", ".join("?" * len(task_ids))
+        rows = self._db.execute(
+            f"SELECT id, user_id FROM tasks WHERE id IN ({marks}) AND deleted_at IS NULL",
+            task_ids,
+        ).fetchall()
+        owners = {row["id"]: row["user_id"] for row in rows}
+        owned: list[str] = []
+        failed: list[dict[str, Any]] = []
+        for task_id in task_ids:
+            if task_id not in owners:
+                failed.append(_failure(task_id, "TASK_NOT_FOUND", "任务不存在"))
+            elif owners[task_id] != user_id:
+                failed.append(_failure(task_id, "FORBIDDEN", "无权访问该任务"))
+            else:
+                owned.append(task_id)
+        return owned, failed
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _sync_token(rows: list[sqlite3.Row]) -> Optional[str]:
+    """Latest change among the returned rows; ``since`` for the next delta."""
+    stamps = [stamp for row in rows for stamp in (row["updated_at"], row["deleted_at"]) if stamp]
+    return max(stamps) if stamps else None
+
+
+def _normalize(value: str) -> str:
+    """Parse an RFC3339 timestamp into the stored (UTC, microsecond) form."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _rfc3339(value: str) -> str:
+    return datetime.fromisoformat(value).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _encode_cursor(row: sqlite3.Row) -> str:
+    raw = f"{row['created_at']}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Optional[tuple[str, str]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except ValueError:
+        return None
+    created_at, _, task_id = raw.partition("|")
+    return (created_at, task_id) if created_at and task_id else None
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _dump_tags(tags: Optional[list[str]]) -> Optional[str]:
+    return None if tags is None else jsoncodec.dumps(tags)
+
+
+def _to_response(row: sqlite3.Row) -> dict[str, Any]:
+    response = {
+        "taskId": row["id"],
+        "userId": row["user_id"],
+        "title": row["title"],
+        "description": row["description"],
+        "status": row["status"],
+        "tags": jsoncodec.loads(row["tags"]) if row["tags"] else None,
+        "createdAt": _rfc3339(row["created_at"]),
+        "updatedAt": _rfc3339(row["updated_at"]),
+    }
+    if row["deleted_at"]:
+        response["deleted"] = True
+    return response
+
+
+def _ok(status_code: int, data: Any, sync_token: Optional[str] = None) -> ApiResult:
+    return ApiResult(ok=True, status_code=status_code, data=data, sync_token=sync_token)
+
+
+def _error(status_code: int, code: str, message: str) -> ApiResult:
+    return ApiResult(
+        ok=False,
+        status_code=status_code,
+        error={"code": code, "message": message},
+        data={"error": {"code": code, "message": message}},
+    )
+
+
+def _failure(task_id: str, code: str, message: str) -> dict[str, Any]:
+    return {"taskId": task_id, "error": {"code": code, "message": message}}
@@ -1,10 +1,33 @@
 from __future__ import annotations
 
+import asyncio
+import math
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any, Optional
 
 import httpx
 
+from . import jsoncodec, tracing
+from .resilience import CircuitBreaker, RetryBudget
+
+RETRYABLE_STATUS = {502, 503, 504}
+# Largest ``taskIds`` list the backend batch endpoints accept per request.
+BATCH_LIMIT = 500
+# Largest ``limit`` GET /api/tasks accepts; a cursor without a limit pages at this size.
+MAX_PAGE_SIZE = 500
+# Names accepted by the ``fields`` projection of GET /api/tasks.
+TASK_FIELDS = (
+    "taskId",
+    "userId",
+    "title",
+    "description",
+    "status",
+    "tags",
+    "createdAt",
+    "updatedAt",
+)
+
 
 @dataclass
 class ApiResult:
@@ -12,28 +35,96 @@ class ApiResult:
     status_code: int
     data: Any = None
     error: Optional[dict[str, Any]] = None
+    etag: Optional[str] = None
+    sync_token: Optional[str] = None
+    next_cursor: Optional[str] = None
+
+
+@dataclass
+class _CachedRead:
+    etag: str
+    data: Any
+    next_cursor: Optional[str] = None
 
 
 class TaskApi:
-    def __init__(self, base_url: str, client: httpx.AsyncClient) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        client: httpx.AsyncClient,
+        breaker: Optional[CircuitBreaker] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        timeouts: Optional[dict[str, float]] = None,
+        connect_timeout: Optional[float] = None,
+        max_retries: int = 2,
+        cache_entries: int = 256,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
         self.client = client
+        self.breaker = breaker or CircuitBreaker()
+        self.retry_budget = retry_budget or RetryBudget()
+        # Per-operation read timeouts ("list", "get", "write"); unset uses the client's.
+        self.timeouts = timeouts or {}
+        self.connect_timeout = connect_timeout
+        self.max_retries = max(0, max_retries)
+        self._inflight: dict[tuple[Any, ...], asyncio.Future] = {}
+        self.coalesced = 0
+        # Last validated body per (user, path, params), revalidated with If-None-Match.
+        self._cache: OrderedDict[tuple[Any, ...], _CachedRead] = OrderedDict()
+        self._cache_entries = max(0, cache_entries)
+        self.not_modified = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "breaker": self.breaker.stats(),
+            "retryBudget": self.retry_budget.stats(),
+            "inflightReads": len(self._inflight),
+            "coalescedReads": self.coalesced,
+            "cachedReads": len(self._cache),
+            "notModified": self.not_modified,
+        }
 
     async def list_tasks(
         self,
         headers: dict[str, str],
         status: Optional[str] = None,
         tags: Optional[list[str]] = None,
+        since: Optional[str] = None,
+        statuses: Optional[list[str]] = None,
+        q: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> ApiResult:
+        """List tasks, filtered and projected by the backend.
+
+        ``statuses`` matches any of the given statuses (combined with
+        ``status``), ``q`` is a substring of the title or description and
+        ``fields`` limits each task to those keys plus ``taskId``. With
+        ``limit`` the backend returns one page; pass the result's
+        ``next_cursor`` as ``cursor`` for the next one until it is ``None``.
+        """
         params: dict[str, str] = {}
         if status:
             params["status"] = status
+        if statuses:
+            params["statuses"] = ",".join(statuses)
         if tags:
             params["tags"] = ",".join(tags)
-        return await self._request("GET", "/tasks", headers=headers, params=params)
+        if q:
+            params["q"] = q
+        if fields:
+            params["fields"] = ",".join(fields)
+        if limit:
+            params["limit"] = str(limit)
+        if cursor:
+            params["cursor"] = cursor
+        if since:
+            params["since"] = since
+        return await self._read("/tasks", headers, params, operation="list")
 
     async def get_task(self, task_id: str, headers: dict[str, str]) -> ApiResult:
-        return await self._request("GET", f"/tasks/{task_id}", headers=headers)
+        return await self._read(f"/tasks/{task_id}", headers, None, operation="get")
 
     async def create_task(
         self,
@@ -72,6 +163,144 @@ class TaskApi:
     async def delete_task(self, task_id: str, headers: dict[str, str]) -> ApiResult:
         return await self._request("DELETE", f"/tasks/{task_id}", headers=headers)
 
+    async def update_tasks(
+        self,
+        task_ids: list[str],
+        headers: dict[str, str],
+        title: Optional[str],
+        description: Optional[str],
+        status: Optional[str],
+        tags: Optional[list[str]],
+    ) -> ApiResult:
+        payload: dict[str, Any] = {}
+        if title is not None:
+            payload["title"] = title
+        if description is not None:
+            payload["description"] = description
+        if status is not None:
+            payload["status"] = status
+        if tags is not None:
+            payload["tags"] = tags
+        return await self._batch("PUT", "/tasks/batch", task_ids, headers, payload, "updated")
+
+    async def delete_tasks(self, task_ids: list[str], headers: dict[str, str]) -> ApiResult:
+        return await self._batch("POST", "/tasks/batch/delete", task_ids, headers, {}, "deleted")
+
+    async def _batch(
+        self,
+        method: str,
+        path: str,
+        task_ids: list[str],
+        headers: dict[str, str],
+        payload: dict[str, Any],
+        done_key: str,
+    ) -> ApiResult:
+        """Send ``task_ids`` in chunks of ``BATCH_LIMIT`` and merge the results.
+
+        Each chunk is one backend transaction. A chunk that fails outright is
+        reported per id in ``failed``; if there is only one chunk its error
+        is returned as is.
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        if len(task_ids) <= BATCH_LIMIT:
+            return await self._request(
+                method, path, headers=headers, json={"taskIds": task_ids, **payload}
+            )
+
+        merged: dict[str, list[Any]] = {done_key: [], "failed": []}
+        for start in range(0, len(task_ids), BATCH_LIMIT):
+            chunk = task_ids[start : start + BATCH_LIMIT]
+            result = await self._request(
+                method, path, headers=headers, json={"taskIds": chunk, **payload}
+            )
+            if not result.ok:
+                merged["failed"].extend(
+                    {"taskId": task_id, "error": result.error} for task_id in chunk
+                )
+                continue
+            data = result.data or {}
+            merged[done_key].extend(data.get(done_key) or [])
+            merged["failed"].extend(data.get("failed") or [])
+        return ApiResult(ok=True, status_code=200, data=merged)
+
+    async def _read(
+        self,
+        path: str,
+        headers: dict[str, str],
+        params: Optional[dict[str, str]],
+        operation: str,
+    ) -> ApiResult:
+        """Single-flight GET: concurrent identical reads share one backend call.
+
+        The shared ApiResult is handed to every waiter, so callers must treat
+        ``data`` as read-only.
+        """
+        key = (
+            request_identity(headers),
+            "GET",
+            path,
+            tuple(sorted((params or {}).items())),
+        )
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.ensure_future(
+            self._conditional_get(key, path, headers, params, operation)
+        )
+        self._inflight[key] = future
+        future.add_done_callback(lambda done: self._drop_inflight(key, done))
+        # Shielded so one caller giving up does not cancel the read for the others.
+        return await asyncio.shield(future)
+
+    async def _conditional_get(
+        self,
+        key: tuple[Any, ...],
+        path: str,
+        headers: dict[str, str],
+        params: Optional[dict[str, str]],
+        operation: str,
+    ) -> ApiResult:
+        cached = self._cache.get(key)
+        request_headers = headers
+        if cached is not None:
+            request_headers = {**headers, "If-None-Match": cached.etag}
+        result = await self._request(
+            "GET", path, headers=request_headers, params=params, operation=operation
+        )
+        if result.status_code == 304 and cached is not None:
+            self.not_modified += 1
+            self._cache.move_to_end(key)
+            return ApiResult(
+                ok=True,
+                status_code=200,
+                data=cached.data,
+                etag=cached.etag,
+                sync_token=result.sync_token,
+                next_cursor=cached.next_cursor,
+            )
+        if result.ok and result.etag and self._cache_entries:
+            self._cache[key] = _CachedRead(
+                etag=result.etag, data=result.data, next_cursor=result.next_cursor
+            )
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_entries:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.pop(key, None)
+        return result
+
+    def _drop_inflight(self, key: tuple[Any, ...], future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def _forget_reads(self, headers: dict[str, str]) -> None:
+        # Reads already in flight may predate this write; later readers must not join them.
+        identity = request_identity(headers)
+        for key in [key for key in self._inflight if key[0] == identity]:
+            del self._inflight[key]
+
     async def _request(
         self,
         method: str,
@@ -79,25 +308,74 @@ class TaskApi:
         headers: dict[str, str],
         params: Optional[dict[str, str]] = None,
         json: Any = None,
+        operation: str = "write",
+    ) -> ApiResult:
+        with tracing.span("task_api.request", method=method, operation=operation) as span:
+            result = await self._send(method, path, headers, params, json, operation)
+            span.set_attribute("status_code", result.status_code)
+            return result
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        headers: dict[str, str],
+        params: Optional[dict[str, str]],
+        json: Any,
+        operation: str,
     ) -> ApiResult:
         url = f"{self.base_url}{path}"
-        try:
-            response = await self.client.request(
-                method,
-                url,
-                headers=headers,
-                params=params,
-                json=json,
-            )
-        except httpx.RequestError as exc:
-            return ApiResult(
-                ok=False,
-                status_code=502,
-                error={"code": "BAD_GATEWAY", "message": f"任务服务不可用: {exc}"},
-            )
+        if method != "GET":
+            self._forget_reads(headers)
+        # Only idempotent reads are retried, and only while the shared budget lasts.
+        retries = self.max_retries if method == "GET" else 0
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                return self._circuit_open()
+            try:
+                response = await self.client.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    json=json,
+                    timeout=self._timeout(operation),
+                )
+            except httpx.RequestError as exc:
+                self.breaker.record_failure()
+                if attempt < retries and self.retry_budget.try_spend():
+                    attempt += 1
+                    await asyncio.sleep(0.05 * attempt)
+                    continue
+                return ApiResult(
+                    ok=False,
+                    status_code=502,
+                    error={"code": "BAD_GATEWAY", "message": f"任务服务不可用: {exc}"},
+                )
+            except BaseException:
+                # Cancelled or not the backend's doing: no verdict, but don't strand a probe.
+                self.breaker.abandon()
+                raise
+
+            if response.status_code >= 500:
+                # Any 5xx is the backend failing; only gateway-style ones are retried.
+                self.breaker.record_failure()
+                if (
+                    response.status_code in RETRYABLE_STATUS
+                    and attempt < retries
+                    and self.retry_budget.try_spend()
+                ):
+                    attempt += 1
+                    await asyncio.sleep(0.05 * attempt)
+                    continue
+            else:
+                self.breaker.record_success()
+            break
 
         try:
-            payload = response.json()
+            payload = jsoncodec.loads(response.content)
         except ValueError:
             payload = None
 
@@ -120,4 +398,71 @@ class TaskApi:
         if isinstance(payload, dict) and "data" in payload:
             payload = payload.get("data")
 
-        return ApiResult(ok=True, status_code=response.status_code, data=payload)
+        return ApiResult(
+            ok=True,
+            status_code=response.status_code,
+            data=payload,
+            etag=response.headers.get("ETag"),
+            sync_token=response.headers.get("X-Sync-Token"),
+            next_cursor=response.headers.get("X-Next-Cursor"),
+        )
+
+    def _timeout(self, operation: str) -> Any:
+        read = self.timeouts.get(operation)
+        if read is None:
+            return httpx.USE_CLIENT_DEFAULT
+        return httpx.Timeout(read, connect=self.connect_timeout or read)
+
+    def _circuit_open(self) -> ApiResult:
+        retry_after = max(1, math.ceil(self.breaker.retry_after()))
+        return ApiResult(
+            ok=False,
+            status_code=502,
+            error={
+                "code": "BAD_GATEWAY",
+                "message": f"任务服务暂时不可用，请约 {retry_after} 秒后重试",
+            },
+        )
+
+
+def request_identity(headers: dict[str, str]) -> tuple[tuple[str, str], ...]:
+    """Hashable identity of the caller: all headers, so users never share reads."""
+    return tuple(sorted((key.lower(), value) for key, value in headers.items()))
+
+
+def matches_keyword(task: dict[str, Any], q: Optional[str]) -> bool:
+    """Local equivalent of the backend ``q`` filter."""
+    if not q:
+        return True
+    needle = q.strip().lower()
+    return needle in str(task.get("title") or "").lower() or needle in str(
+        task.get("description") or ""
+    ).lower()
+
+
+def project_task(task: dict[str, Any], fields: Optional[list[str]]) -> dict[str, Any]:
+    """Local equivalent of the backend ``fields`` projection."""
+    if not fields:
+        return task
+    projected = {"taskId": task.get("taskId")}
+    for name in fields:
+        if name in task:
+            projected[name] = task[name]
+    if task.get("deleted"):
+        projected["deleted"] = True
+    return projected
+
+
+def page_tasks(
+    tasks: list[dict[str, Any]], limit: Optional[int], cursor: Optional[str]
+) -> tuple[list[dict[str, Any]], Optional[str]]:
+    """Local equivalent of ``limit``/``cursor`` paging for in-memory lists.
+
+    The cursor is the offset of the next page, so it is only meaningful for
+    the list it came from.
+    """
+    if not limit and not cursor:
+        return tasks, None
+    start = int(cursor) if cursor else 0
+    end = start + (limit or MAX_PAGE_SIZE)
+    return tasks[start:end], str(end) if end < len(tasks) else None
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from .task_api import (
+    MAX_PAGE_SIZE,
+    ApiResult,
+    TaskApi,
+    matches_keyword,
+    project_task,
+    request_identity,
+)
+
+
+@dataclass
+class _UserReplica:
+    tasks: dict[str, dict[str, Any]] = field(default_factory=dict)
+    sync_token: Optional[str] = None
+    syncs_started: int = 0
+    last_synced: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class TaskReplica:
+    """Per-user local copy of tasks, kept current with ``since`` deltas.
+
+    The first read for a user pulls the full list; later reads only fetch
+    tasks changed since the previous ``X-Sync-Token`` and apply them, dropping
+    tombstoned (``deleted``) tasks. Filtering happens locally with the same
+    rules as the backend. If the backend does not return a sync token the
+    replica simply reloads the full list on every read. Pages are ordered by
+    ``(createdAt, taskId)`` and the cursor is the last key served, like the
+    backend's, so a sync between two pages neither skips nor repeats tasks.
+    """
+
+    def __init__(self, task_api: TaskApi, max_users: int = 1000) -> None:
+        self.task_api = task_api
+        self._max_users = max(1, max_users)
+        self._replicas: OrderedDict[tuple[Any, ...], _UserReplica] = OrderedDict()
+        self.full_syncs = 0
+        self.delta_syncs = 0
+        self.delta_tasks = 0
+
+    async def list_tasks(
+        self,
+        headers: dict[str, str],
+        status: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        statuses: Optional[list[str]] = None,
+        q: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> ApiResult:
+        if cursor:
+            # Later pages of a listing read what its first page just synced.
+            replica = self._replica(request_identity(headers))
+        else:
+            replica, error = await self._sync(headers)
+            if error is not None:
+                return error
+        wanted = [*([status] if status else []), *(statuses or [])]
+        after = _decode_cursor(cursor) if cursor else None
+        matching = sorted(
+            (
+                task
+                for task in replica.tasks.values()
+                if _matches(task, wanted, tags)
+                and matches_keyword(task, q)
+                and (after is None or _order_key(task) > after)
+            ),
+            key=_order_key,
+        )
+        page, next_cursor = matching, None
+        if limit or cursor:
+            page = matching[: limit or MAX_PAGE_SIZE]
+            if len(matching) > len(page):
+                next_cursor = _encode_cursor(page[-1])
+        return ApiResult(
+            ok=True,
+            status_code=200,
+            data=[project_task(task, fields) for task in page],
+            next_cursor=next_cursor,
+        )
+
+    async def get_task(self, task_id: str, headers: dict[str, str]) -> ApiResult:
+        replica, error = await self._sync(headers)
+        if error is None and task_id in replica.tasks:
+            return ApiResult(ok=True, status_code=200, data=replica.tasks[task_id])
+        # Unknown ids go to the backend so 404/403 keep their usual errors.
+        return await self.task_api.get_task(task_id, headers)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "users": len(self._replicas),
+            "tasks": sum(len(replica.tasks) for replica in self._replicas.values()),
+            "fullSyncs": self.full_syncs,
+            "deltaSyncs": self.delta_syncs,
+            "deltaTasks": self.delta_tasks,
+        }
+
+    async def _sync(
+        self, headers: dict[str, str]
+    ) -> tuple[_UserReplica, Optional[ApiResult]]:
+        replica = self._replica(request_identity(headers))
+        arrived_after = replica.syncs_started
+        async with replica.lock:
+            if replica.last_synced > arrived_after:
+                # A sync that started after we arrived already finished: fresh enough.
+                return replica, None
+            replica.syncs_started += 1
+            sync_id = replica.syncs_started
+            if replica.sync_token is None:
+                result = await self.task_api.list_tasks(headers)
+                if not result.ok:
+                    return replica, result
+                replica.tasks = {
+                    _task_id(task): task for task in result.data or [] if _task_id(task)
+                }
+                self.full_syncs += 1
+            else:
+                result = await self.task_api.list_tasks(headers, since=replica.sync_token)
+                if not result.ok:
+                    return replica, result
+                for task in result.data or []:
+                    task_id = _task_id(task)
+                    if not task_id:
+                        continue
+                    if task.get("deleted"):
+                        replica.tasks.pop(task_id, None)
+                    else:
+                        replica.tasks[task_id] = task
+                self.delta_syncs += 1
+                self.delta_tasks += len(result.data or [])
+            replica.sync_token = result.sync_token
+            replica.last_synced = sync_id
+        return replica, None
+
+    def _replica(self, identity: tuple[Any, ...]) -> _UserReplica:
+        replica = self._replicas.get(identity)
+        if replica is None:
+            replica = _UserReplica()
+            self._replicas[identity] = replica
+            while len(self._replicas) > self._max_users:
+                self._replicas.popitem(last=False)
+        else:
+            self._replicas.move_to_end(identity)
+        return replica
+
+
+def _task_id(task: dict[str, Any]) -> Optional[str]:
+    return task.get("taskId") or task.get("id")
+
+
+def _order_key(task: dict[str, Any]) -> tuple[str, str]:
+    return task.get("createdAt") or "", _task_id(task) or ""
+
+
+def _encode_cursor(task: dict[str, Any]) -> str:
+    created_at, task_id = _order_key(task)
+    return base64.urlsafe_b64encode(f"{created_at}|{task_id}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except ValueError:
+        # Not one of ours: start over rather than fail the listing.
+        return "", ""
+    created_at, _, task_id = raw.partition("|")
+    return created_at, task_id
+
+
+def _matches(task: dict[str, Any], statuses: list[str], tags: Optional[list[str]]) -> bool:
+    if statuses and task.get("status") not in statuses:
+        return False
+    if tags:
+        # Same as the backend's LIKE on the JSON array: each tag is a substring match.
+        task_tags = task.get("tags") or []
+        return all(any(tag in item for item in task_tags) for tag in tags)
+    return True
@@ -52,40 +52,100 @@ def _pick_free_port() -> int:
         return sock.getsockname()[1]
 
 
-def _start_agent_server(task_api_base: str) -> tuple[str, subprocess.Popen]:
+def _is_up(url: str) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=2) as resp:
+            return resp.status == 200
+    except OSError:
+        return False
+
+
+def _start_uvicorn(target: str, env: dict, ready, factory: bool = False):
     port = _pick_free_port()
     base_url = f"http://127.0.0.1:{port}"
-    env = dict(os.environ)
-    env.setdefault("TASK_API_BASE_URL", task_api_base)
-
-    cmd = [
-        sys.executable,
-        "-m",
-        "uvicorn",
-        "auto_agent.app:app",
-        "--host",
-        "127.0.0.1",
-        "--port",
-        str(port),
-        "--log-level",
-        "warning",
-    ]
+    cmd = [sys.executable, "-m", "uvicorn", target]
+    if factory:
+        cmd.append("--factory")
+    cmd += ["--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
     proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
     deadline = time.time() + 8
     while time.time() < deadline:
-        if _is_agent_available(base_url):
+        if ready(base_url):
             return base_url, proc
         if proc.poll() is not None:
             break
         time.sleep(0.2)
 
     proc.terminate()
-    raise RuntimeError("Failed to start Auto Agent server for tests")
+    raise RuntimeError(f"Failed to start {target} for tests")
+
+
+def _start_agent_server(
+    task_api_base: str, llm_base: str | None = None
+) -> tuple[str, subprocess.Popen]:
+    env = dict(os.environ)
+    env.setdefault("TASK_API_BASE_URL", task_api_base)
+    if llm_base:
+        env["DEEPSEEK_BASE_URL"] = llm_base
+    return _start_uvicorn("auto_agent.app:app", env, _is_agent_available)
+
+
+def _stop(proc) -> None:
+    if proc and proc.poll() is None:
+        proc.terminate()
+        proc.wait(timeout=5)
+
+
+def _use_fakes() -> bool:
+    """AUTO_AGENT_FAKES=1 runs the suite against local fake LLM/Task API servers."""
+    return os.getenv("AUTO_AGENT_FAKES", "").lower() in {"1", "true", "yes"}
 
 
 @pytest.fixture(scope="session")
-def agent_server():
+def fake_task_api():
+    """Base URL (ending in /api) of an in-memory Task API on the Go routes."""
+    base_url, proc = _start_uvicorn(
+        "auto_agent.fakes.task_api:create_app",
+        dict(os.environ),
+        lambda url: _is_up(f"{url}/stats"),
+        factory=True,
+    )
+    try:
+        yield f"{base_url}/api"
+    finally:
+        _stop(proc)
+
+
+@pytest.fixture(scope="session")
+def fake_llm():
+    """Base URL of the OpenAI-compatible fake planner LLM (see auto_agent.fakes.llm)."""
+    base_url, proc = _start_uvicorn(
+        "auto_agent.fakes.llm:create_app",
+        dict(os.environ),
+        lambda url: _is_up(f"{url}/stats"),
+        factory=True,
+    )
+    try:
+        yield base_url
+    finally:
+        _stop(proc)
+
+
+@pytest.fixture(scope="session")
+def agent_server(request):
+    if _use_fakes():
+        task_api_base = request.getfixturevalue("fake_task_api")
+        llm_base = request.getfixturevalue("fake_llm")
+        # Scenarios read TASK_API_BASE_URL to seed and check tasks directly.
+        os.environ["TASK_API_BASE_URL"] = task_api_base
+        base_url, proc = _start_agent_server(task_api_base, llm_base)
+        try:
+            yield base_url
+        finally:
+            _stop(proc)
+        return
+
     raw_base = os.getenv("AUTO_AGENT_BASE_URL")
     task_api_base = os.getenv("TASK_API_BASE_URL", "http://localhost:8080/api")
     proc = None
@@ -100,8 +160,7 @@ def agent_server():
         base_url, proc = _start_agent_server(task_api_base)
         yield base_url
     finally:
-        if proc and proc.poll() is None:
-            proc.terminate()
+        _stop(proc)
 
 
 @pytest.fixture(scope="session")
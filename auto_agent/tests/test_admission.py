@@ -0,0 +1,263 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.requests import ClientDisconnect
+
+from auto_agent.admission import AdmissionController, AdmissionRejected
+from auto_agent.agent_core import AgentCore, SessionStore
+from auto_agent.app import app
+from auto_agent.idempotency import IdempotencyStore
+from test_agent_scenarios import FakeTaskApi
+
+
+def _stream_scope(query="message=hi&userId=u1&deviceId=d1", headers=()):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/agent/chat/stream",
+        "raw_path": b"/agent/chat/stream",
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"authorization", b"Bearer t"), *headers],
+        "client": ("127.0.0.1", 1),
+        "server": ("test", 80),
+    }
+
+
+async def _disconnected():
+    return {"type": "http.disconnect"}
+
+
+async def _leave_after_first_event(message):
+    # The client reads the first event, then the connection drops.
+    if message["type"] == "http.response.body" and message["body"]:
+        raise OSError("client went away")
+
+
+class GatedPlanner:
+    """Plans one list step, then holds the turn until ``gate`` opens."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.calls = 0
+        self.cancelled = False
+
+    async def plan(self, _conversation, _scratchpad):
+        self.calls += 1
+        if self.calls == 1:
+            return {"thought": "先查", "action": "list_tasks", "action_input": {}}
+        try:
+            await self.gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"thought": "", "action": "final", "action_input": {}, "final": "好的"}
+
+
+@pytest.mark.asyncio
+async def test_limits_concurrent_runs_and_queues_the_rest():
+    controller = AdmissionController(
+        max_concurrent=2, max_queue=10, queue_timeout=1, per_user_limit=10
+    )
+    active = 0
+    peak = 0
+
+    async def run(user_id):
+        nonlocal active, peak
+        async with controller.slot(user_id):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(run(f"user-{idx}") for idx in range(6)))
+
+    assert peak == 2
+    stats = controller.stats()
+    assert stats["admitted"] == 6
+    assert stats["running"] == 0 and stats["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_shed_with_503():
+    controller = AdmissionController(
+        max_concurrent=1, max_queue=0, queue_timeout=1, per_user_limit=10
+    )
+    await controller.acquire("a")
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await controller.acquire("b")
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.retry_after >= 1
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_deadline_returns_503():
+    controller = AdmissionController(
+        max_concurrent=1, max_queue=5, queue_timeout=0.01, per_user_limit=10
+    )
+    await controller.acquire("a")
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await controller.acquire("b")
+    assert exc_info.value.status_code == 503
+    assert controller.stats()["timedOut"] == 1
+    assert controller.stats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_per_user_limit_returns_429():
+    controller = AdmissionController(
+        max_concurrent=4, max_queue=10, queue_timeout=1, per_user_limit=2
+    )
+    await controller.acquire("heavy")
+    await controller.acquire("heavy")
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await controller.acquire("heavy")
+    assert exc_info.value.status_code == 429
+    await controller.acquire("light")
+
+
+@pytest.mark.asyncio
+async def test_freed_slots_rotate_between_users():
+    controller = AdmissionController(
+        max_concurrent=1, max_queue=10, queue_timeout=1, per_user_limit=10
+    )
+    await controller.acquire("holder")
+    order = []
+
+    async def wait(user_id):
+        await controller.acquire(user_id)
+        order.append(user_id)
+
+    waiters = [asyncio.create_task(wait("heavy")) for _ in range(3)]
+    await asyncio.sleep(0)
+    waiters.append(asyncio.create_task(wait("light")))
+    await asyncio.sleep(0)
+
+    controller.release("holder")
+    for idx in range(4):
+        while len(order) <= idx:
+            await asyncio.sleep(0)
+        controller.release(order[idx])
+    await asyncio.gather(*waiters)
+
+    assert order[:2] == ["heavy", "light"]
+
+
+@pytest.mark.asyncio
+async def test_stream_slot_is_released_when_client_leaves_before_the_body(monkeypatch):
+    class SlowAgent:
+        async def handle_chat_stream(self, *_args, **_kwargs):
+            await asyncio.sleep(10)
+            yield "done", {}
+
+    controller = AdmissionController(
+        max_concurrent=1, max_queue=0, queue_timeout=1, per_user_limit=1
+    )
+    monkeypatch.setattr(app.state, "admission", controller, raising=False)
+    monkeypatch.setattr(app.state, "agent_core", SlowAgent(), raising=False)
+
+    async def send(message):
+        # The connection is already gone when the response starts.
+        raise OSError("client went away")
+
+    with pytest.raises(ClientDisconnect):
+        await app(_stream_scope(), _disconnected, send)
+
+    stats = controller.stats()
+    assert stats["admitted"] == 1
+    assert stats["running"] == 0
+
+
+@pytest.fixture
+def gated_app(monkeypatch):
+    planner = GatedPlanner()
+    agent = AgentCore(FakeTaskApi([]), SessionStore(6), planner)
+    controller = AdmissionController(
+        max_concurrent=1, max_queue=0, queue_timeout=1, per_user_limit=1
+    )
+    monkeypatch.setattr(app.state, "admission", controller, raising=False)
+    monkeypatch.setattr(app.state, "agent_core", agent, raising=False)
+    monkeypatch.setattr(
+        app.state, "idempotency", IdempotencyStore(10, 60), raising=False
+    )
+    return agent, planner, controller
+
+
+async def _until(condition):
+    while not condition():
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_keyed_stream_holds_its_slot_until_the_run_ends(gated_app):
+    _agent, planner, controller = gated_app
+    scope = _stream_scope(headers=[(b"idempotency-key", b"k1")])
+
+    with pytest.raises(ClientDisconnect):
+        await app(scope, _disconnected, _leave_after_first_event)
+
+    # The keyed run outlives the response so a retry can replay it.
+    await asyncio.wait_for(_until(lambda: planner.calls == 2), 1)
+    assert not planner.cancelled
+    assert controller.stats()["running"] == 1
+
+    planner.gate.set()
+    await asyncio.wait_for(_until(lambda: controller.stats()["running"] == 0), 1)
+
+
+@pytest.mark.asyncio
+async def test_unkeyed_stream_cancels_its_run_on_disconnect(gated_app):
+    agent, planner, controller = gated_app
+    scope = _stream_scope("message=hi&sessionId=s1&userId=u1&deviceId=d1")
+
+    with pytest.raises(ClientDisconnect):
+        await app(scope, _disconnected, _leave_after_first_event)
+
+    await asyncio.wait_for(_until(lambda: controller.stats()["running"] == 0), 1)
+    await asyncio.wait_for(agent._idle.wait(), 1)
+    # The gate never opened, so the run was stopped rather than finished.
+    messages = await agent.session_store.get_messages("s1")
+    assert all(message.role == "user" for message in messages)
+
+
+@pytest.mark.asyncio
+async def test_replay_of_a_finished_run_skips_admission(gated_app):
+    _agent, planner, controller = gated_app
+    planner.gate.set()
+    identity = {"Authorization": "Bearer t", "X-User-ID": "u1", "X-Device-ID": "d1"}
+    body = {"messages": [{"role": "user", "content": "hi"}]}
+    stream = {"message": "hi", "userId": "u1", "deviceId": "d1"}
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post("/agent/chat", json=body, headers={**identity, "Idempotency-Key": "c1"})
+        await client.get(
+            "/agent/chat/stream", params=stream, headers={**identity, "Idempotency-Key": "s1"}
+        )
+        await asyncio.wait_for(_until(lambda: controller.stats()["running"] == 0), 1)
+        await controller.acquire("u1")
+
+        chat = await client.post(
+            "/agent/chat", json=body, headers={**identity, "Idempotency-Key": "c1"}
+        )
+        replayed_stream = await client.get(
+            "/agent/chat/stream", params=stream, headers={**identity, "Idempotency-Key": "s1"}
+        )
+        fresh = await client.post(
+            "/agent/chat", json=body, headers={**identity, "Idempotency-Key": "c2"}
+        )
+
+    assert chat.status_code == 200
+    assert chat.headers["Idempotent-Replayed"] == "true"
+    assert replayed_stream.status_code == 200
+    assert replayed_stream.headers["Idempotent-Replayed"] == "true"
+    assert "event: done" in replayed_stream.text
+    assert fresh.status_code == 429
+    assert controller.stats()["running"] == 1
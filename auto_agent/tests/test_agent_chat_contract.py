@@ -6,12 +6,19 @@ Required env:
 - AUTO_AGENT_DEVICE_ID
 Optional env:
 - AUTO_AGENT_TOKEN (default default-token)
+
+How the response body is built is checked in-process.
 """
 
 import json
 import urllib.error
 import urllib.request
 
+import pytest
+from pydantic import ValidationError
+
+from auto_agent.app import _chat_response
+
 ALLOWED_INTENTS = {"create", "list", "detail", "update", "delete", "clarify"}
 ALLOWED_EXECUTION_STATUS = {"success", "failed", "skipped"}
 
@@ -91,3 +98,20 @@ def test_chat_missing_messages_returns_400(agent_config):
 
     status, _data = _post_json(url, payload, agent_config["headers"])
     assert status in {400, 422}
+
+
+def test_chat_response_keeps_large_results_and_total_as_is():
+    tasks = [{"taskId": f"t{i}", "title": f"任务{i}"} for i in range(1000)]
+    result = {
+        "sessionId": "s1",
+        "assistantMessage": "好了",
+        "action": {"intent": "list", "params": {}},
+        "execution": {"status": "success", "result": tasks, "total": 5000},
+    }
+
+    response = _chat_response(result, replayed=True)
+
+    assert json.loads(response.body) == result
+    assert response.headers["Idempotent-Replayed"] == "true"
+    with pytest.raises(ValidationError):
+        _chat_response({**result, "execution": {"status": "done", "result": []}})
@@ -7,6 +7,8 @@ Required env:
 Optional env:
 - AUTO_AGENT_TOKEN (default default-token)
 - AUTO_AGENT_ENABLE_SSE_TEST=1 to enable this test
+
+The paged ``page`` events of a large list are checked in-process.
 """
 
 import json
@@ -16,6 +18,32 @@ import urllib.request
 
 import pytest
 
+from auto_agent.agent_core import AgentCore, SessionStore
+from auto_agent.config import settings
+from auto_agent.models import ChatMessage
+
+from test_agent_scenarios import FakeTaskApi, StepPlanner
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    monkeypatch.setattr(settings, "task_list_page_size", 50)
+    monkeypatch.setattr(settings, "task_list_result_limit", 10)
+
+
+def _list_planner():
+    return StepPlanner(
+        [
+            {
+                "thought": "",
+                "action": "list_tasks",
+                "action_input": {"query": {"status": "待办"}},
+                "final": "",
+            },
+            {"thought": "", "action": "final", "action_input": {}, "final": "好了"},
+        ]
+    )
+
 
 @pytest.mark.integration
 def test_sse_stream_contract(agent_config):
@@ -37,7 +65,7 @@ def test_sse_stream_contract(agent_config):
         method="GET",
     )
 
-    allowed_events = {"delta", "action", "execution", "done", "error"}
+    allowed_events = {"delta", "action", "page", "execution", "done", "error"}
     seen_events = set()
     last_event = None
 
@@ -69,3 +97,31 @@ def test_sse_stream_contract(agent_config):
                     break
 
     assert "done" in seen_events
+
+
+@pytest.mark.asyncio
+async def test_large_list_streams_pages_and_keeps_a_bounded_window(small_pages):
+    tasks = [
+        {"taskId": f"t{i}", "title": f"任务{i}", "status": "待办", "tags": []}
+        for i in range(120)
+    ]
+    session_store = SessionStore(6)
+    agent = AgentCore(FakeTaskApi(tasks), session_store, _list_planner())
+
+    events = [
+        event
+        async for event in agent.handle_chat_stream(
+            None, [ChatMessage(role="user", content="列出待办")], headers={}
+        )
+    ]
+
+    pages = [payload for event_type, payload in events if event_type == "page"]
+    assert [page["count"] for page in pages] == [50, 50, 20]
+    assert pages[0]["taskIds"] == [f"t{i}" for i in range(50)]
+    assert "tasks" not in pages[0]
+    assert pages[-1]["nextCursor"] is None
+    execution = next(payload for event_type, payload in events if event_type == "execution")
+    assert len(execution["result"]) == 10
+    assert execution["total"] == 120
+    session_id = events[-1][1]["sessionId"]
+    assert len(await session_store.get_recent(session_id)) == 10
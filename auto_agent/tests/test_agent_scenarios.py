@@ -1,18 +1,42 @@
+import asyncio
+
 import pytest
 
-from auto_agent.agent_core import AgentCore, SessionStore
+from auto_agent.agent_core import (
+    AgentCore,
+    MessageRecord,
+    SessionStore,
+    TaskRef,
+    search_keyword,
+    step_fingerprint,
+)
 from auto_agent.models import ChatMessage
-from auto_agent.task_api import ApiResult
+from auto_agent.task_api import ApiResult, matches_keyword, page_tasks, project_task
 
 
 class FakeTaskApi:
     def __init__(self, tasks):
         self.tasks = tasks
+        self.batch_calls = 0
 
-    async def list_tasks(self, headers, status=None, tags=None):
+    async def list_tasks(
+        self,
+        headers,
+        status=None,
+        tags=None,
+        statuses=None,
+        q=None,
+        fields=None,
+        limit=None,
+        cursor=None,
+    ):
         tasks = list(self.tasks)
         if status:
             tasks = [task for task in tasks if task.get("status") == status]
+        if statuses:
+            tasks = [task for task in tasks if task.get("status") in statuses]
+        if q:
+            tasks = [task for task in tasks if matches_keyword(task, q)]
         if tags:
             required = set(tags)
             tasks = [
@@ -20,7 +44,13 @@ class FakeTaskApi:
                 for task in tasks
                 if required.issubset(set(task.get("tags") or []))
             ]
-        return ApiResult(ok=True, status_code=200, data=tasks)
+        page, next_cursor = page_tasks(tasks, limit, cursor)
+        return ApiResult(
+            ok=True,
+            status_code=200,
+            data=[project_task(task, fields) for task in page],
+            next_cursor=next_cursor,
+        )
 
     async def get_task(self, task_id, headers):
         for task in self.tasks:
@@ -74,6 +104,35 @@ class FakeTaskApi:
         )
 
 
+    def _batch_failures(self, task_ids):
+        known = {task.get("taskId") for task in self.tasks}
+        return [
+            {"taskId": task_id, "error": {"code": "TASK_NOT_FOUND", "message": "任务不存在"}}
+            for task_id in task_ids
+            if task_id not in known
+        ]
+
+    async def update_tasks(self, task_ids, headers, title, description, status, tags):
+        self.batch_calls += 1
+        failed = self._batch_failures(task_ids)
+        updated = []
+        if not failed:
+            for task_id in task_ids:
+                result = await self.update_task(task_id, headers, title, description, status, tags)
+                updated.append(result.data)
+        return ApiResult(ok=True, status_code=200, data={"updated": updated, "failed": failed})
+
+    async def delete_tasks(self, task_ids, headers):
+        self.batch_calls += 1
+        failed = self._batch_failures(task_ids)
+        deleted = []
+        if not failed:
+            for task_id in task_ids:
+                await self.delete_task(task_id, headers)
+                deleted.append({"taskId": task_id})
+        return ApiResult(ok=True, status_code=200, data={"deleted": deleted, "failed": failed})
+
+
 class StepPlanner:
     def __init__(self, steps):
         self.steps = steps
@@ -286,3 +345,152 @@ async def test_delete_tasks_by_recent_selection_indices():
     assert second["execution"]["status"] == "success"
     remaining_titles = [task["title"] for task in tasks]
     assert remaining_titles == ["正式任务C"]
+
+
+@pytest.mark.asyncio
+async def test_status_list_and_keyword_are_filtered_by_task_service():
+    class RecordingTaskApi(FakeTaskApi):
+        def __init__(self, tasks):
+            super().__init__(tasks)
+            self.calls = []
+
+        async def list_tasks(self, headers, **kwargs):
+            self.calls.append(kwargs)
+            return await super().list_tasks(headers, **kwargs)
+
+    tasks = [
+        {"taskId": "t1", "title": "写周报", "description": "", "status": "待办", "tags": []},
+        {"taskId": "t2", "title": "周会", "description": "", "status": "已完成", "tags": []},
+        {"taskId": "t3", "title": "健身", "description": "每周", "status": "进行中", "tags": []},
+    ]
+    api = RecordingTaskApi(tasks)
+    planner = StepPlanner(
+        [
+            {
+                "thought": "",
+                "action": "list_tasks",
+                "action_input": {
+                    "query": {"status_list": ["待办", "进行中", "待办"], "keyword": "周任务"}
+                },
+                "final": "",
+            }
+        ]
+    )
+    agent = AgentCore(api, SessionStore(6), planner)
+
+    result = await agent.handle_chat(
+        None, [ChatMessage(role="user", content="未完成的周相关任务")], headers={}
+    )
+
+    assert [task["taskId"] for task in result["execution"]["result"]] == ["t1", "t3"]
+    assert len(api.calls) == 1
+    assert api.calls[0]["statuses"] == ["待办", "进行中"]
+    assert api.calls[0]["q"] == "周"
+    assert search_keyword("'周报'任务") == "'周报'"
+    assert search_keyword("“周报”") == "“周报”"
+    assert search_keyword('"周报"') == "周报"
+
+
+@pytest.mark.asyncio
+async def test_repeated_step_cycle_stops_the_loop():
+    tasks = [
+        {"taskId": "t1", "title": "写周报", "description": "", "status": "待办", "tags": []},
+        {"taskId": "t2", "title": "健身", "description": "", "status": "进行中", "tags": []},
+    ]
+    pending = {"thought": "", "action": "list_tasks", "action_input": {"query": {"status": "待办"}}}
+    doing = {"thought": "", "action": "list_tasks", "action_input": {"query": {"status": "进行中"}}}
+    planner = StepPlanner([pending, doing, pending, doing, pending])
+    agent = AgentCore(FakeTaskApi(tasks), SessionStore(6), planner)
+
+    result = await agent.handle_chat(
+        None, [ChatMessage(role="user", content="看看我的任务")], headers={}
+    )
+
+    assert planner.index == 3
+    assert [task["taskId"] for task in result["execution"]["result"]] == ["t1"]
+    assert step_fingerprint(
+        "list_tasks",
+        {"query": {"status": "待办", "tags": None}},
+        {"status": "success", "result": [{"taskId": "t1", "title": "a"}]},
+    ) == step_fingerprint(
+        "list_tasks",
+        {"query": {"tags": None, "status": "待办"}},
+        {"status": "success", "result": [{"taskId": "t1", "title": "b"}]},
+    )
+    # hash(-1) == hash(-2): steps that only collide must still differ.
+    assert step_fingerprint("get_task", {"n": -1}, {"status": "success"}) != step_fingerprint(
+        "get_task", {"n": -2}, {"status": "success"}
+    )
+
+
+class FailingPlanner:
+    async def plan(self, _conversation, _scratchpad):
+        raise RuntimeError("planner down")
+
+
+class BlockingPlanner:
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    async def plan(self, _conversation, _scratchpad):
+        self.started.set()
+        await asyncio.Event().wait()
+
+
+async def _collect(events):
+    return [event async for event in events]
+
+
+@pytest.mark.asyncio
+async def test_stream_ends_with_error_when_turn_raises():
+    agent = AgentCore(FakeTaskApi([]), SessionStore(6), FailingPlanner())
+
+    events = await asyncio.wait_for(
+        _collect(agent.handle_chat_stream(None, [ChatMessage(role="user", content="hi")], {})),
+        1,
+    )
+
+    assert events == [("error", {"code": "INTERNAL_ERROR", "message": "planner down"})]
+
+
+@pytest.mark.asyncio
+async def test_stream_ends_with_error_when_queued_turn_is_cancelled():
+    planner = BlockingPlanner()
+    agent = AgentCore(FakeTaskApi([]), SessionStore(6), planner)
+    message = [ChatMessage(role="user", content="hi")]
+
+    running = asyncio.create_task(_collect(agent.handle_chat_stream("s1", message, {})))
+    await planner.started.wait()
+    queued = asyncio.create_task(_collect(agent.handle_chat_stream("s1", message, {})))
+    while agent.session_queue.depth("s1") < 1:
+        await asyncio.sleep(0)
+
+    (drain,) = agent.session_queue._drains
+    drain.cancel()
+
+    cancelled = ("error", {"code": "CANCELLED", "message": "对话已取消"})
+    assert await asyncio.wait_for(running, 1) == [cancelled]
+    assert await asyncio.wait_for(queued, 1) == [cancelled]
+
+
+@pytest.mark.asyncio
+async def test_session_store_keeps_compact_records():
+    store = SessionStore(2)
+    task = {
+        "taskId": "t1",
+        "userId": "u1",
+        "title": "写周报",
+        "description": "很长的描述" * 100,
+        "status": "待办",
+        "tags": ["work"],
+    }
+    await store.set_recent("s1", [task])
+    await store.append_messages(
+        "s1", [ChatMessage(role="user", content=text) for text in ["一", "二", "三"]]
+    )
+
+    assert await store.get_recent("s1") == [TaskRef("t1", "写周报", "待办", ("work",))]
+    assert await store.get_messages("s1") == [
+        MessageRecord("user", "二"),
+        MessageRecord("user", "三"),
+    ]
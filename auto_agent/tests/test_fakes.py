@@ -0,0 +1,71 @@
+import json
+import uuid
+
+import httpx
+import pytest
+
+from auto_agent.fakes import FakeLlm, create_llm_app, create_task_api_app
+
+
+def test_fake_llm_plans_from_last_user_message():
+    llm = FakeLlm()
+    prompt = "对话：\nuser: 创建任务：旧任务\nuser: 给周报任务加上标签work\n已有思考与观察：\n"
+    plan = llm.plan(prompt)
+    assert plan["action"] == "update_task"
+    assert plan["action_input"] == {"tags": ["work"], "query": {"keyword": "周报"}}
+
+    created = llm.plan("user: 创建任务：买牛奶")
+    assert created["action_input"] == {"title": "买牛奶"}
+
+    assert llm.plan(prompt + "Observation: {}")["action"] == "final"
+    assert llm.plan("user: 你好")["final"]
+
+
+def test_fake_llm_script_runs_before_rules():
+    scripted = {"thought": "", "action": "final", "action_input": {}, "final": "脚本"}
+    llm = FakeLlm(script=[scripted])
+    assert llm.plan("user: 列出任务") == scripted
+    assert llm.plan("user: 列出任务")["action"] == "list_tasks"
+
+
+@pytest.mark.asyncio
+async def test_fake_llm_streams_openai_chunks():
+    transport = httpx.ASGITransport(app=create_llm_app(FakeLlm()))
+    async with httpx.AsyncClient(transport=transport, base_url="http://fake") as client:
+        resp = await client.post(
+            "/chat/completions",
+            json={"stream": True, "messages": [{"role": "user", "content": "user: 列出任务"}]},
+        )
+        lines = [line[6:] for line in resp.text.splitlines() if line.startswith("data: ")]
+        assert lines[-1] == "[DONE]"
+        content = "".join(
+            json.loads(line)["choices"][0]["delta"].get("content", "") for line in lines[:-1]
+        )
+        assert json.loads(content)["action"] == "list_tasks"
+        assert (await client.get("/stats")).json()["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fake_task_api_serves_go_routes():
+    transport = httpx.ASGITransport(app=create_task_api_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://fake/api") as client:
+        device_id = str(uuid.uuid4())
+        registered = (await client.post("/device/register", json={"deviceId": device_id})).json()
+        headers = {
+            "Authorization": "Bearer default-token",
+            "X-User-ID": registered["userId"],
+            "X-Device-ID": device_id,
+        }
+        created = await client.post("/tasks", json={"title": "写周报"}, headers=headers)
+        assert created.status_code == 201
+
+        listed = await client.get("/tasks", headers=headers)
+        assert [task["title"] for task in listed.json()] == ["写周报"]
+        assert listed.headers["X-Sync-Token"]
+        etag = listed.headers["ETag"]
+        cached = await client.get("/tasks", headers={**headers, "If-None-Match": etag})
+        assert cached.status_code == 304
+
+        missing = await client.get(f"/tasks/{uuid.uuid4()}", headers=headers)
+        assert missing.status_code == 404
+        assert missing.json()["error"]["code"] == "TASK_NOT_FOUND"
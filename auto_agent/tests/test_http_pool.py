@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from auto_agent.http_pool import build_client, split_unix_url, warm_up
+
+
+async def _start_backend(delay=0.0, unix_path=None):
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    break
+                await asyncio.sleep(delay)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: 2\r\n\r\n[]"
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    if unix_path:
+        server = await asyncio.start_unix_server(handle, unix_path)
+        return server, "http://localhost"
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}"
+
+
+@pytest.mark.asyncio
+async def test_pool_limit_queues_requests_and_reports_wait():
+    server, base_url = await _start_backend(delay=0.05)
+    client, pool = build_client(5.0, max_connections=1, max_keepalive=1)
+    try:
+        await asyncio.gather(*(client.get(f"{base_url}/tasks") for _ in range(3)))
+    finally:
+        await client.aclose()
+        server.close()
+
+    stats = pool.stats()
+    assert stats["requests"] == 3
+    assert stats["connectionsOpened"] == 1
+    assert stats["peakInFlight"] == 3
+    assert stats["poolWait"]["count"] == 3
+    # The last request waited for the two ahead of it on the single connection.
+    assert stats["poolWait"]["p99Ms"] >= 100
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_keepalive_connections():
+    server, base_url = await _start_backend(delay=0.01)
+    client, pool = build_client(5.0, max_connections=10, max_keepalive=4)
+    try:
+        warmed = await warm_up(client, f"{base_url}/tasks", 3, timeout=1.0)
+        await client.get(f"{base_url}/tasks")
+    finally:
+        await client.aclose()
+        server.close()
+
+    assert warmed == 3
+    assert pool.stats()["connectionsOpened"] == 3
+
+
+@pytest.mark.asyncio
+async def test_warm_up_ignores_unreachable_backend():
+    client, _pool = build_client(1.0)
+    try:
+        warmed = await warm_up(client, "http://127.0.0.1:9/tasks", 2, timeout=0.2)
+    finally:
+        await client.aclose()
+    assert warmed == 0
+
+
+def test_split_unix_url():
+    assert split_unix_url("http+unix://%2Frun%2Fnexustodo.sock/api") == (
+        "http://localhost/api",
+        "/run/nexustodo.sock",
+    )
+    assert split_unix_url("http://localhost:8080/api") == ("http://localhost:8080/api", None)
+
+
+@pytest.mark.asyncio
+async def test_requests_go_through_unix_socket(tmp_path):
+    socket_path = str(tmp_path / "backend.sock")
+    server, _ = await _start_backend(unix_path=socket_path)
+    base_url, uds = split_unix_url(f"http+unix://{socket_path.replace('/', '%2F')}/api")
+    client, pool = build_client(5.0, uds=uds)
+    try:
+        response = await client.get(f"{base_url}/tasks")
+    finally:
+        await client.aclose()
+        server.close()
+
+    assert response.json() == []
+    assert pool.stats()["connectionsOpened"] == 1
@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+from auto_agent.idempotency import IdempotencyConflict, IdempotencyStore
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_share_one_run():
+    store = IdempotencyStore(max_entries=10, ttl_seconds=60)
+    calls = 0
+    release = asyncio.Event()
+
+    async def run_chat():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"sessionId": "s1", "assistantMessage": "ok"}
+
+    first = asyncio.create_task(store.run("key", "fp", run_chat))
+    second = asyncio.create_task(store.run("key", "fp", run_chat))
+    await asyncio.sleep(0)
+    release.set()
+
+    (result_a, replayed_a), (result_b, replayed_b) = await asyncio.gather(first, second)
+    assert calls == 1
+    assert result_a == result_b
+    assert (replayed_a, replayed_b) == (False, True)
+    assert store.stats()["joined"] == 1
+
+
+@pytest.mark.asyncio
+async def test_completed_run_is_cached_until_ttl():
+    now = [0.0]
+    store = IdempotencyStore(max_entries=10, ttl_seconds=30, clock=lambda: now[0])
+    calls = 0
+
+    async def run_chat():
+        nonlocal calls
+        calls += 1
+        return {"assistantMessage": f"run-{calls}"}
+
+    result, _ = await store.run("key", "fp", run_chat)
+    cached, replayed = await store.run("key", "fp", run_chat)
+    assert replayed and cached == result
+
+    now[0] = 31.0
+    fresh, replayed = await store.run("key", "fp", run_chat)
+    assert not replayed
+    assert fresh == {"assistantMessage": "run-2"}
+
+
+@pytest.mark.asyncio
+async def test_key_reuse_with_different_payload_conflicts():
+    store = IdempotencyStore(max_entries=10, ttl_seconds=60)
+
+    async def run_chat():
+        return {}
+
+    await store.run("key", "fp-a", run_chat)
+    with pytest.raises(IdempotencyConflict):
+        await store.run("key", "fp-b", run_chat)
+
+
+@pytest.mark.asyncio
+async def test_failed_run_is_not_cached():
+    store = IdempotencyStore(max_entries=10, ttl_seconds=60)
+    attempts = 0
+
+    async def run_chat():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("boom")
+        return {"assistantMessage": "ok"}
+
+    with pytest.raises(RuntimeError):
+        await store.run("key", "fp", run_chat)
+    result, replayed = await store.run("key", "fp", run_chat)
+    assert not replayed
+    assert result == {"assistantMessage": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_store_is_bounded():
+    store = IdempotencyStore(max_entries=2, ttl_seconds=60)
+
+    async def run_chat():
+        return {}
+
+    for idx in range(5):
+        await store.run(f"key-{idx}", "fp", run_chat)
+    assert len(store) == 2
+
+
+@pytest.mark.asyncio
+async def test_completed_runs_expire_in_completion_order():
+    now = [0.0]
+    store = IdempotencyStore(max_entries=10, ttl_seconds=30, clock=lambda: now[0])
+    release = asyncio.Event()
+
+    async def run_chat():
+        return {}
+
+    async def slow_chat():
+        await release.wait()
+        return {}
+
+    slow = asyncio.create_task(store.run("slow", "fp", slow_chat))
+    await store.run("fast", "fp", run_chat)
+    assert not store.completed("slow", "fp")
+    assert store.completed("fast", "fp")
+    assert not store.completed("fast", "other-fp")
+
+    now[0] = 20.0
+    release.set()
+    await slow
+    assert list(store._completed) == ["fast", "slow"]
+
+    now[0] = 35.0
+    assert not store.completed("fast", "fp")
+    assert store.completed("slow", "fp")
+    assert len(store) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_duplicate_replays_events():
+    store = IdempotencyStore(max_entries=10, ttl_seconds=60)
+    calls = 0
+
+    async def run_stream():
+        nonlocal calls
+        calls += 1
+        yield "delta", {"content": "思考(1): ...\n"}
+        await asyncio.sleep(0)
+        yield "done", {"assistantMessage": "ok"}
+
+    events, replayed = store.stream("key", "fp", run_stream)
+    duplicate, duplicate_replayed = store.stream("key", "fp", run_stream)
+
+    first = [event async for event in events]
+    second = [event async for event in duplicate]
+    assert calls == 1
+    assert not replayed and duplicate_replayed
+    assert first == second
+    assert first[-1][0] == "done"
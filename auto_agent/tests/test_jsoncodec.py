@@ -0,0 +1,48 @@
+import pytest
+
+from auto_agent import jsoncodec
+from auto_agent.agent_core import safe_json
+
+BACKENDS = [name for name in jsoncodec.BACKENDS if jsoncodec.available(name)]
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_backends_produce_identical_compact_utf8(name):
+    codec = jsoncodec.get_codec(name)
+    value = {"title": "写周报", "tags": ["work"], "n": 1, "ok": True, "none": None}
+
+    assert codec.name == name
+    expected = '{"title":"写周报","tags":["work"],"n":1,"ok":true,"none":null}'
+    assert codec.dumps_bytes(value) == expected.encode()
+    assert codec.dumps_bytes({"b": 1, "a": object()}, default=lambda _: "x", sort_keys=True) == (
+        b'{"a":"x","b":1}'
+    )
+    assert codec.loads(codec.dumps_bytes(value)) == value
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_invalid_input_raises_value_error(name):
+    codec = jsoncodec.get_codec(name)
+    for data in (b"", b"{", "not json"):
+        with pytest.raises(ValueError):
+            codec.loads(data)
+    with pytest.raises(TypeError):
+        codec.dumps_bytes({"a": object()})
+
+
+def test_unknown_or_missing_backend_falls_back():
+    assert jsoncodec.get_codec("simdjson").name == BACKENDS[0]
+    assert jsoncodec.get_codec("json").name == "json"
+
+
+def test_safe_json_falls_back_to_string_for_unsupported_values():
+    assert safe_json({"status": "待办"}) == '{"status": "待办"}'
+    assert safe_json({1, 2}).startswith('"{')
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_prompt_json_does_not_depend_on_the_backend(name, monkeypatch):
+    monkeypatch.setattr(jsoncodec, "codec", jsoncodec.get_codec(name))
+    value = {"title": "写周报", "n": 1e16, "ok": True}
+
+    assert safe_json(value) == '{"title": "写周报", "n": 1e+16, "ok": true}'
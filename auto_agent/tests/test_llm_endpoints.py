@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from auto_agent.agent_core import ReActPlanner
+from auto_agent.llm_endpoints import EndpointPool, LlmEndpoint, parse_endpoints
+
+PLAN = {"thought": "", "action": "final", "final": "ok"}
+
+
+def _endpoints(count):
+    return [
+        LlmEndpoint(name=f"llm-{idx}", base_url=f"http://llm-{idx}", model="m", api_key="k")
+        for idx in range(count)
+    ]
+
+
+class StandIn:
+    """Fake provider: per-endpoint latency and failures, records who was called."""
+
+    def __init__(self, latency=None, failing=()):
+        self.latency = latency or {}
+        self.failing = set(failing)
+        self.calls = []
+        self.cancelled = []
+
+    async def __call__(self, endpoint):
+        self.calls.append(endpoint.name)
+        try:
+            await asyncio.sleep(self.latency.get(endpoint.name, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(endpoint.name)
+            raise
+        if endpoint.name in self.failing:
+            raise ConnectionError(f"{endpoint.name} down")
+        return endpoint.name
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def test_parse_endpoints_falls_back_to_single_provider():
+    parsed = parse_endpoints(" http://a/v1 | m2 , http://b/v1||k2 ", "http://d", "m", "k")
+    assert [(ep.base_url, ep.model, ep.api_key) for ep in parsed] == [
+        ("http://a/v1", "m2", "k"),
+        ("http://b/v1", "m", "k2"),
+    ]
+    assert [ep.base_url for ep in parse_endpoints("", "http://d", "m", "k")] == ["http://d"]
+
+
+@pytest.mark.asyncio
+async def test_failover_to_next_endpoint_and_mark_unhealthy():
+    now = [0.0]
+    pool = EndpointPool(_endpoints(2), failure_threshold=2, cooldown=30, clock=lambda: now[0])
+    provider = StandIn(failing={"llm-0"})
+
+    assert await pool.call(provider) == "llm-1"
+    assert await pool.call(provider) == "llm-1"
+    assert provider.calls == ["llm-0", "llm-1", "llm-0", "llm-1"]
+
+    # Two failures in a row: llm-0 is skipped until the cooldown passes.
+    assert [ep.name for ep in pool.candidates()] == ["llm-1"]
+    await pool.call(provider)
+    assert provider.calls[-1] == "llm-1" and provider.calls.count("llm-0") == 2
+
+    now[0] = 31.0
+    assert [ep.name for ep in pool.candidates()] == ["llm-0", "llm-1"]
+    assert pool.stats()["failovers"] == 2
+
+
+@pytest.mark.asyncio
+async def test_all_endpoints_failing_raises_last_error():
+    pool = EndpointPool(_endpoints(2))
+    with pytest.raises(ConnectionError, match="llm-1"):
+        await pool.call(StandIn(failing={"llm-0", "llm-1"}))
+
+
+@pytest.mark.asyncio
+async def test_hedge_takes_faster_endpoint_and_cancels_the_slow_one():
+    pool = EndpointPool(_endpoints(2), hedge=True, hedge_min_delay=0.02, hedge_min_samples=1)
+    await pool.call(StandIn())
+    provider = StandIn(latency={"llm-0": 1.0, "llm-1": 0.01})
+
+    assert await pool.call(provider) == "llm-1"
+    await asyncio.sleep(0)
+    assert provider.cancelled == ["llm-0"]
+    stats = pool.stats()
+    assert stats["hedgesSent"] == 1
+    assert stats["endpoints"][1]["hedgesWon"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_not_sent_when_primary_is_fast():
+    pool = EndpointPool(_endpoints(2), hedge=True, hedge_min_delay=0.2, hedge_min_samples=1)
+    await pool.call(StandIn())
+    provider = StandIn(latency={"llm-0": 0.01})
+
+    assert await pool.call(provider) == "llm-0"
+    assert provider.calls == ["llm-0"]
+    assert pool.stats()["hedgesSent"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_tracks_primary_latency_quantile():
+    pool = EndpointPool(
+        _endpoints(2), hedge=True, hedge_min_delay=0.01, hedge_min_samples=10, hedge_quantile=0.9
+    )
+    provider = StandIn(latency={"llm-0": 0.03})
+    for _ in range(9):
+        await pool.call(provider)
+    # Too few samples: no hedge yet, however slow the primary.
+    assert pool.hedge_delay(pool.endpoints[0]) is None
+    assert provider.calls == ["llm-0"] * 9
+    assert pool.stats()["endpoints"][0]["hedgeDelayMs"] is None
+
+    await pool.call(provider)
+    assert 0.03 <= pool.hedge_delay(pool.endpoints[0]) < 1
+    assert pool.stats()["hedgesSent"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_fail_over_without_marking_the_endpoint_down():
+    pool = EndpointPool(_endpoints(2), failure_threshold=1)
+    calls = []
+
+    async def provider(endpoint):
+        calls.append(endpoint.name)
+        if endpoint.name == "llm-0":
+            raise RateLimited("Error code: 429")
+        return endpoint.name
+
+    assert await pool.call(provider) == "llm-1"
+    assert await pool.call(provider) == "llm-1"
+
+    assert calls == ["llm-0", "llm-1", "llm-0", "llm-1"]
+    assert [ep.name for ep in pool.candidates()] == ["llm-0", "llm-1"]
+    assert pool.stats()["endpoints"][0]["failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_planner_fails_over_when_endpoint_returns_no_plan(monkeypatch):
+    planner = ReActPlanner(endpoints=EndpointPool(_endpoints(2)))
+    calls = []
+
+    async def fake_request_endpoint(endpoint, _prompt):
+        calls.append(endpoint.name)
+        if endpoint.name == "llm-0":
+            raise ValueError("llm-0 returned no plan")
+        return PLAN
+
+    monkeypatch.setattr(planner, "_request_endpoint", fake_request_endpoint)
+
+    plan = await planner.plan("user: 你好", "")
+
+    assert plan["final"] == "ok"
+    assert calls == ["llm-0", "llm-1"]
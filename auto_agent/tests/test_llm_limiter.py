@@ -0,0 +1,253 @@
+import asyncio
+import json
+
+import pytest
+
+from auto_agent.agent_core import ReActPlanner
+from auto_agent.llm_limiter import (
+    AdaptiveLimiter,
+    LatencyHistogram,
+    LimiterRejected,
+    TokenBucket,
+    is_rate_limited,
+    use_priority,
+)
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"Status Code: {status_code}")
+        self.status_code = status_code
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_on_fast_success_and_halves_on_throttle():
+    limiter = AdaptiveLimiter(initial_limit=4, max_limit=16)
+    for _ in range(40):
+        await limiter.acquire()
+        limiter.release(0.1)
+    grown = limiter.limit
+    assert grown > 4
+
+    await limiter.acquire()
+    limiter.release(throttled=True)
+    assert limiter.limit == max(1, int(grown * 0.5))
+    assert limiter.stats()["throttled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_limit_shrinks_when_latency_grows():
+    limiter = AdaptiveLimiter(initial_limit=10, latency_tolerance=2.0)
+    await limiter.acquire()
+    limiter.release(0.1)
+    for _ in range(5):
+        await limiter.acquire()
+        limiter.release(1.0)
+    assert limiter.limit < 10
+
+
+@pytest.mark.asyncio
+async def test_callers_over_the_limit_queue_instead_of_failing():
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.stats()["queued"] == 1
+
+    limiter.release(0.1)
+    await waiter
+    assert limiter.stats()["inFlight"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_counts_rejection():
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=1, queue_timeout=0.01)
+    await limiter.acquire()
+    with pytest.raises(LimiterRejected):
+        await limiter.acquire()
+    assert limiter.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_calls():
+    bucket = TokenBucket(rate=100, burst=1)
+    await bucket.take()
+    waited = await bucket.take()
+    assert waited > 0
+
+
+def test_rate_limit_detection():
+    assert is_rate_limited(ProviderError(429))
+    assert is_rate_limited(RuntimeError("Status Code: 429\nToo Many Requests"))
+    assert not is_rate_limited(ProviderError(500))
+
+
+def test_overflow_percentiles_stay_json_safe():
+    histogram = LatencyHistogram()
+    histogram.observe(0.005)
+    for _ in range(9):
+        histogram.observe(45.0)
+
+    summary = histogram.as_dict()
+
+    assert summary["p50Ms"] == summary["p99Ms"] == 30000.0
+    assert summary["buckets"]["inf"] == 9
+    json.dumps(summary, allow_nan=False)
+
+
+@pytest.mark.asyncio
+async def test_planner_retries_throttled_calls(monkeypatch):
+    planner = ReActPlanner()
+    responses = [ProviderError(429), {"thought": "", "action": "final", "final": "ok"}]
+
+    async def fake_request(_prompt):
+        item = responses.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    monkeypatch.setattr(planner, "_request", fake_request)
+
+    plan = await planner.plan("user: 你好", "")
+
+    assert plan["final"] == "ok"
+    assert planner.limiter.stats()["throttled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_interactive_waiters_are_served_before_background():
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=1, interactive_reserve=0)
+    await limiter.acquire()
+    order = []
+
+    async def call(priority):
+        await limiter.acquire(priority)
+        order.append(priority)
+
+    background = asyncio.create_task(call("background"))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(call("interactive"))
+    await asyncio.sleep(0)
+
+    limiter.release(0.1)
+    await interactive
+    limiter.release(0.1)
+    await background
+    assert order == ["interactive", "background"]
+
+
+@pytest.mark.asyncio
+async def test_background_keeps_headroom_for_interactive():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=2, interactive_reserve=1)
+    await limiter.acquire("background")
+    blocked = asyncio.create_task(limiter.acquire("background"))
+    await asyncio.sleep(0)
+    assert limiter.stats()["queuedByPriority"]["background"] == 1
+
+    await limiter.acquire("interactive")
+    assert limiter.stats()["inFlight"] == 2
+    blocked.cancel()
+    await asyncio.gather(blocked, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_starved_background_call_jumps_the_queue():
+    now = [0.0]
+    limiter = AdaptiveLimiter(
+        initial_limit=1,
+        max_limit=1,
+        interactive_reserve=0,
+        starvation_timeout=5,
+        clock=lambda: now[0],
+    )
+    await limiter.acquire()
+    order = []
+
+    async def call(priority):
+        await limiter.acquire(priority)
+        order.append(priority)
+
+    background = asyncio.create_task(call("background"))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(call("interactive"))
+    await asyncio.sleep(0)
+
+    now[0] = 6.0
+    limiter.release()
+    await background
+    limiter.release()
+    await interactive
+    assert order == ["background", "interactive"]
+    assert limiter.stats()["waitLatency"]["background"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_waiter_is_promoted_under_steady_interactive_load():
+    now = [0.0]
+    limiter = AdaptiveLimiter(
+        initial_limit=2,
+        max_limit=2,
+        interactive_reserve=1,
+        starvation_timeout=40,
+        clock=lambda: now[0],
+    )
+    await limiter.acquire()
+    await limiter.acquire()
+    order = []
+
+    async def call(priority, label):
+        await limiter.acquire(priority)
+        order.append(label)
+
+    bulk = asyncio.create_task(call("background", "bulk"))
+    await asyncio.sleep(0)
+    interactive = [asyncio.create_task(call("interactive", f"i{n}")) for n in range(4)]
+    await asyncio.sleep(0)
+
+    # One slot frees every 15s while interactive callers keep queueing.
+    for _ in range(5):
+        now[0] += 15
+        limiter.release()
+        for _ in range(3):
+            await asyncio.sleep(0)
+    await asyncio.gather(bulk, *interactive)
+
+    assert order == ["i0", "i1", "bulk", "i2", "i3"]
+    waits = limiter.stats()["waitLatency"]["background"]
+    assert waits["count"] == 1 and waits["p99Ms"] == 30000.0
+    json.dumps(limiter.stats(), allow_nan=False)
+
+
+@pytest.mark.asyncio
+async def test_cancel_during_rate_limit_wait_frees_the_slot():
+    bucket = TokenBucket(rate=0.01, burst=1)
+    await bucket.take()
+    planner = ReActPlanner(limiter=AdaptiveLimiter(initial_limit=1), rate_limiter=bucket)
+
+    call = asyncio.create_task(planner.plan("user: 你好", ""))
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert planner.limiter.stats()["inFlight"] == 1
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+
+    assert planner.limiter.stats()["inFlight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_planner_records_latency_per_priority(monkeypatch):
+    planner = ReActPlanner()
+
+    async def fake_request(_prompt):
+        return {"thought": "", "action": "final", "final": "ok"}
+
+    monkeypatch.setattr(planner, "_request", fake_request)
+
+    await planner.plan("user: 你好", "")
+    with use_priority("background"):
+        await planner.plan("user: 汇总", "")
+
+    stats = planner.limiter.stats()["callLatency"]
+    assert stats["interactive"]["count"] == 1
+    assert stats["background"]["count"] == 1
@@ -0,0 +1,88 @@
+import pytest
+
+from auto_agent.agent_core import AgentCore, ReActPlanner, SessionStore
+from auto_agent.models import ChatMessage
+from auto_agent.planner_cassette import PlannerCassette
+from test_agent_scenarios import FakeTaskApi
+
+LIST_PLAN = {
+    "thought": "列出待办",
+    "action": "list_tasks",
+    "action_input": {"query": {"status": "待办"}},
+    "final": "",
+}
+FINAL_PLAN = {"thought": "", "action": "final", "action_input": {}, "final": "共 1 个待办。"}
+
+
+def _tasks():
+    return [{"taskId": "1", "title": "任务A", "description": "", "status": "待办", "tags": []}]
+
+
+async def _run(planner, tasks):
+    agent = AgentCore(FakeTaskApi(tasks), SessionStore(6), planner)
+    return await agent.handle_chat(None, [ChatMessage(role="user", content="我有哪些待办")], {})
+
+
+@pytest.mark.asyncio
+async def test_recorded_run_replays_through_agent_core_without_the_model(tmp_path, monkeypatch):
+    path = str(tmp_path / "cassette.jsonl")
+    recorder = ReActPlanner(cassette=PlannerCassette(path, "record"))
+    plans = iter([LIST_PLAN, FINAL_PLAN])
+
+    async def model(_prompt):
+        return next(plans)
+
+    monkeypatch.setattr(recorder, "_request", model)
+    recorded = await _run(recorder, _tasks())
+    assert recorder.cassette.stats()["recorded"] == 2
+
+    player = ReActPlanner(cassette=PlannerCassette(path, "replay", delay_scale=0))
+
+    async def offline(_prompt):
+        raise AssertionError("replay must not call the model")
+
+    monkeypatch.setattr(player, "_request", offline)
+    replayed = await _run(player, _tasks())
+    assert replayed["assistantMessage"] == recorded["assistantMessage"]
+    assert replayed["execution"] == recorded["execution"]
+
+    # Different observations (another store) still replay by conversation and step.
+    other = [{**_tasks()[0], "taskId": "9", "title": "任务Z"}]
+    assert (await _run(player, other))["action"]["intent"] == "list"
+    assert player.cassette.stats()["misses"] == 0
+
+
+@pytest.mark.asyncio
+async def test_replay_miss_fails_the_plan_and_torn_lines_are_skipped(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    path.write_text('{"prompt": "x", "turn": "y", "step": 0, "plan": {}}\n{"prompt": ', "utf-8")
+    cassette = PlannerCassette(str(path), "replay")
+    planner = ReActPlanner(cassette=cassette)
+
+    plan = await planner.plan("user: 你好", "")
+
+    assert plan["action"] == "final"
+    assert cassette.stats() == {
+        "mode": "replay",
+        "path": str(path),
+        "entries": 1,
+        "recorded": 0,
+        "replayed": 0,
+        "misses": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_entry_served_by_prompt_is_not_served_again_by_turn(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    recorder = PlannerCassette(path, "record")
+    await recorder.record("prompt-1", "user: 你好", "", {"final": "一"}, 0.1)
+    await recorder.record("prompt-2", "user: 你好", "", {"final": "二"}, 0.1)
+
+    player = PlannerCassette(path, "replay", delay_scale=0)
+
+    assert await player.replay("prompt-1", "user: 你好", "") == {"final": "一"}
+    assert await player.replay("other", "user: 你好", "") == {"final": "二"}
+    # Everything used: the last recorded answer sticks.
+    assert await player.replay("other", "user: 你好", "") == {"final": "二"}
+    assert player.stats()["entries"] == 2
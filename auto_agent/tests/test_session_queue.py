@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from auto_agent.models import ChatMessage
+from auto_agent.session_queue import SessionTurnQueue
+
+
+def _user(content):
+    return [ChatMessage(role="user", content=content)]
+
+
+class RecordingRun:
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.order = []
+
+    async def __call__(self, messages, headers, emit):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.order.append(messages[0].content)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return {"assistantMessage": messages[0].content}
+
+
+@pytest.mark.asyncio
+async def test_same_session_turns_run_in_order():
+    queue = SessionTurnQueue()
+    run = RecordingRun()
+
+    results = await asyncio.gather(
+        *(queue.submit("s1", _user(f"m{idx}"), {}, None, run) for idx in range(4))
+    )
+
+    assert run.max_active == 1
+    assert run.order == ["m0", "m1", "m2", "m3"]
+    assert [item["assistantMessage"] for item in results] == run.order
+    stats = queue.stats()
+    assert stats["turns"] == 4
+    assert stats["queued"] == 0
+    assert stats["maxQueued"] >= 3
+
+
+@pytest.mark.asyncio
+async def test_different_sessions_run_in_parallel():
+    queue = SessionTurnQueue()
+    run = RecordingRun()
+
+    await asyncio.gather(
+        *(queue.submit(f"s{idx}", _user("hi"), {}, None, run) for idx in range(4))
+    )
+
+    assert run.max_active == 4
+
+
+@pytest.mark.asyncio
+async def test_queued_messages_are_merged_into_one_turn():
+    queue = SessionTurnQueue(merge=True)
+    run = RecordingRun()
+
+    first = asyncio.create_task(queue.submit("s1", _user("列出任务"), {}, None, run))
+    await asyncio.sleep(0)
+    rest = [
+        asyncio.create_task(queue.submit("s1", _user(text), {}, None, run))
+        for text in ("删除1", "删除2")
+    ]
+    results = await asyncio.gather(first, *rest)
+
+    assert run.order == ["列出任务", "删除1\n删除2"]
+    assert results[1] is results[2]
+    assert queue.stats()["merged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_turn_does_not_block_queue():
+    queue = SessionTurnQueue()
+    calls = []
+
+    async def run(messages, headers, emit):
+        calls.append(messages[0].content)
+        if messages[0].content == "bad":
+            raise RuntimeError("boom")
+        return {"assistantMessage": "ok"}
+
+    bad = asyncio.create_task(queue.submit("s1", _user("bad"), {}, None, run))
+    good = asyncio.create_task(queue.submit("s1", _user("good"), {}, None, run))
+
+    with pytest.raises(RuntimeError):
+        await bad
+    assert (await good)["assistantMessage"] == "ok"
+    assert calls == ["bad", "good"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_drain_cancels_running_and_queued_turns():
+    queue = SessionTurnQueue()
+    started = asyncio.Event()
+
+    async def run(messages, headers, emit):
+        started.set()
+        await asyncio.Event().wait()
+
+    running = asyncio.create_task(queue.submit("s1", _user("a"), {}, None, run))
+    queued = asyncio.create_task(queue.submit("s1", _user("b"), {}, None, run))
+    await started.wait()
+
+    (drain,) = queue._drains
+    drain.cancel()
+
+    for caller in (running, queued):
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+    assert queue.depth("s1") == 0
+    assert queue.stats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_is_cancelled_once_its_caller_leaves():
+    queue = SessionTurnQueue()
+    started = asyncio.Event()
+    stopped = asyncio.Event()
+
+    async def run(messages, headers, emit):
+        if messages[0].content == "b":
+            return {"assistantMessage": "b"}
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            stopped.set()
+            raise
+
+    abandoned = asyncio.create_task(queue.submit("s1", _user("a"), {}, None, run))
+    await started.wait()
+    follower = asyncio.create_task(queue.submit("s1", _user("b"), {}, None, run))
+    abandoned.cancel()
+
+    await asyncio.wait_for(stopped.wait(), 1)
+    assert (await asyncio.wait_for(follower, 1))["assistantMessage"] == "b"
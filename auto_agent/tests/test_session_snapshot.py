@@ -0,0 +1,104 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from auto_agent.agent_core import AgentCore, SessionStore
+from auto_agent.models import ChatMessage
+
+from test_agent_scenarios import FakeTaskApi, StepPlanner
+
+IDS = ["11111111-1111-1111-1111-111111111111", "22222222-2222-2222-2222-222222222222"]
+
+
+@pytest.mark.asyncio
+async def test_pending_selection_survives_snapshot_and_restore(tmp_path):
+    tasks = [
+        {"taskId": task_id, "title": f"周报{idx}", "status": "待办", "tags": ["work"]}
+        for idx, task_id in enumerate(IDS, start=1)
+    ]
+    old_store = SessionStore(6)
+    old_agent = AgentCore(
+        FakeTaskApi(tasks),
+        old_store,
+        StepPlanner(
+            [
+                {
+                    "thought": "",
+                    "action": "list_tasks",
+                    "action_input": {"query": {"status": "待办"}},
+                    "final": "",
+                }
+            ]
+        ),
+    )
+    first = await old_agent.handle_chat(
+        None, [ChatMessage(role="user", content="列出待办")], headers={}
+    )
+    path = str(tmp_path / "sessions.json")
+    assert old_store.dump_snapshot(path) == 1
+
+    new_store = SessionStore(6)
+    assert new_store.load_snapshot(path) == 1
+    restored_at = new_store._sessions[first["sessionId"]].updated_at
+    assert restored_at == old_store._sessions[first["sessionId"]].updated_at
+    assert restored_at.utcoffset() == timedelta(0)
+    assert await new_store.get_recent(first["sessionId"]) == await old_store.get_recent(
+        first["sessionId"]
+    )
+    assert await new_store.get_messages(first["sessionId"]) == await old_store.get_messages(
+        first["sessionId"]
+    )
+    new_agent = AgentCore(
+        FakeTaskApi(tasks),
+        new_store,
+        StepPlanner(
+            [
+                {
+                    "thought": "",
+                    "action": "delete_task",
+                    "action_input": {"selection_indices": [2]},
+                    "final": "",
+                }
+            ]
+        ),
+    )
+    second = await new_agent.handle_chat(
+        first["sessionId"], [ChatMessage(role="user", content="删除第2个")], headers={}
+    )
+
+    assert second["execution"]["status"] == "success"
+    assert [task["taskId"] for task in tasks] == IDS[:1]
+
+
+def test_missing_or_corrupt_snapshot_restores_nothing(tmp_path):
+    store = SessionStore(6)
+    assert store.load_snapshot(str(tmp_path / "missing.json")) == 0
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text('{"version": 2, "sessions": [["only-id"]]}')
+    assert store.load_snapshot(str(corrupt)) == 0
+    # Version 1 stored naive epoch seconds; those snapshots are not read.
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text('{"version": 1, "sessions": [["s1", 1700000000.0, null, [], [], []]]}')
+    assert store.load_snapshot(str(legacy)) == 0
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_running_turns_until_the_deadline():
+    release = asyncio.Event()
+
+    class SlowPlanner(StepPlanner):
+        async def plan(self, conversation, scratchpad):
+            await release.wait()
+            return await super().plan(conversation, scratchpad)
+
+    agent = AgentCore(FakeTaskApi([]), SessionStore(6), SlowPlanner([]))
+    turn = asyncio.create_task(
+        agent.handle_chat(None, [ChatMessage(role="user", content="你好")], headers={})
+    )
+    await asyncio.sleep(0)
+
+    assert await agent.drain(0.01) is False
+    release.set()
+    assert await agent.drain(1) is True
+    assert turn.done()
@@ -0,0 +1,165 @@
+import pytest
+
+from auto_agent.agent_core import AgentCore, SessionStore
+from auto_agent.models import ChatMessage
+from auto_agent.sqlite_task_api import SqliteTaskApi
+
+ALICE = {"X-User-ID": "alice"}
+BOB = {"X-User-ID": "bob"}
+
+
+@pytest.fixture
+def store():
+    api = SqliteTaskApi(":memory:")
+    yield api
+    api.close()
+
+
+@pytest.mark.asyncio
+async def test_crud_round_trip_matches_backend_shapes(store):
+    created = await store.create_task(ALICE, "写周报", "周五前", ["work"])
+    assert created.status_code == 201
+    task = created.data
+    assert task["status"] == "待办" and task["tags"] == ["work"]
+    assert task["createdAt"].endswith("Z")
+
+    updated = await store.update_task(task["taskId"], ALICE, "", None, "已完成", None)
+    assert updated.ok
+    assert updated.data["title"] == "写周报"
+    assert updated.data["status"] == "已完成"
+
+    deleted = await store.delete_task(task["taskId"], ALICE)
+    assert deleted.data == {"message": "删除成功"}
+    missing = await store.get_task(task["taskId"], ALICE)
+    assert missing.status_code == 404
+    assert missing.error["code"] == "TASK_NOT_FOUND"
+
+
+@pytest.mark.asyncio
+async def test_validation_and_ownership_errors(store):
+    assert (await store.create_task(ALICE, "  ", None, None)).error["code"] == "INVALID_REQUEST"
+    assert (await store.list_tasks({})).status_code == 400
+
+    task = (await store.create_task(ALICE, "私人任务", None, None)).data
+    bad_status = await store.update_task(task["taskId"], ALICE, None, None, "完成了", None)
+    assert bad_status.status_code == 400 and bad_status.error["code"] == "INVALID_STATUS"
+
+    for result in (
+        await store.get_task(task["taskId"], BOB),
+        await store.update_task(task["taskId"], BOB, "x", None, None, None),
+        await store.delete_task(task["taskId"], BOB),
+    ):
+        assert result.status_code == 403
+        assert result.error["code"] == "FORBIDDEN"
+    assert (await store.list_tasks(BOB)).data == []
+
+
+@pytest.mark.asyncio
+async def test_filters_order_and_auth_token():
+    store = SqliteTaskApi(":memory:", auth_token="secret")
+    headers = {**ALICE, "Authorization": "Bearer secret"}
+    assert (await store.list_tasks(ALICE)).status_code == 401
+
+    first = (await store.create_task(headers, "A", None, ["work", "urgent"])).data
+    await store.create_task(headers, "B", None, ["life"])
+    await store.create_task(headers, "C", None, None)
+    await store.update_task(first["taskId"], headers, None, None, "进行中", None)
+
+    titles = [task["title"] for task in (await store.list_tasks(headers)).data]
+    assert titles == ["A", "B", "C"]
+    by_status = await store.list_tasks(headers, status="进行中")
+    assert [task["title"] for task in by_status.data] == ["A"]
+    by_tag = await store.list_tasks(headers, tags=["urg"])
+    assert [task["title"] for task in by_tag.data] == ["A"]
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_since_returns_changes_and_tombstones(store):
+    keep = (await store.create_task(ALICE, "保留", None, None)).data
+    gone = (await store.create_task(ALICE, "删除", None, None)).data
+    token = (await store.list_tasks(ALICE)).sync_token
+
+    await store.update_task(keep["taskId"], ALICE, "保留-改", None, None, None)
+    await store.delete_task(gone["taskId"], ALICE)
+    delta = await store.list_tasks(ALICE, since=token)
+
+    changes = {task["title"]: task.get("deleted", False) for task in delta.data}
+    assert changes == {"保留-改": False, "删除": True}
+
+
+@pytest.mark.asyncio
+async def test_malformed_since_is_a_bad_request(store):
+    result = await store.list_tasks(ALICE, since="yesterday")
+
+    assert result.status_code == 400
+    assert result.error == {"code": "INVALID_REQUEST", "message": "无效的 since 参数"}
+
+
+@pytest.mark.asyncio
+async def test_sync_token_is_the_newest_returned_change(store):
+    first = (await store.create_task(ALICE, "一", None, None)).data
+    await store.create_task(ALICE, "二", None, None)
+    assert (await store.list_tasks(ALICE, status="待办")).sync_token is None
+
+    token = (await store.list_tasks(ALICE)).sync_token
+    # Only the newest row is at or after the token.
+    assert [task["title"] for task in (await store.list_tasks(ALICE, since=token)).data] == ["二"]
+
+    await store.update_task(first["taskId"], ALICE, "一-改", None, None, None)
+    delta = await store.list_tasks(ALICE, since=token)
+    assert delta.sync_token > token
+    idle = await store.list_tasks(ALICE, since=delta.sync_token)
+    assert [task["title"] for task in idle.data] == ["一-改"]
+    assert idle.sync_token == delta.sync_token
+
+
+@pytest.mark.asyncio
+async def test_agent_runs_against_embedded_store(store):
+    await store.create_task(ALICE, "买牛奶", None, None)
+
+    class Planner:
+        steps = [
+            {
+                "thought": "",
+                "action": "update_task",
+                "action_input": {"status": "已完成", "query": {"keyword": "买牛奶"}},
+                "final": "",
+            }
+        ]
+
+        async def plan(self, _conversation, _scratchpad):
+            if self.steps:
+                return self.steps.pop(0)
+            return {"thought": "", "action": "final", "action_input": {}, "final": "好了"}
+
+    agent = AgentCore(store, SessionStore(6), Planner())
+    result = await agent.handle_chat(
+        None, [ChatMessage(role="user", content="买牛奶做完了")], headers=ALICE
+    )
+
+    assert result["execution"]["status"] == "success"
+    tasks = (await store.list_tasks(ALICE)).data
+    assert tasks[0]["status"] == "已完成"
+
+
+@pytest.mark.asyncio
+async def test_statuses_keyword_and_fields_filter_in_sql(store):
+    await store.create_task(ALICE, "写周报", "100%完成", ["work"])
+    doing = (await store.create_task(ALICE, "周会纪要", None, None)).data
+    await store.create_task(ALICE, "健身", "每周三次", None)
+    await store.update_task(doing["taskId"], ALICE, None, None, "进行中", None)
+
+    by_statuses = await store.list_tasks(ALICE, statuses=["待办", "进行中"], q="周")
+    assert [task["title"] for task in by_statuses.data] == ["写周报", "周会纪要", "健身"]
+    # LIKE wildcards in the keyword are matched literally.
+    escaped = await store.list_tasks(ALICE, q="0%完")
+    assert [task["title"] for task in escaped.data] == ["写周报"]
+    assert (await store.list_tasks(ALICE, q="_")).data == []
+
+    projected = await store.list_tasks(ALICE, status="进行中", fields=["status"])
+    assert projected.data == [{"taskId": doing["taskId"], "status": "进行中"}]
+    assert (await store.list_tasks(ALICE, fields=["secret"])).status_code == 400
+    unknown = await store.list_tasks(ALICE, statuses=["待办", "未完成"])
+    assert (unknown.status_code, unknown.error["code"]) == (400, "INVALID_REQUEST")
+    assert (await store.list_tasks(ALICE, status="done")).status_code == 400
@@ -0,0 +1,70 @@
+import httpx
+import pytest
+
+from auto_agent.task_api import TaskApi
+
+
+class VersionedBackend:
+    """Stand-in for GET /api/tasks that honours If-None-Match."""
+
+    def __init__(self):
+        self.version = 1
+        self.tasks = [{"taskId": "t1", "title": "周报"}]
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        etag = f'W/"{self.version}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, json=list(self.tasks), headers={"ETag": etag})
+
+
+def _task_api(backend, **kwargs):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(backend))
+    return TaskApi("http://backend/api", client, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_unchanged_list_is_served_from_cache_after_304():
+    backend = VersionedBackend()
+    api = _task_api(backend)
+    headers = {"X-User-ID": "u1"}
+
+    first = await api.list_tasks(headers, status="待办")
+    second = await api.list_tasks(headers, status="待办")
+
+    assert first.data == second.data == [{"taskId": "t1", "title": "周报"}]
+    assert second.ok and second.status_code == 200
+    assert "If-None-Match" not in backend.requests[0].headers
+    assert backend.requests[1].headers["If-None-Match"] == 'W/"1"'
+    assert api.stats()["notModified"] == 1
+
+
+@pytest.mark.asyncio
+async def test_changed_list_replaces_cached_copy():
+    backend = VersionedBackend()
+    api = _task_api(backend)
+    headers = {"X-User-ID": "u1"}
+
+    await api.list_tasks(headers)
+    backend.version = 2
+    backend.tasks.append({"taskId": "t2", "title": "复盘"})
+    result = await api.list_tasks(headers)
+
+    assert [task["taskId"] for task in result.data] == ["t1", "t2"]
+    assert result.etag == 'W/"2"'
+    assert api.stats()["notModified"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_is_per_user_and_bounded():
+    backend = VersionedBackend()
+    api = _task_api(backend, cache_entries=1)
+
+    await api.list_tasks({"X-User-ID": "u1"})
+    await api.list_tasks({"X-User-ID": "u2"})
+    await api.list_tasks({"X-User-ID": "u1"})
+
+    assert all("If-None-Match" not in request.headers for request in backend.requests)
+    assert api.stats()["cachedReads"] == 1
@@ -0,0 +1,97 @@
+import asyncio
+
+import httpx
+import pytest
+
+from auto_agent.task_api import TaskApi
+
+
+class SlowBackend:
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, request):
+        self.calls.append((request.method, str(request.url)))
+        if request.method == "GET":
+            await self.release.wait()
+            return httpx.Response(200, json={"data": [{"taskId": "t1"}]})
+        return httpx.Response(200, json={"data": {"taskId": "t1"}})
+
+
+def _task_api(backend):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(backend))
+    return TaskApi("http://backend/api", client)
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_reads_share_one_call():
+    backend = SlowBackend()
+    api = _task_api(backend)
+    headers = {"X-User-ID": "u1"}
+
+    waiters = [
+        asyncio.create_task(api.list_tasks(headers, status="待办", tags=["a"]))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0.01)
+    backend.release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert len(backend.calls) == 1
+    assert all(result.ok and result.data == [{"taskId": "t1"}] for result in results)
+    assert api.stats()["coalescedReads"] == 4
+    assert api.stats()["inflightReads"] == 0
+
+
+@pytest.mark.asyncio
+async def test_reads_are_not_shared_across_users_or_params():
+    backend = SlowBackend()
+    api = _task_api(backend)
+
+    waiters = [
+        asyncio.create_task(api.list_tasks({"X-User-ID": "u1"}, status="待办")),
+        asyncio.create_task(api.list_tasks({"X-User-ID": "u2"}, status="待办")),
+        asyncio.create_task(api.list_tasks({"X-User-ID": "u1"}, status="进行中")),
+        asyncio.create_task(api.get_task("t1", {"X-User-ID": "u1"})),
+    ]
+    await asyncio.sleep(0.01)
+    backend.release.set()
+    await asyncio.gather(*waiters)
+
+    assert len(backend.calls) == 4
+    assert api.stats()["coalescedReads"] == 0
+
+
+@pytest.mark.asyncio
+async def test_read_after_write_does_not_join_an_older_read():
+    backend = SlowBackend()
+    api = _task_api(backend)
+    headers = {"X-User-ID": "u1"}
+
+    before = asyncio.create_task(api.list_tasks(headers))
+    await asyncio.sleep(0.01)
+    await api.delete_task("t1", headers)
+    after = asyncio.create_task(api.list_tasks(headers))
+    await asyncio.sleep(0.01)
+    backend.release.set()
+    await asyncio.gather(before, after)
+
+    assert [method for method, _ in backend.calls] == ["GET", "DELETE", "GET"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_read():
+    backend = SlowBackend()
+    api = _task_api(backend)
+    headers = {"X-User-ID": "u1"}
+
+    first = asyncio.create_task(api.get_task("t1", headers))
+    second = asyncio.create_task(api.get_task("t1", headers))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    backend.release.set()
+
+    result = await second
+    assert result.ok
+    assert len(backend.calls) == 1
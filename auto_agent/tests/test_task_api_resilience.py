@@ -0,0 +1,157 @@
+import asyncio
+
+import httpx
+import pytest
+
+from auto_agent.resilience import CircuitBreaker, RetryBudget
+from auto_agent.task_api import TaskApi
+
+HEADERS = {"X-User-ID": "u1"}
+
+
+def _task_api(handler, **kwargs):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return TaskApi("http://backend/api", client, **kwargs)
+
+
+def test_breaker_opens_then_half_opens_after_reset():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=5, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    now[0] = 5.0
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] = 10.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.stats()["opened"] == 2
+
+
+def test_retry_budget_drains_and_refills():
+    budget = RetryBudget(ratio=0.5, max_tokens=1)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_spend()
+    assert budget.stats()["exhausted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_calling_backend():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        raise httpx.ConnectError("refused", request=request)
+
+    api = _task_api(handler, breaker=CircuitBreaker(failure_threshold=2), max_retries=0)
+    await api.list_tasks(HEADERS)
+    await api.list_tasks(HEADERS)
+    assert len(calls) == 2
+
+    result = await api.get_task("t1", HEADERS)
+    assert not result.ok
+    assert result.status_code == 502
+    assert result.error["code"] == "BAD_GATEWAY"
+    assert len(calls) == 2
+    assert api.stats()["breaker"]["shortCircuited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_is_retried_but_writes_are_not():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if len(calls) == 1 or request.method == "DELETE":
+            return httpx.Response(503, json={"error": {"code": "UNAVAILABLE", "message": "x"}})
+        return httpx.Response(200, json={"data": []})
+
+    api = _task_api(handler, breaker=CircuitBreaker(failure_threshold=10))
+    result = await api.list_tasks(HEADERS)
+    assert result.ok and result.data == []
+    assert calls == ["GET", "GET"]
+
+    result = await api.delete_task("t1", HEADERS)
+    assert result.status_code == 503
+    assert calls == ["GET", "GET", "DELETE"]
+
+
+@pytest.mark.asyncio
+async def test_internal_errors_trip_the_breaker_without_retries():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(500, json={"error": {"code": "INTERNAL_ERROR", "message": "x"}})
+
+    api = _task_api(handler, breaker=CircuitBreaker(failure_threshold=2))
+    first = await api.list_tasks(HEADERS)
+    await api.list_tasks(HEADERS)
+    assert first.status_code == 500
+    assert calls == ["GET", "GET"]
+
+    result = await api.list_tasks(HEADERS)
+    assert result.error["code"] == "BAD_GATEWAY"
+    assert calls == ["GET", "GET"]
+
+
+@pytest.mark.asyncio
+async def test_per_operation_timeout_is_applied():
+    seen = {}
+
+    def handler(request):
+        seen[request.method] = request.extensions["timeout"]
+        return httpx.Response(200, json={"data": {}})
+
+    api = _task_api(handler, timeouts={"get": 1.5, "write": 3.0}, connect_timeout=0.5)
+    await api.get_task("t1", HEADERS)
+    await api.delete_task("t1", HEADERS)
+
+    assert seen["GET"]["read"] == 1.5 and seen["GET"]["connect"] == 0.5
+    assert seen["DELETE"]["read"] == 3.0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_probe_does_not_strand_the_breaker():
+    now = [0.0]
+    calls = []
+
+    async def handler(request):
+        calls.append(request.method)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        if len(calls) == 2:
+            await asyncio.Event().wait()
+        return httpx.Response(200, json=[])
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=lambda: now[0])
+    api = _task_api(handler, breaker=breaker, max_retries=0)
+    await api.list_tasks(HEADERS)
+    assert breaker.state == "open"
+
+    now[0] = 5.0
+    # Writes are not shielded like coalesced reads, so cancelling the caller
+    # cancels the probe request itself.
+    probe = asyncio.create_task(api.delete_task("t1", HEADERS))
+    while len(calls) < 2:
+        await asyncio.sleep(0)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    result = await api.list_tasks(HEADERS)
+    assert result.ok
+    assert breaker.state == "closed"
+    assert len(calls) == 3
@@ -0,0 +1,167 @@
+import json
+
+import httpx
+import pytest
+
+from auto_agent.agent_core import AgentCore, SessionStore
+from auto_agent.models import ChatMessage
+from auto_agent.sqlite_task_api import SqliteTaskApi
+from auto_agent.task_api import BATCH_LIMIT, ApiResult, TaskApi
+
+from test_agent_scenarios import FakeTaskApi, StepPlanner
+
+ALICE = {"X-User-ID": "alice"}
+IDS = [f"{i}{i}{i}{i}{i}{i}{i}{i}-1111-1111-1111-111111111111" for i in range(1, 4)]
+BOB = {"X-User-ID": "bob"}
+
+
+class BatchBackend:
+    """Stand-in for PUT /api/tasks/batch that fails ids starting with "x"."""
+
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.bodies = []
+
+    def __call__(self, request):
+        body = json.loads(request.content)
+        self.bodies.append(body)
+        if self.status_code != 200:
+            return httpx.Response(
+                self.status_code, json={"error": {"code": "INTERNAL_ERROR", "message": "x"}}
+            )
+        updated = [
+            {"taskId": task_id, "status": body["status"]}
+            for task_id in body["taskIds"]
+            if not task_id.startswith("x")
+        ]
+        failed = [
+            {"taskId": task_id, "error": {"code": "TASK_NOT_FOUND", "message": "任务不存在"}}
+            for task_id in body["taskIds"]
+            if task_id.startswith("x")
+        ]
+        return httpx.Response(200, json={"updated": updated, "failed": failed})
+
+
+def _task_api(backend):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(backend))
+    return TaskApi("http://backend/api", client)
+
+
+@pytest.mark.asyncio
+async def test_update_tasks_sends_one_request_with_deduped_ids():
+    backend = BatchBackend()
+    api = _task_api(backend)
+
+    result = await api.update_tasks(["a", "b", "a", "x1"], ALICE, None, None, "已完成", None)
+
+    assert backend.bodies == [{"taskIds": ["a", "b", "x1"], "status": "已完成"}]
+    assert [task["taskId"] for task in result.data["updated"]] == ["a", "b"]
+    assert result.data["failed"][0]["taskId"] == "x1"
+
+
+@pytest.mark.asyncio
+async def test_large_batches_are_chunked_and_merged():
+    backend = BatchBackend()
+    api = _task_api(backend)
+    task_ids = [f"t{i}" for i in range(BATCH_LIMIT * 2 + 1)]
+
+    result = await api.update_tasks(task_ids, ALICE, None, None, "已完成", None)
+
+    assert [len(body["taskIds"]) for body in backend.bodies] == [BATCH_LIMIT, BATCH_LIMIT, 1]
+    assert len(result.data["updated"]) == len(task_ids)
+    assert result.data["failed"] == []
+
+
+@pytest.mark.asyncio
+async def test_agent_uses_one_batch_call_for_bulk_update():
+    tasks = [
+        {"taskId": task_id, "title": f"任务{i}", "status": "待办", "tags": []}
+        for i, task_id in enumerate(IDS[:2])
+    ]
+    api = FakeTaskApi(tasks)
+    planner = StepPlanner(
+        [
+            {
+                "thought": "",
+                "action": "update_task",
+                "action_input": {"status": "已完成", "taskIds": IDS},
+                "final": "",
+            }
+        ]
+    )
+    agent = AgentCore(api, SessionStore(6), planner)
+
+    result = await agent.handle_chat(
+        None, [ChatMessage(role="user", content="把这两个任务标记完成")], headers={}
+    )
+
+    assert api.batch_calls == 1
+    assert result["execution"]["status"] == "failed"
+    # One missing id fails the whole batch; the two existing tasks stay as they were.
+    assert result["execution"]["result"]["updated"] == []
+    assert [item["taskId"] for item in result["execution"]["result"]["failed"]] == IDS[2:]
+    assert [task["status"] for task in tasks] == ["待办", "待办"]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_marks_every_task_failed():
+    class DownTaskApi(FakeTaskApi):
+        async def delete_tasks(self, task_ids, headers):
+            return ApiResult(
+                ok=False,
+                status_code=502,
+                error={"code": "BAD_GATEWAY", "message": "任务服务不可用"},
+            )
+
+    api = DownTaskApi([])
+    planner = StepPlanner(
+        [
+            {
+                "thought": "",
+                "action": "delete_task",
+                "action_input": {"taskIds": IDS[:2]},
+                "final": "",
+            }
+        ]
+    )
+    agent = AgentCore(api, SessionStore(6), planner)
+
+    result = await agent.handle_chat(
+        None, [ChatMessage(role="user", content="删除这两个任务")], headers={}
+    )
+
+    failed = result["execution"]["result"]["failed"]
+    assert [item["taskId"] for item in failed] == IDS[:2]
+    assert all(item["error"]["code"] == "BAD_GATEWAY" for item in failed)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_batch_mutations_are_all_or_nothing():
+    store = SqliteTaskApi(":memory:")
+    mine = [(await store.create_task(ALICE, title, None, None)).data for title in "AB"]
+    theirs = (await store.create_task(BOB, "C", None, None)).data
+    own_ids = [task["taskId"] for task in mine]
+    ids = [*own_ids, theirs["taskId"], "missing"]
+
+    rejected = await store.update_tasks(ids, ALICE, None, None, "进行中", None)
+    assert rejected.data["updated"] == []
+    assert {item["error"]["code"] for item in rejected.data["failed"]} == {
+        "FORBIDDEN",
+        "TASK_NOT_FOUND",
+    }
+    assert {task["status"] for task in (await store.list_tasks(ALICE)).data} == {"待办"}
+    assert (await store.update_tasks(ids, ALICE, None, None, "完成了", None)).status_code == 400
+
+    updated = await store.update_tasks(own_ids, ALICE, None, None, "进行中", None)
+    assert [task["title"] for task in updated.data["updated"]] == ["A", "B"]
+    assert updated.data["failed"] == []
+
+    rejected = await store.delete_tasks(ids, ALICE)
+    assert rejected.data["deleted"] == []
+    assert len((await store.list_tasks(ALICE)).data) == 2
+
+    deleted = await store.delete_tasks(own_ids, ALICE)
+    assert [item["taskId"] for item in deleted.data["deleted"]] == own_ids
+    assert (await store.list_tasks(ALICE)).data == []
+    assert len((await store.list_tasks(BOB)).data) == 1
+    store.close()
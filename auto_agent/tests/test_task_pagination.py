@@ -0,0 +1,87 @@
+import httpx
+import pytest
+
+from auto_agent.agent_core import AgentCore, SessionStore
+from auto_agent.models import ChatMessage
+from auto_agent.sqlite_task_api import SqliteTaskApi
+from auto_agent.task_api import TaskApi
+
+from test_agent_scenarios import FakeTaskApi, StepPlanner
+
+ALICE = {"X-User-ID": "alice"}
+
+
+class CappedTaskApi(FakeTaskApi):
+    """A backend that never returns more than 50 rows per page."""
+
+    async def list_tasks(self, headers, limit=None, **filters):
+        return await super().list_tasks(headers, limit=min(limit or 50, 50), **filters)
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_by_query_follows_every_page():
+    tasks = [
+        {"taskId": f"t{i}", "title": f"任务{i}", "status": "待办", "tags": []}
+        for i in range(120)
+    ]
+    api = CappedTaskApi(tasks)
+    planner = StepPlanner(
+        [
+            {
+                "thought": "",
+                "action": "delete_task",
+                "action_input": {"bulk": True, "query": {"keyword": "任务"}},
+                "final": "",
+            }
+        ]
+    )
+    agent = AgentCore(api, SessionStore(6), planner)
+
+    result = await agent.handle_chat(
+        None, [ChatMessage(role="user", content="删除所有任务")], headers={}
+    )
+
+    assert result["execution"]["status"] == "success"
+    assert api.tasks == []
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cursor_pages_cover_the_list_once():
+    store = SqliteTaskApi(":memory:")
+    for idx in range(7):
+        await store.create_task(ALICE, f"任务{idx}", None, None)
+
+    seen, cursor = [], None
+    while True:
+        page = await store.list_tasks(ALICE, limit=3, cursor=cursor)
+        seen.extend(task["title"] for task in page.data)
+        cursor = page.next_cursor
+        if not cursor:
+            break
+
+    full = [task["title"] for task in (await store.list_tasks(ALICE)).data]
+    assert seen == full and len(full) == 7
+    assert (await store.list_tasks(ALICE, cursor="garbage")).status_code == 400
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_next_cursor_survives_not_modified_revalidation():
+    requests = []
+
+    def backend(request):
+        requests.append(request)
+        headers = {"ETag": 'W/"1"', "X-Next-Cursor": "abc"}
+        if request.headers.get("If-None-Match") == 'W/"1"':
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, json=[{"taskId": "t1"}], headers=headers)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(backend))
+    api = TaskApi("http://backend/api", client)
+
+    first = await api.list_tasks(ALICE, limit=1)
+    second = await api.list_tasks(ALICE, limit=1)
+
+    assert requests[0].url.params["limit"] == "1"
+    assert first.next_cursor == second.next_cursor == "abc"
+    assert second.data == [{"taskId": "t1"}]
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from auto_agent.task_api import ApiResult
+from auto_agent.task_replica import TaskReplica
+
+
+class DeltaTaskApi:
+    """Stand-in Task API with ``since`` deltas and tombstones; versions act as clock."""
+
+    def __init__(self, tasks):
+        self.clock = 1
+        self.rows = {task["taskId"]: {**task, "_changed": 0} for task in tasks}
+        self.calls = []
+
+    def touch(self, task_id, **fields):
+        self.clock += 1
+        row = self.rows.setdefault(task_id, {"taskId": task_id, "tags": []})
+        row.update(fields, _changed=self.clock)
+
+    def delete(self, task_id):
+        self.clock += 1
+        self.rows[task_id].update(deleted=True, _changed=self.clock)
+
+    async def list_tasks(self, headers, status=None, tags=None, since=None):
+        self.calls.append(since)
+        await asyncio.sleep(0)
+        token = str(self.clock)
+        if since is None:
+            rows = [row for row in self.rows.values() if not row.get("deleted")]
+        else:
+            rows = [row for row in self.rows.values() if row["_changed"] >= int(since)]
+        data = [{k: v for k, v in row.items() if k != "_changed"} for row in rows]
+        return ApiResult(ok=True, status_code=200, data=data, sync_token=token)
+
+    async def get_task(self, task_id, headers):
+        return ApiResult(
+            ok=False,
+            status_code=404,
+            error={"code": "TASK_NOT_FOUND", "message": "任务不存在"},
+        )
+
+
+def _tasks():
+    return [
+        {"taskId": "1", "title": "周报", "status": "待办", "tags": ["work"]},
+        {"taskId": "2", "title": "健身", "status": "已完成", "tags": ["life"]},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_first_read_is_full_then_deltas_apply_updates_and_tombstones():
+    api = DeltaTaskApi(_tasks())
+    replica = TaskReplica(api)
+    headers = {"X-User-ID": "u1"}
+
+    result = await replica.list_tasks(headers, status="待办")
+    assert [task["taskId"] for task in result.data] == ["1"]
+
+    api.touch("2", status="待办")
+    api.touch("3", title="复盘", status="待办")
+    api.delete("1")
+    result = await replica.list_tasks(headers, status="待办")
+
+    assert [task["taskId"] for task in result.data] == ["2", "3"]
+    assert api.calls == [None, "1"]
+    stats = replica.stats()
+    assert stats["fullSyncs"] == 1 and stats["deltaSyncs"] == 1
+    assert stats["tasks"] == 2
+
+
+@pytest.mark.asyncio
+async def test_local_filters_match_backend_tag_semantics():
+    replica = TaskReplica(DeltaTaskApi(_tasks()))
+    result = await replica.list_tasks({"X-User-ID": "u1"}, tags=["wor"])
+    assert [task["taskId"] for task in result.data] == ["1"]
+
+
+@pytest.mark.asyncio
+async def test_readers_waiting_on_a_sync_share_the_next_one():
+    api = DeltaTaskApi(_tasks())
+    replica = TaskReplica(api)
+    headers = {"X-User-ID": "u1"}
+    await replica.list_tasks(headers)
+
+    await asyncio.gather(
+        *(replica.list_tasks(headers, status=s) for s in ("待办", "已完成", "已延期"))
+    )
+
+    # The first reader syncs; the two that arrived mid-sync share one follow-up
+    # sync, since the in-flight one may predate their own writes.
+    assert api.calls == [None, "1", "1"]
+
+
+@pytest.mark.asyncio
+async def test_get_task_falls_back_to_api_for_unknown_ids():
+    replica = TaskReplica(DeltaTaskApi(_tasks()))
+    headers = {"X-User-ID": "u1"}
+
+    found = await replica.get_task("2", headers)
+    missing = await replica.get_task("404", headers)
+
+    assert found.ok and found.data["title"] == "健身"
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_statuses_keyword_and_fields_are_applied_locally():
+    api = DeltaTaskApi(_tasks() + [{"taskId": "3", "title": "周会", "status": "进行中"}])
+    replica = TaskReplica(api)
+    headers = {"X-User-ID": "u1"}
+
+    result = await replica.list_tasks(
+        headers, statuses=["待办", "进行中"], q="周", fields=["title"]
+    )
+
+    assert result.data == [{"taskId": "1", "title": "周报"}, {"taskId": "3", "title": "周会"}]
+    assert api.calls == [None]
+
+
+@pytest.mark.asyncio
+async def test_pages_stay_put_when_another_read_syncs_between_them():
+    api = DeltaTaskApi(
+        [
+            {"taskId": str(i), "title": f"t{i}", "status": "待办", "createdAt": f"2024-01-0{i}"}
+            for i in (1, 2, 3)
+        ]
+    )
+    replica = TaskReplica(api)
+    headers = {"X-User-ID": "u1"}
+
+    first = await replica.list_tasks(headers, limit=2)
+    api.delete("1")
+    await replica.list_tasks(headers)
+    second = await replica.list_tasks(headers, limit=2, cursor=first.next_cursor)
+
+    assert [task["taskId"] for task in first.data] == ["1", "2"]
+    assert [task["taskId"] for task in second.data] == ["3"]
+    assert second.next_cursor is None
@@ -0,0 +1,126 @@
+import asyncio
+
+import httpx
+import pytest
+
+from auto_agent import tracing
+from auto_agent.agent_core import AgentCore, ReActPlanner, SessionStore
+from auto_agent.models import ChatMessage
+from auto_agent.task_api import TaskApi
+from test_agent_scenarios import FakeTaskApi
+
+LIST_PLAN = {
+    "thought": "列出待办",
+    "action": "list_tasks",
+    "action_input": {"query": {"status": "待办"}},
+    "final": "",
+}
+FINAL_PLAN = {"thought": "", "action": "final", "action_input": {}, "final": "好的"}
+TASKS = [{"taskId": "1", "title": "任务A", "description": "", "status": "待办", "tags": []}]
+
+
+@pytest.fixture
+def exporter():
+    recording = tracing.RecordingTracer()
+    previous = tracing.set_tracer(recording)
+    yield recording.exporter
+    tracing.set_tracer(previous)
+
+
+def _planner(monkeypatch):
+    planner = ReActPlanner()
+    plans = iter([LIST_PLAN, FINAL_PLAN])
+
+    async def model(_prompt):
+        return next(plans)
+
+    monkeypatch.setattr(planner, "_request", model)
+    return planner
+
+
+@pytest.mark.asyncio
+async def test_react_run_is_traced_as_nested_spans(exporter, monkeypatch):
+    agent = AgentCore(FakeTaskApi(TASKS), SessionStore(6), _planner(monkeypatch))
+
+    await agent.handle_chat(None, [ChatMessage(role="user", content="我有哪些待办")], {})
+
+    (turn,) = exporter.find("agent.turn")
+    (run,) = exporter.find("react.run")
+    assert run.parent_id == turn.span_id
+    plans = exporter.find("react.plan")
+    assert [span.attributes["step"] for span in plans] == [1, 2]
+    assert all(span.parent_id == run.span_id for span in plans)
+    planner_spans = exporter.find("planner.plan")
+    assert planner_spans[0].parent_id == plans[0].span_id
+    (llm,) = [
+        span for span in exporter.find("llm.request") if span.parent_id == planner_spans[0].span_id
+    ]
+    assert llm.attributes == {"attempt": 0}
+    (tool,) = exporter.find("react.tool")
+    assert tool.attributes == {"step": 1, "action": "list_tasks"}
+    assert exporter.find("session.lock")
+    assert {span.trace_id for span in exporter.spans} == {turn.trace_id}
+    assert all(span.duration_ms >= 0 and span.status == "ok" for span in exporter.spans)
+
+
+@pytest.mark.asyncio
+async def test_task_api_request_span_records_status(exporter):
+    def handler(request):
+        return httpx.Response(404, json={"error": {"code": "TASK_NOT_FOUND", "message": "x"}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    api = TaskApi("http://backend/api", client)
+
+    with tracing.span("react.tool") as parent:
+        await api.get_task("a1b2", {"X-User-ID": "u1"})
+
+    (request,) = exporter.find("task_api.request")
+    assert request.parent_id == parent.span_id
+    assert request.attributes["method"] == "GET"
+    assert request.attributes["status_code"] == 404
+
+
+@pytest.mark.asyncio
+async def test_stream_events_carry_step_timings_only_when_requested(monkeypatch):
+    async def events(timings):
+        agent = AgentCore(FakeTaskApi(TASKS), SessionStore(6), _planner(monkeypatch))
+        message = [ChatMessage(role="user", content="我有哪些待办")]
+        return {
+            event_type: payload
+            async for event_type, payload in agent.handle_chat_stream(None, message, {}, timings)
+        }
+
+    timed = await events(True)
+    action_timing = timed["action"]["timing"]
+    assert action_timing["spans"]["planner.plan"]["count"] == 1
+    assert action_timing["totalMs"] >= action_timing["spans"]["llm.request"]["ms"]
+    assert "react.tool" in timed["execution"]["timing"]["spans"]
+    assert timed["execution"]["status"] == "success"
+
+    plain = await events(False)
+    assert "timing" not in plain["action"]
+    assert "timing" not in plain["execution"]
+
+
+@pytest.mark.asyncio
+async def test_queued_turns_of_one_session_keep_their_own_trace(exporter, monkeypatch):
+    planner = ReActPlanner()
+
+    async def model(_prompt):
+        return FINAL_PLAN
+
+    monkeypatch.setattr(planner, "_request", model)
+    agent = AgentCore(FakeTaskApi(TASKS), SessionStore(6), planner)
+
+    await asyncio.gather(
+        *(
+            agent.handle_chat("s1", [ChatMessage(role="user", content=text)], {})
+            for text in ["一", "二"]
+        )
+    )
+
+    turns = exporter.find("agent.turn")
+    runs = exporter.find("react.run")
+    assert len({run.parent_id for run in runs}) == 2
+    assert {run.parent_id for run in runs} == {turn.span_id for turn in turns}
+    assert {run.trace_id for run in runs} == {turn.trace_id for turn in turns}
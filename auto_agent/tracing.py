@@ -0,0 +1,201 @@
+"""Nested spans around the ReAct run, planner calls and Task API requests.
+
+``span(name, **attributes)`` is used as a context manager in sync or async
+code; spans nest through a context variable, so a Task API request made
+inside a tool step becomes that step's child, also in tasks started from it.
+The tracer is chosen by ``TRACING_EXPORTER``:
+
+- ``none`` (default): spans cost a context manager and are not recorded;
+- ``memory``: finished spans go to an ``InMemoryExporter`` (tests, ad-hoc
+  profiling), readable as ``tracing.tracer.exporter.spans``;
+- ``otel``: spans are opened on OpenTelemetry's global tracer provider when
+  ``opentelemetry-api`` is installed (``pip install opentelemetry-sdk`` and
+  configure an exporter as usual); without it this falls back to ``none``.
+
+Independently of the tracer, ``collect_timings`` sums span durations by name
+for one block, which is how SSE ``action``/``execution`` events carry per
+step timings when the client asks for them.
+"""
+from __future__ import annotations
+
+import importlib.util
+import secrets
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+from .config import settings
+
+EXPORTERS = ("none", "memory", "otel")
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    end: Optional[float] = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end is None:
+            return None
+        return (self.end - self.start) * 1e3
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_timings: ContextVar[Optional[dict[str, list[float]]]] = ContextVar("span_timings", default=None)
+
+
+class InMemoryExporter:
+    """Keeps the last ``max_spans`` finished spans."""
+
+    def __init__(self, max_spans: int = 10000) -> None:
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def find(self, name: str) -> list[Span]:
+        return [span for span in self.spans if span.name == name]
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class Tracer:
+    """No-op tracer: spans are not recorded."""
+
+    name = "none"
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        yield _NOOP_SPAN
+
+
+class RecordingTracer(Tracer):
+    name = "memory"
+
+    def __init__(self, exporter: Optional[InMemoryExporter] = None) -> None:
+        self.exporter = exporter or InMemoryExporter()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        parent = _current.get()
+        current = Span(
+            name,
+            parent.trace_id if parent else secrets.token_hex(16),
+            secrets.token_hex(8),
+            parent.span_id if parent else None,
+            time.perf_counter(),
+            attributes={key: value for key, value in attributes.items() if value is not None},
+        )
+        token = _current.set(current)
+        try:
+            yield current
+        except BaseException as exc:
+            current.status = "error"
+            current.attributes["error"] = type(exc).__name__
+            raise
+        finally:
+            current.end = time.perf_counter()
+            _current.reset(token)
+            self.exporter.export(current)
+
+
+class OtelTracer(Tracer):
+    name = "otel"
+
+    def __init__(self) -> None:
+        from opentelemetry import trace
+
+        self._tracer = trace.get_tracer("auto_agent")
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        with self._tracer.start_as_current_span(
+            name, attributes=_otel_attributes(attributes)
+        ) as current:
+            yield current
+
+
+def _otel_attributes(attributes: dict[str, Any]) -> dict[str, Any]:
+    return {
+        key: value if isinstance(value, (str, bool, int, float)) else str(value)
+        for key, value in attributes.items()
+        if value is not None
+    }
+
+
+def get_tracer(name: str = "none") -> Tracer:
+    if name == "memory":
+        return RecordingTracer()
+    if name == "otel" and importlib.util.find_spec("opentelemetry") is not None:
+        return OtelTracer()
+    return Tracer()
+
+
+tracer = get_tracer(settings.tracing_exporter)
+
+
+def set_tracer(new_tracer: Tracer) -> Tracer:
+    """Swap the process tracer; returns the previous one."""
+    global tracer
+    previous, tracer = tracer, new_tracer
+    return previous
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    totals = _timings.get()
+    if totals is None:
+        with tracer.span(name, **attributes) as current:
+            yield current
+        return
+    started = time.perf_counter()
+    try:
+        with tracer.span(name, **attributes) as current:
+            yield current
+    finally:
+        entry = totals.setdefault(name, [0.0, 0])
+        entry[0] += time.perf_counter() - started
+        entry[1] += 1
+
+
+@contextmanager
+def collect_timings(enabled: bool = True) -> Iterator[Optional[dict[str, Any]]]:
+    """Yield a dict filled on exit with ``totalMs`` and per span name ``{ms, count}``."""
+    if not enabled:
+        yield None
+        return
+    totals: dict[str, list[float]] = {}
+    summary: dict[str, Any] = {}
+    token = _timings.set(totals)
+    started = time.perf_counter()
+    try:
+        yield summary
+    finally:
+        _timings.reset(token)
+        summary["totalMs"] = round((time.perf_counter() - started) * 1e3, 2)
+        summary["spans"] = {
+            name: {"ms": round(seconds * 1e3, 2), "count": count}
+            for name, (seconds, count) in totals.items()
+        }
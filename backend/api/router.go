@@ -25,6 +25,8 @@ func SetupRouter(deviceService *services.DeviceService, taskService *services.Ta
 		{
 			task.GET("", NewTaskHandler(taskService).GetTasks)
 			task.POST("", NewTaskHandler(taskService).CreateTask)
+			task.PUT("/batch", NewTaskHandler(taskService).UpdateTasks)
+			task.POST("/batch/delete", NewTaskHandler(taskService).DeleteTasks)
 			task.GET("/:taskId", NewTaskHandler(taskService).GetTask)
 			task.PUT("/:taskId", NewTaskHandler(taskService).UpdateTask)
 			task.DELETE("/:taskId", NewTaskHandler(taskService).DeleteTask)
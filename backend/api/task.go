@@ -2,9 +2,12 @@ package api
 
 import (
 	"net/http"
+	"strconv"
 	"strings"
+	"time"
 
 	"github.com/gin-gonic/gin"
+	"github.com/nexustodo/backend/models"
 	"github.com/nexustodo/backend/schemas"
 	"github.com/nexustodo/backend/services"
 	"github.com/nexustodo/backend/utils"
@@ -33,18 +36,97 @@ func (h *TaskHandler) GetTasks(c *gin.Context) {
 		return
 	}
 
-	status := c.Query("status")
-	tagsStr := c.Query("tags")
+	fields, err := utils.ParseTaskFields(c.Query("fields"))
+	if err != nil {
+		c.JSON(http.StatusBadRequest, schemas.ErrorResponse{
+			Error: struct {
+				Code    string `json:"code"`
+				Message string `json:"message"`
+			}{
+				Code:    "INVALID_REQUEST",
+				Message: "无效的 fields 参数",
+			},
+		})
+		return
+	}
 
-	var tags []string
-	if tagsStr != "" {
-		tags = strings.Split(tagsStr, ",")
-		for i := range tags {
-			tags[i] = strings.TrimSpace(tags[i])
+	if sinceStr := c.Query("since"); sinceStr != "" {
+		since, err := time.Parse(time.RFC3339Nano, sinceStr)
+		if err != nil {
+			c.JSON(http.StatusBadRequest, schemas.ErrorResponse{
+				Error: struct {
+					Code    string `json:"code"`
+					Message string `json:"message"`
+				}{
+					Code:    "INVALID_REQUEST",
+					Message: "无效的 since 参数",
+				},
+			})
+			return
 		}
+
+		tasks, err := h.taskService.GetTasksSince(userID, since.Local())
+		if err != nil {
+			c.JSON(http.StatusInternalServerError, schemas.ErrorResponse{
+				Error: struct {
+					Code    string `json:"code"`
+					Message string `json:"message"`
+				}{
+					Code:    "INTERNAL_ERROR",
+					Message: "服务器内部错误",
+				},
+			})
+			return
+		}
+
+		setSyncToken(c, utils.TaskListSyncToken(tasks, since))
+		c.JSON(http.StatusOK, taskListBody(tasks, fields))
+		return
 	}
 
-	tasks, err := h.taskService.GetTasks(userID, status, tags)
+	var statuses []string
+	if status := c.Query("status"); status != "" {
+		statuses = append(statuses, status)
+	}
+	statuses = append(statuses, splitQueryList(c.Query("statuses"))...)
+	for _, status := range statuses {
+		if !taskStatuses[status] {
+			c.JSON(http.StatusBadRequest, schemas.ErrorResponse{
+				Error: struct {
+					Code    string `json:"code"`
+					Message string `json:"message"`
+				}{
+					Code:    "INVALID_REQUEST",
+					Message: "无效的状态参数",
+				},
+			})
+			return
+		}
+	}
+	tags := splitQueryList(c.Query("tags"))
+	keyword := strings.TrimSpace(c.Query("q"))
+
+	limit, after, ok := parsePage(c)
+	if !ok {
+		c.JSON(http.StatusBadRequest, schemas.ErrorResponse{
+			Error: struct {
+				Code    string `json:"code"`
+				Message string `json:"message"`
+			}{
+				Code:    "INVALID_REQUEST",
+				Message: "无效的分页参数",
+			},
+		})
+		return
+	}
+
+	var tasks []*models.Task
+	hasMore := false
+	if limit > 0 {
+		tasks, hasMore, err = h.taskService.GetTasksPage(userID, statuses, tags, keyword, after, limit)
+	} else {
+		tasks, err = h.taskService.GetTasks(userID, statuses, tags, keyword)
+	}
 	if err != nil {
 		c.JSON(http.StatusInternalServerError, schemas.ErrorResponse{
 			Error: struct {
@@ -58,7 +140,86 @@ func (h *TaskHandler) GetTasks(c *gin.Context) {
 		return
 	}
 
-	c.JSON(http.StatusOK, utils.ModelToTaskResponseList(tasks))
+	if hasMore {
+		c.Header("X-Next-Cursor", utils.EncodeTaskCursor(tasks[len(tasks)-1]))
+	}
+	// Only the full, unfiltered list is a base that since deltas can build on.
+	if limit == 0 && len(statuses) == 0 && len(tags) == 0 && keyword == "" {
+		setSyncToken(c, utils.TaskListSyncToken(tasks, time.Time{}))
+	}
+	etag := utils.TaskListETag(tasks, hasMore)
+	c.Header("ETag", etag)
+	if lastModified := utils.TaskListLastModified(tasks); !lastModified.IsZero() {
+		c.Header("Last-Modified", lastModified.UTC().Format(http.TimeFormat))
+	}
+	if c.GetHeader("If-None-Match") == etag {
+		c.Status(http.StatusNotModified)
+		return
+	}
+
+	c.JSON(http.StatusOK, taskListBody(tasks, fields))
+}
+
+// maxTaskPageSize caps the limit parameter of GET /tasks.
+const maxTaskPageSize = 500
+
+// parsePage reads limit and cursor. A cursor without a limit pages at
+// maxTaskPageSize; neither means the whole list in one response.
+func parsePage(c *gin.Context) (int, *services.TaskCursor, bool) {
+	limit := 0
+	if limitStr := c.Query("limit"); limitStr != "" {
+		parsed, err := strconv.Atoi(limitStr)
+		if err != nil || parsed < 1 || parsed > maxTaskPageSize {
+			return 0, nil, false
+		}
+		limit = parsed
+	}
+
+	cursorStr := c.Query("cursor")
+	if cursorStr == "" {
+		return limit, nil, true
+	}
+	after, err := utils.DecodeTaskCursor(cursorStr)
+	if err != nil {
+		return 0, nil, false
+	}
+	if limit == 0 {
+		limit = maxTaskPageSize
+	}
+	return limit, after, true
+}
+
+// setSyncToken sets X-Sync-Token unless there is nothing to derive it from.
+func setSyncToken(c *gin.Context, token string) {
+	if token != "" {
+		c.Header("X-Sync-Token", token)
+	}
+}
+
+// taskStatuses are the status filter values GET /tasks accepts, matching the
+// oneof binding on task requests.
+var taskStatuses = map[string]bool{
+	"待办": true, "进行中": true, "已完成": true, "已延期": true, "已取消": true,
+}
+
+// splitQueryList parses a comma-separated query value, dropping empty items.
+func splitQueryList(raw string) []string {
+	var items []string
+	for _, item := range strings.Split(raw, ",") {
+		if item = strings.TrimSpace(item); item != "" {
+			items = append(items, item)
+		}
+	}
+	return items
+}
+
+// taskListBody returns full task responses, or only the requested fields.
+func taskListBody(tasks []*models.Task, fields []string) interface{} {
+	responses := utils.ModelToTaskResponseList(tasks)
+	if fields == nil {
+		return responses
+	}
+	return utils.ProjectTaskResponses(responses, fields)
 }
 
 func (h *TaskHandler) GetTask(c *gin.Context) {
@@ -270,3 +431,92 @@ func (h *TaskHandler) DeleteTask(c *gin.Context) {
 		Message: "删除成功",
 	})
 }
+
+func (h *TaskHandler) UpdateTasks(c *gin.Context) {
+	userID := c.GetHeader("X-User-ID")
+
+	var req schemas.TaskBatchUpdateRequest
+	if err := c.ShouldBindJSON(&req); err != nil {
+		c.JSON(http.StatusBadRequest, schemas.ErrorResponse{
+			Error: struct {
+				Code    string `json:"code"`
+				Message string `json:"message"`
+			}{
+				Code:    "INVALID_REQUEST",
+				Message: "请求参数错误",
+			},
+		})
+		return
+	}
+
+	var title, description, status *string
+	if req.Title != "" {
+		title = &req.Title
+	}
+	if req.Description != "" {
+		description = &req.Description
+	}
+	if req.Status != "" {
+		status = &req.Status
+	}
+
+	tasks, failed, err := h.taskService.UpdateTasks(req.TaskIDs, userID, title, description, status, req.Tags)
+	if err != nil {
+		c.JSON(http.StatusInternalServerError, schemas.ErrorResponse{
+			Error: struct {
+				Code    string `json:"code"`
+				Message string `json:"message"`
+			}{
+				Code:    "INTERNAL_ERROR",
+				Message: "服务器内部错误",
+			},
+		})
+		return
+	}
+
+	c.JSON(http.StatusOK, schemas.TaskBatchUpdateResponse{
+		Updated: utils.ModelToTaskResponseList(tasks),
+		Failed:  utils.BatchFailuresToResponse(failed),
+	})
+}
+
+func (h *TaskHandler) DeleteTasks(c *gin.Context) {
+	userID := c.GetHeader("X-User-ID")
+
+	var req schemas.TaskBatchDeleteRequest
+	if err := c.ShouldBindJSON(&req); err != nil {
+		c.JSON(http.StatusBadRequest, schemas.ErrorResponse{
+			Error: struct {
+				Code    string `json:"code"`
+				Message string `json:"message"`
+			}{
+				Code:    "INVALID_REQUEST",
+				Message: "请求参数错误",
+			},
+		})
+		return
+	}
+
+	deleted, failed, err := h.taskService.DeleteTasks(req.TaskIDs, userID)
+	if err != nil {
+		c.JSON(http.StatusInternalServerError, schemas.ErrorResponse{
+			Error: struct {
+				Code    string `json:"code"`
+				Message string `json:"message"`
+			}{
+				Code:    "INTERNAL_ERROR",
+				Message: "服务器内部错误",
+			},
+		})
+		return
+	}
+
+	refs := make([]schemas.TaskRef, len(deleted))
+	for i, taskID := range deleted {
+		refs[i] = schemas.TaskRef{TaskID: taskID}
+	}
+	c.JSON(http.StatusOK, schemas.TaskBatchDeleteResponse{
+		Deleted: refs,
+		Failed:  utils.BatchFailuresToResponse(failed),
+	})
+}
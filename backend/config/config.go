@@ -8,6 +8,8 @@ type Config struct {
 	DatabasePath string
 	Port         string
 	DefaultToken string
+	EnableH2C    bool
+	UnixSocket   string
 }
 
 var AppConfig *Config
@@ -21,6 +23,8 @@ func LoadConfig() *Config {
 		DatabasePath: getEnv("DATABASE_PATH", "./nexustodo.db"),
 		Port:         getEnv("PORT", "8080"),
 		DefaultToken: getEnv("DEFAULT_TOKEN", "default-token"),
+		EnableH2C:    getEnv("ENABLE_H2C", "false") == "true",
+		UnixSocket:   getEnv("UNIX_SOCKET", ""),
 	}
 
 	return AppConfig
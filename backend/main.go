@@ -9,6 +9,7 @@ import (
 	"gorm.io/driver/sqlite"
 	"gorm.io/gorm"
 	"log"
+	"os"
 )
 
 func main() {
@@ -27,6 +28,19 @@ func main() {
 	taskService := services.NewTaskService(db)
 
 	router := api.SetupRouter(deviceService, taskService)
+	// Lets the agent's HTTP/2 client multiplex requests over cleartext connections.
+	router.UseH2C = cfg.EnableH2C
+
+	if cfg.UnixSocket != "" {
+		// Co-located agents can skip TCP loopback; a stale socket file would block Listen.
+		_ = os.Remove(cfg.UnixSocket)
+		go func() {
+			fmt.Printf("Server listening on unix socket %s...\n", cfg.UnixSocket)
+			if err := router.RunUnix(cfg.UnixSocket); err != nil {
+				log.Fatalf("Failed to listen on unix socket: %v", err)
+			}
+		}()
+	}
 
 	fmt.Printf("Server starting on port %s...\n", cfg.Port)
 	if err := router.Run(":" + cfg.Port); err != nil {
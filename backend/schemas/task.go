@@ -13,6 +13,18 @@ type TaskUpdateRequest struct {
 	Tags        []string `json:"tags"`
 }
 
+type TaskBatchUpdateRequest struct {
+	TaskIDs     []string `json:"taskIds" binding:"required,min=1,max=500"`
+	Title       string   `json:"title"`
+	Description string   `json:"description"`
+	Status      string   `json:"status" binding:"omitempty,oneof=待办 进行中 已完成 已延期 已取消"`
+	Tags        []string `json:"tags"`
+}
+
+type TaskBatchDeleteRequest struct {
+	TaskIDs []string `json:"taskIds" binding:"required,min=1,max=500"`
+}
+
 type TaskResponse struct {
 	TaskID      string   `json:"taskId"`
 	UserID      string   `json:"userId"`
@@ -22,6 +34,31 @@ type TaskResponse struct {
 	Tags        []string `json:"tags"`
 	CreatedAt   string   `json:"createdAt"`
 	UpdatedAt   string   `json:"updatedAt"`
+	Deleted     bool     `json:"deleted,omitempty"`
+}
+
+type BatchError struct {
+	Code    string `json:"code"`
+	Message string `json:"message"`
+}
+
+type TaskBatchFailure struct {
+	TaskID string     `json:"taskId"`
+	Error  BatchError `json:"error"`
+}
+
+type TaskRef struct {
+	TaskID string `json:"taskId"`
+}
+
+type TaskBatchUpdateResponse struct {
+	Updated []TaskResponse     `json:"updated"`
+	Failed  []TaskBatchFailure `json:"failed"`
+}
+
+type TaskBatchDeleteResponse struct {
+	Deleted []TaskRef          `json:"deleted"`
+	Failed  []TaskBatchFailure `json:"failed"`
 }
 
 type SuccessResponse struct {
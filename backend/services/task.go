@@ -2,6 +2,7 @@ package services
 
 import (
 	"errors"
+	"strings"
 	"time"
 
 	"github.com/google/uuid"
@@ -9,6 +10,13 @@ import (
 	"gorm.io/gorm"
 )
 
+// BatchFailure reports a task that a batch operation skipped.
+type BatchFailure struct {
+	TaskID  string
+	Code    string
+	Message string
+}
+
 type TaskService struct {
 	db *gorm.DB
 }
@@ -17,12 +25,50 @@ func NewTaskService(db *gorm.DB) *TaskService {
 	return &TaskService{db: db}
 }
 
-func (s *TaskService) GetTasks(userID string, status string, tags []string) ([]*models.Task, error) {
+// TaskCursor marks the last task of a page; the next page starts after it.
+type TaskCursor struct {
+	CreatedAt time.Time
+	ID        string
+}
+
+// GetTasks lists the user's tasks. statuses matches any of the given values,
+// every tag must match, and keyword is a case-insensitive substring of the
+// title or description.
+func (s *TaskService) GetTasks(userID string, statuses []string, tags []string, keyword string) ([]*models.Task, error) {
 	var tasks []*models.Task
+	if err := s.listQuery(userID, statuses, tags, keyword).Find(&tasks).Error; err != nil {
+		return nil, err
+	}
+
+	return tasks, nil
+}
+
+// GetTasksPage returns up to limit tasks after the cursor, in the same order
+// as GetTasks, and whether more tasks follow.
+func (s *TaskService) GetTasksPage(userID string, statuses []string, tags []string, keyword string, after *TaskCursor, limit int) ([]*models.Task, bool, error) {
+	query := s.listQuery(userID, statuses, tags, keyword)
+	if after != nil {
+		query = query.Where("(created_at > ? OR (created_at = ? AND id > ?))", after.CreatedAt, after.CreatedAt, after.ID)
+	}
+
+	var tasks []*models.Task
+	if err := query.Limit(limit + 1).Find(&tasks).Error; err != nil {
+		return nil, false, err
+	}
+
+	if len(tasks) > limit {
+		return tasks[:limit], true, nil
+	}
+	return tasks, false, nil
+}
+
+func (s *TaskService) listQuery(userID string, statuses []string, tags []string, keyword string) *gorm.DB {
 	query := s.db.Where("user_id = ?", userID)
 
-	if status != "" {
-		query = query.Where("status = ?", status)
+	if len(statuses) == 1 {
+		query = query.Where("status = ?", statuses[0])
+	} else if len(statuses) > 1 {
+		query = query.Where("status IN ?", statuses)
 	}
 
 	if len(tags) > 0 {
@@ -31,6 +77,25 @@ func (s *TaskService) GetTasks(userID string, status string, tags []string) ([]*
 		}
 	}
 
+	if keyword != "" {
+		pattern := "%" + likeEscaper.Replace(keyword) + "%"
+		query = query.Where(`(title LIKE ? ESCAPE '\' OR description LIKE ? ESCAPE '\')`, pattern, pattern)
+	}
+
+	// id breaks ties so pages never skip or repeat tasks created in the same instant.
+	return query.Order("created_at ASC").Order("id ASC")
+}
+
+var likeEscaper = strings.NewReplacer(`\`, `\\`, "%", `\%`, "_", `\_`)
+
+// GetTasksSince returns the user's tasks created, updated or deleted at or
+// after since, including soft-deleted rows so clients can drop them.
+func (s *TaskService) GetTasksSince(userID string, since time.Time) ([]*models.Task, error) {
+	var tasks []*models.Task
+	query := s.db.Unscoped().
+		Where("user_id = ?", userID).
+		Where("(updated_at >= ? OR deleted_at >= ?)", since, since)
+
 	if err := query.Order("created_at ASC").Find(&tasks).Error; err != nil {
 		return nil, err
 	}
@@ -137,3 +202,108 @@ func (s *TaskService) DeleteTask(taskID string, userID string) error {
 
 	return nil
 }
+
+// ownedTasks splits taskIDs into the user's tasks and per-id failures.
+func ownedTasks(tx *gorm.DB, taskIDs []string, userID string) ([]string, []BatchFailure, error) {
+	var tasks []*models.Task
+	if err := tx.Where("id IN ?", taskIDs).Find(&tasks).Error; err != nil {
+		return nil, nil, err
+	}
+
+	byID := make(map[string]*models.Task, len(tasks))
+	for _, task := range tasks {
+		byID[task.ID] = task
+	}
+
+	var owned []string
+	var failed []BatchFailure
+	seen := make(map[string]bool, len(taskIDs))
+	for _, taskID := range taskIDs {
+		if seen[taskID] {
+			continue
+		}
+		seen[taskID] = true
+		task, ok := byID[taskID]
+		switch {
+		case !ok:
+			failed = append(failed, BatchFailure{TaskID: taskID, Code: "TASK_NOT_FOUND", Message: "任务不存在"})
+		case task.UserID != userID:
+			failed = append(failed, BatchFailure{TaskID: taskID, Code: "FORBIDDEN", Message: "无权访问该任务"})
+		default:
+			owned = append(owned, taskID)
+		}
+	}
+	return owned, failed, nil
+}
+
+// UpdateTasks applies the same changes to many tasks in one transaction.
+// The batch is all-or-nothing: if any task is missing or belongs to another
+// user, nothing is updated and those tasks are returned as failures.
+func (s *TaskService) UpdateTasks(taskIDs []string, userID string, title *string, description *string, status *string, tags []string) ([]*models.Task, []BatchFailure, error) {
+	var updated []*models.Task
+	var failed []BatchFailure
+
+	err := s.db.Transaction(func(tx *gorm.DB) error {
+		owned, failures, err := ownedTasks(tx, taskIDs, userID)
+		if err != nil {
+			return err
+		}
+		failed = failures
+		if len(failed) > 0 {
+			return nil
+		}
+
+		updates := make(map[string]interface{})
+		updates["updated_at"] = time.Now()
+		if title != nil {
+			updates["title"] = *title
+		}
+		if description != nil {
+			updates["description"] = *description
+		}
+		if status != nil {
+			updates["status"] = *status
+		}
+		if tags != nil {
+			updates["tags"] = models.StringArray(tags)
+		}
+
+		if err := tx.Model(&models.Task{}).Where("id IN ?", owned).Updates(updates).Error; err != nil {
+			return err
+		}
+		return tx.Where("id IN ?", owned).Order("created_at ASC").Find(&updated).Error
+	})
+	if err != nil {
+		return nil, nil, err
+	}
+
+	return updated, failed, nil
+}
+
+// DeleteTasks soft-deletes many tasks in one transaction, all-or-nothing like
+// UpdateTasks.
+func (s *TaskService) DeleteTasks(taskIDs []string, userID string) ([]string, []BatchFailure, error) {
+	var deleted []string
+	var failed []BatchFailure
+
+	err := s.db.Transaction(func(tx *gorm.DB) error {
+		owned, failures, err := ownedTasks(tx, taskIDs, userID)
+		if err != nil {
+			return err
+		}
+		failed = failures
+		if len(failed) > 0 {
+			return nil
+		}
+		if err := tx.Where("id IN ?", owned).Delete(&models.Task{}).Error; err != nil {
+			return err
+		}
+		deleted = owned
+		return nil
+	})
+	if err != nil {
+		return nil, nil, err
+	}
+
+	return deleted, failed, nil
+}
@@ -0,0 +1,202 @@
+package tests
+
+import (
+	"encoding/json"
+	"net/http"
+	"testing"
+
+	"github.com/gin-gonic/gin"
+)
+
+type TaskBatchFailure struct {
+	TaskID string `json:"taskId"`
+	Error  struct {
+		Code    string `json:"code"`
+		Message string `json:"message"`
+	} `json:"error"`
+}
+
+type TaskBatchUpdateResponse struct {
+	Updated []TaskResponse     `json:"updated"`
+	Failed  []TaskBatchFailure `json:"failed"`
+}
+
+type TaskBatchDeleteResponse struct {
+	Deleted []struct {
+		TaskID string `json:"taskId"`
+	} `json:"deleted"`
+	Failed []TaskBatchFailure `json:"failed"`
+}
+
+func getTestTask(t *testing.T, router *gin.Engine, userID, taskID string) TaskResponse {
+	w := serveTaskRequest(router, taskRequest("GET", "/"+taskID, userID, nil))
+	if w.Code != http.StatusOK {
+		t.Fatalf("Expected status code %d for task %s, got %d", http.StatusOK, taskID, w.Code)
+	}
+	var task TaskResponse
+	if err := json.Unmarshal(w.Body.Bytes(), &task); err != nil {
+		t.Fatalf("Failed to parse response: %v", err)
+	}
+	return task
+}
+
+func TestUpdateTasks_AllOrNothing(t *testing.T) {
+	router, _, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	owner, other := "batch-owner", "batch-other"
+	first := createTestTask(t, router, owner, "任务A")
+	second := createTestTask(t, router, owner, "任务B")
+	foreign := createTestTask(t, router, other, "别人的任务")
+
+	cases := []struct {
+		name    string
+		badID   string
+		badCode string
+	}{
+		{"foreign task", foreign.TaskID, "FORBIDDEN"},
+		{"missing task", generateUUID(), "TASK_NOT_FOUND"},
+	}
+	for _, tc := range cases {
+		t.Run(tc.name, func(t *testing.T) {
+			body := map[string]interface{}{
+				"taskIds": []string{first.TaskID, tc.badID, second.TaskID},
+				"status":  "已完成",
+			}
+			w := serveTaskRequest(router, taskRequest("PUT", "/batch", owner, body))
+			if w.Code != http.StatusOK {
+				t.Fatalf("Expected status code %d, got %d", http.StatusOK, w.Code)
+			}
+
+			var response TaskBatchUpdateResponse
+			if err := json.Unmarshal(w.Body.Bytes(), &response); err != nil {
+				t.Fatalf("Failed to parse response: %v", err)
+			}
+			if len(response.Updated) != 0 {
+				t.Errorf("Expected no updated tasks, got %d", len(response.Updated))
+			}
+			if len(response.Failed) != 1 || response.Failed[0].TaskID != tc.badID {
+				t.Fatalf("Expected only %s to fail, got %+v", tc.badID, response.Failed)
+			}
+			if response.Failed[0].Error.Code != tc.badCode {
+				t.Errorf("Expected error code '%s', got '%s'", tc.badCode, response.Failed[0].Error.Code)
+			}
+
+			for _, task := range []TaskResponse{first, second} {
+				if status := getTestTask(t, router, owner, task.TaskID).Status; status != "待办" {
+					t.Errorf("Expected task %s to stay '待办', got '%s'", task.TaskID, status)
+				}
+			}
+		})
+	}
+
+	if status := getTestTask(t, router, other, foreign.TaskID).Status; status != "待办" {
+		t.Errorf("Expected the other user's task to stay '待办', got '%s'", status)
+	}
+
+	body := map[string]interface{}{
+		"taskIds": []string{first.TaskID, second.TaskID, first.TaskID},
+		"status":  "已完成",
+	}
+	w := serveTaskRequest(router, taskRequest("PUT", "/batch", owner, body))
+	var response TaskBatchUpdateResponse
+	if err := json.Unmarshal(w.Body.Bytes(), &response); err != nil {
+		t.Fatalf("Failed to parse response: %v", err)
+	}
+	if len(response.Updated) != 2 || len(response.Failed) != 0 {
+		t.Fatalf("Expected 2 updated and 0 failed, got %d and %d", len(response.Updated), len(response.Failed))
+	}
+	for _, task := range response.Updated {
+		if task.Status != "已完成" {
+			t.Errorf("Expected status '已完成', got '%s'", task.Status)
+		}
+	}
+}
+
+func TestDeleteTasks_AllOrNothing(t *testing.T) {
+	router, _, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	owner, other := "batch-owner", "batch-other"
+	first := createTestTask(t, router, owner, "任务A")
+	second := createTestTask(t, router, owner, "任务B")
+	foreign := createTestTask(t, router, other, "别人的任务")
+
+	for _, badID := range []string{foreign.TaskID, generateUUID()} {
+		body := map[string]interface{}{"taskIds": []string{first.TaskID, second.TaskID, badID}}
+		w := serveTaskRequest(router, taskRequest("POST", "/batch/delete", owner, body))
+		if w.Code != http.StatusOK {
+			t.Fatalf("Expected status code %d, got %d", http.StatusOK, w.Code)
+		}
+
+		var response TaskBatchDeleteResponse
+		if err := json.Unmarshal(w.Body.Bytes(), &response); err != nil {
+			t.Fatalf("Failed to parse response: %v", err)
+		}
+		if len(response.Deleted) != 0 {
+			t.Errorf("Expected no deleted tasks, got %d", len(response.Deleted))
+		}
+		if len(response.Failed) != 1 || response.Failed[0].TaskID != badID {
+			t.Errorf("Expected only %s to fail, got %+v", badID, response.Failed)
+		}
+	}
+
+	list := serveTaskRequest(router, taskRequest("GET", "", owner, nil))
+	var tasks TaskListResponse
+	if err := json.Unmarshal(list.Body.Bytes(), &tasks); err != nil {
+		t.Fatalf("Failed to parse response: %v", err)
+	}
+	if len(tasks) != 2 {
+		t.Errorf("Expected both tasks to survive a rejected batch, got %d", len(tasks))
+	}
+	getTestTask(t, router, other, foreign.TaskID)
+
+	body := map[string]interface{}{"taskIds": []string{first.TaskID, second.TaskID}}
+	w := serveTaskRequest(router, taskRequest("POST", "/batch/delete", owner, body))
+	var response TaskBatchDeleteResponse
+	if err := json.Unmarshal(w.Body.Bytes(), &response); err != nil {
+		t.Fatalf("Failed to parse response: %v", err)
+	}
+	if len(response.Deleted) != 2 || len(response.Failed) != 0 {
+		t.Errorf("Expected 2 deleted and 0 failed, got %d and %d", len(response.Deleted), len(response.Failed))
+	}
+}
+
+func TestTaskBatchRoutes_TakePrecedenceOverTaskID(t *testing.T) {
+	router, _, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	userID := "batch-owner"
+	task := createTestTask(t, router, userID, "任务A")
+
+	// PUT /tasks/:taskId with taskId "batch" would answer 404 TASK_NOT_FOUND.
+	body := map[string]interface{}{"taskIds": []string{task.TaskID}, "status": "进行中"}
+	w := serveTaskRequest(router, taskRequest("PUT", "/batch", userID, body))
+	if w.Code != http.StatusOK {
+		t.Fatalf("Expected status code %d, got %d", http.StatusOK, w.Code)
+	}
+	var response TaskBatchUpdateResponse
+	if err := json.Unmarshal(w.Body.Bytes(), &response); err != nil {
+		t.Fatalf("Failed to parse response: %v", err)
+	}
+	if len(response.Updated) != 1 || response.Updated[0].TaskID != task.TaskID {
+		t.Errorf("Expected the batch handler to update %s, got %+v", task.TaskID, response.Updated)
+	}
+
+	// An empty batch body is rejected by the batch handler, not looked up as an id.
+	w = serveTaskRequest(router, taskRequest("PUT", "/batch", userID, map[string]interface{}{}))
+	if w.Code != http.StatusBadRequest {
+		t.Errorf("Expected status code %d, got %d", http.StatusBadRequest, w.Code)
+	}
+
+	w = serveTaskRequest(router, taskRequest("POST", "/batch/delete", userID, map[string]interface{}{"taskIds": []string{task.TaskID}}))
+	if w.Code != http.StatusOK {
+		t.Fatalf("Expected status code %d, got %d", http.StatusOK, w.Code)
+	}
+
+	// Single-task routes still resolve ids next to the batch routes.
+	w = serveTaskRequest(router, taskRequest("GET", "/"+task.TaskID, userID, nil))
+	if w.Code != http.StatusNotFound {
+		t.Errorf("Expected the deleted task to answer %d, got %d", http.StatusNotFound, w.Code)
+	}
+}
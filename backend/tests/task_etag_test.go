@@ -0,0 +1,114 @@
+package tests
+
+import (
+	"net/http"
+	"testing"
+	"time"
+
+	"github.com/nexustodo/backend/models"
+	"github.com/nexustodo/backend/utils"
+)
+
+func TestGetTasks_IfNoneMatchReturnsNotModified(t *testing.T) {
+	router, _, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	userID := "etag-user"
+	createTestTask(t, router, userID, "任务A")
+	createTestTask(t, router, userID, "任务B")
+
+	w1 := serveTaskRequest(router, taskRequest("GET", "", userID, nil))
+	if w1.Code != http.StatusOK {
+		t.Fatalf("Expected status code %d, got %d", http.StatusOK, w1.Code)
+	}
+	etag := w1.Header().Get("ETag")
+	if etag == "" {
+		t.Fatal("Expected an ETag header")
+	}
+	if w1.Header().Get("Last-Modified") == "" {
+		t.Error("Expected a Last-Modified header")
+	}
+
+	req := taskRequest("GET", "", userID, nil)
+	req.Header.Set("If-None-Match", etag)
+	w2 := serveTaskRequest(router, req)
+
+	if w2.Code != http.StatusNotModified {
+		t.Errorf("Expected status code %d, got %d", http.StatusNotModified, w2.Code)
+	}
+	if w2.Body.Len() != 0 {
+		t.Errorf("Expected an empty body, got %q", w2.Body.String())
+	}
+	if w2.Header().Get("ETag") != etag {
+		t.Errorf("Expected ETag %s, got %s", etag, w2.Header().Get("ETag"))
+	}
+}
+
+func TestGetTasks_ETagChangesAfterMutation(t *testing.T) {
+	router, _, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	userID := "etag-user"
+	task := createTestTask(t, router, userID, "任务A")
+
+	etagOf := func() string {
+		w := serveTaskRequest(router, taskRequest("GET", "", userID, nil))
+		if w.Code != http.StatusOK {
+			t.Fatalf("Expected status code %d, got %d", http.StatusOK, w.Code)
+		}
+		return w.Header().Get("ETag")
+	}
+
+	before := etagOf()
+	w := serveTaskRequest(router, taskRequest("PUT", "/"+task.TaskID, userID, TaskUpdateRequest{Status: "进行中"}))
+	if w.Code != http.StatusOK {
+		t.Fatalf("Expected status code %d, got %d", http.StatusOK, w.Code)
+	}
+	afterUpdate := etagOf()
+	if afterUpdate == before {
+		t.Errorf("Expected ETag to change after an update, still %s", before)
+	}
+
+	req := taskRequest("GET", "", userID, nil)
+	req.Header.Set("If-None-Match", before)
+	if w := serveTaskRequest(router, req); w.Code != http.StatusOK {
+		t.Errorf("Expected a stale ETag to get status code %d, got %d", http.StatusOK, w.Code)
+	}
+
+	createTestTask(t, router, userID, "任务B")
+	afterCreate := etagOf()
+	if afterCreate == afterUpdate {
+		t.Errorf("Expected ETag to change after a create, still %s", afterUpdate)
+	}
+
+	if w := serveTaskRequest(router, taskRequest("DELETE", "/"+task.TaskID, userID, nil)); w.Code != http.StatusOK {
+		t.Fatalf("Expected status code %d, got %d", http.StatusOK, w.Code)
+	}
+	if afterDelete := etagOf(); afterDelete == afterCreate {
+		t.Errorf("Expected ETag to change after a delete, still %s", afterCreate)
+	}
+}
+
+func TestTaskListETag(t *testing.T) {
+	now := time.Now()
+	tasks := []*models.Task{
+		{ID: "a", UpdatedAt: now},
+		{ID: "b", UpdatedAt: now},
+	}
+
+	etag := utils.TaskListETag(tasks, false)
+	if etag != utils.TaskListETag(tasks, false) {
+		t.Error("Expected the same list to get the same ETag")
+	}
+	if etag == utils.TaskListETag(tasks, true) {
+		t.Error("Expected hasMore to change the ETag")
+	}
+	if etag == utils.TaskListETag(tasks[:1], false) {
+		t.Error("Expected a removed task to change the ETag")
+	}
+
+	bumped := []*models.Task{tasks[0], {ID: "b", UpdatedAt: now.Add(time.Nanosecond)}}
+	if etag == utils.TaskListETag(bumped, false) {
+		t.Error("Expected a bumped updatedAt to change the ETag")
+	}
+}
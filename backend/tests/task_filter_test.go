@@ -0,0 +1,118 @@
+package tests
+
+import (
+	"encoding/json"
+	"net/http"
+	"net/url"
+	"testing"
+
+	"github.com/gin-gonic/gin"
+)
+
+// listTasksWith lists the user's tasks with the given query parameters.
+func listTasksWith(t *testing.T, router *gin.Engine, userID string, params url.Values) []map[string]interface{} {
+	w := serveTaskRequest(router, taskRequest("GET", "?"+params.Encode(), userID, nil))
+	if w.Code != http.StatusOK {
+		t.Fatalf("Expected status code %d for %q, got %d", http.StatusOK, params.Encode(), w.Code)
+	}
+	var tasks []map[string]interface{}
+	if err := json.Unmarshal(w.Body.Bytes(), &tasks); err != nil {
+		t.Fatalf("Failed to parse response: %v", err)
+	}
+	return tasks
+}
+
+func TestGetTasks_KeywordMatchesWildcardsLiterally(t *testing.T) {
+	router, _, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	userID := "filter-user"
+	percent := createTestTask(t, router, userID, "100%完成")
+	createTestTask(t, router, userID, "1000完成")
+	underscore := createTestTask(t, router, userID, "a_b")
+	createTestTask(t, router, userID, "axb")
+
+	cases := []struct {
+		q    string
+		want string
+	}{
+		{"0%完", percent.TaskID},
+		{"a_b", underscore.TaskID},
+		{"  a_b  ", underscore.TaskID},
+	}
+	for _, tc := range cases {
+		t.Run(tc.q, func(t *testing.T) {
+			tasks := listTasksWith(t, router, userID, url.Values{"q": {tc.q}})
+			if len(tasks) != 1 || tasks[0]["taskId"] != tc.want {
+				t.Errorf("Expected only task %s for q=%q, got %v", tc.want, tc.q, tasks)
+			}
+		})
+	}
+
+	if tasks := listTasksWith(t, router, userID, url.Values{"q": {"%"}}); len(tasks) != 1 {
+		t.Errorf("Expected q=%% to match only the title containing %%, got %d tasks", len(tasks))
+	}
+}
+
+func TestGetTasks_UnknownStatusIsRejected(t *testing.T) {
+	router, _, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	userID := "filter-user"
+	createTestTask(t, router, userID, "任务")
+
+	for _, params := range []url.Values{
+		{"status": {"done"}},
+		{"statuses": {"待办,未完成"}},
+		{"status": {"待办"}, "statuses": {"已完成,unknown"}},
+	} {
+		t.Run(params.Encode(), func(t *testing.T) {
+			w := serveTaskRequest(router, taskRequest("GET", "?"+params.Encode(), userID, nil))
+			if w.Code != http.StatusBadRequest {
+				t.Fatalf("Expected status code %d, got %d", http.StatusBadRequest, w.Code)
+			}
+			var response ErrorResponse
+			if err := json.Unmarshal(w.Body.Bytes(), &response); err != nil {
+				t.Fatalf("Failed to parse response: %v", err)
+			}
+			if response.Error.Code != "INVALID_REQUEST" {
+				t.Errorf("Expected error code 'INVALID_REQUEST', got '%s'", response.Error.Code)
+			}
+		})
+	}
+
+	tasks := listTasksWith(t, router, userID, url.Values{"statuses": {"待办, 进行中"}})
+	if len(tasks) != 1 {
+		t.Errorf("Expected 1 task for known statuses, got %d", len(tasks))
+	}
+}
+
+func TestGetTasks_FieldsAlwaysKeepTaskID(t *testing.T) {
+	router, _, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	userID := "filter-user"
+	task := createTestTask(t, router, userID, "任务")
+
+	for _, fields := range []string{"title", "title,taskId", "taskId"} {
+		t.Run(fields, func(t *testing.T) {
+			tasks := listTasksWith(t, router, userID, url.Values{"fields": {fields}})
+			if len(tasks) != 1 {
+				t.Fatalf("Expected 1 task, got %d", len(tasks))
+			}
+			if tasks[0]["taskId"] != task.TaskID {
+				t.Errorf("Expected taskId %s, got %v", task.TaskID, tasks[0]["taskId"])
+			}
+			for key := range tasks[0] {
+				if key != "taskId" && key != "title" {
+					t.Errorf("Expected only requested fields, got %q", key)
+				}
+			}
+		})
+	}
+
+	w := serveTaskRequest(router, taskRequest("GET", "?fields=secret", userID, nil))
+	if w.Code != http.StatusBadRequest {
+		t.Errorf("Expected status code %d for an unknown field, got %d", http.StatusBadRequest, w.Code)
+	}
+}
@@ -42,6 +42,39 @@ func setupIntegrationTestRouter() (*gin.Engine, *gorm.DB, func()) {
 	return router, db, cleanup
 }
 
+// taskRequest builds an authenticated request for userID; a non-nil body is
+// sent as JSON.
+func taskRequest(method, path, userID string, body interface{}) *http.Request {
+	var payload []byte
+	if body != nil {
+		payload, _ = json.Marshal(body)
+	}
+	req, _ := http.NewRequest(method, baseURL+taskEndpoint+path, bytes.NewBuffer(payload))
+	req.Header.Set("Content-Type", "application/json")
+	req.Header.Set("Authorization", "Bearer default-token")
+	req.Header.Set("X-User-ID", userID)
+	return req
+}
+
+func serveTaskRequest(router *gin.Engine, req *http.Request) *httptest.ResponseRecorder {
+	w := httptest.NewRecorder()
+	router.ServeHTTP(w, req)
+	return w
+}
+
+// createTestTask creates a task through the API and returns it.
+func createTestTask(t *testing.T, router *gin.Engine, userID, title string) TaskResponse {
+	w := serveTaskRequest(router, taskRequest("POST", "", userID, TaskCreateRequest{Title: title}))
+	if w.Code != http.StatusCreated {
+		t.Fatalf("Failed to create task %q, status code: %d", title, w.Code)
+	}
+	var task TaskResponse
+	if err := json.Unmarshal(w.Body.Bytes(), &task); err != nil {
+		t.Fatalf("Failed to parse response: %v", err)
+	}
+	return task
+}
+
 func TestTaskOrdering_Stability(t *testing.T) {
 	router, _, cleanup := setupIntegrationTestRouter()
 	defer cleanup()
@@ -0,0 +1,151 @@
+package tests
+
+import (
+	"encoding/base64"
+	"encoding/json"
+	"net/http"
+	"net/url"
+	"sort"
+	"testing"
+	"time"
+
+	"github.com/gin-gonic/gin"
+	"github.com/nexustodo/backend/models"
+	"github.com/nexustodo/backend/utils"
+)
+
+// fetchTaskPage requests one page and returns its task ids and X-Next-Cursor.
+func fetchTaskPage(t *testing.T, router *gin.Engine, userID, query string) ([]string, string) {
+	w := serveTaskRequest(router, taskRequest("GET", "?"+query, userID, nil))
+	if w.Code != http.StatusOK {
+		t.Fatalf("Expected status code %d for %q, got %d", http.StatusOK, query, w.Code)
+	}
+	var tasks TaskListResponse
+	if err := json.Unmarshal(w.Body.Bytes(), &tasks); err != nil {
+		t.Fatalf("Failed to parse response: %v", err)
+	}
+	ids := make([]string, len(tasks))
+	for i, task := range tasks {
+		ids[i] = task.TaskID
+	}
+	return ids, w.Header().Get("X-Next-Cursor")
+}
+
+func expectInvalidPage(t *testing.T, router *gin.Engine, userID, query string) {
+	w := serveTaskRequest(router, taskRequest("GET", "?"+query, userID, nil))
+	if w.Code != http.StatusBadRequest {
+		t.Fatalf("Expected status code %d for %q, got %d", http.StatusBadRequest, query, w.Code)
+	}
+	var response ErrorResponse
+	if err := json.Unmarshal(w.Body.Bytes(), &response); err != nil {
+		t.Fatalf("Failed to parse response: %v", err)
+	}
+	if response.Error.Code != "INVALID_REQUEST" {
+		t.Errorf("Expected error code 'INVALID_REQUEST', got '%s'", response.Error.Code)
+	}
+}
+
+func TestGetTasksPage_StableOrderOnEqualCreatedAt(t *testing.T) {
+	router, db, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	userID := "paging-user"
+	// Local, like rows the API writes; cursors decode to local time.
+	createdAt := time.Date(2024, 1, 2, 3, 4, 5, 0, time.Local)
+	var want []string
+	for i := 0; i < 5; i++ {
+		want = append(want, seedTask(t, db, userID, "同一时刻", createdAt, createdAt).ID)
+	}
+	sort.Strings(want)
+
+	var got []string
+	query := "limit=2"
+	for pages := 0; ; pages++ {
+		if pages > len(want) {
+			t.Fatal("Expected paging to stop")
+		}
+		ids, next := fetchTaskPage(t, router, userID, query)
+		got = append(got, ids...)
+		if next == "" {
+			break
+		}
+		query = "limit=2&cursor=" + url.QueryEscape(next)
+	}
+
+	if len(got) != len(want) {
+		t.Fatalf("Expected %d tasks across pages, got %d: %v", len(want), len(got), got)
+	}
+	for i := range want {
+		if got[i] != want[i] {
+			t.Errorf("Expected task %d to be %s, got %s", i, want[i], got[i])
+		}
+	}
+}
+
+func TestGetTasksPage_LimitBounds(t *testing.T) {
+	router, db, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	userID := "paging-user"
+	start := time.Date(2024, 1, 2, 3, 4, 5, 0, time.Local)
+	for i := 0; i < 502; i++ {
+		at := start.Add(time.Duration(i) * time.Second)
+		seedTask(t, db, userID, "任务", at, at)
+	}
+
+	ids, next := fetchTaskPage(t, router, userID, "limit=500")
+	if len(ids) != 500 || next == "" {
+		t.Errorf("Expected 500 tasks and a next cursor, got %d and %q", len(ids), next)
+	}
+
+	// A cursor without a limit pages at the 500 maximum.
+	_, next = fetchTaskPage(t, router, userID, "limit=1")
+	ids, next = fetchTaskPage(t, router, userID, "cursor="+url.QueryEscape(next))
+	if len(ids) != 500 || next == "" {
+		t.Errorf("Expected 500 tasks and a next cursor, got %d and %q", len(ids), next)
+	}
+
+	for _, limit := range []string{"501", "0", "-1", "ten"} {
+		t.Run("limit="+limit, func(t *testing.T) {
+			expectInvalidPage(t, router, userID, "limit="+limit)
+		})
+	}
+}
+
+func TestGetTasksPage_InvalidCursor(t *testing.T) {
+	router, _, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	encode := func(raw string) string {
+		return base64.RawURLEncoding.EncodeToString([]byte(raw))
+	}
+	cursors := map[string]string{
+		"not base64":     "not a cursor!",
+		"no separator":   encode("2024-01-02T03:04:05Z"),
+		"empty id":       encode("2024-01-02T03:04:05Z|"),
+		"bad created at": encode("yesterday|" + generateUUID()),
+	}
+	for name, cursor := range cursors {
+		t.Run(name, func(t *testing.T) {
+			expectInvalidPage(t, router, "paging-user", "limit=10&cursor="+url.QueryEscape(cursor))
+		})
+	}
+}
+
+func TestTaskCursor_RoundTrip(t *testing.T) {
+	task := &models.Task{
+		ID:        generateUUID(),
+		CreatedAt: time.Date(2024, 1, 2, 3, 4, 5, 123456789, time.UTC),
+	}
+
+	cursor, err := utils.DecodeTaskCursor(utils.EncodeTaskCursor(task))
+	if err != nil {
+		t.Fatalf("Failed to decode cursor: %v", err)
+	}
+	if cursor.ID != task.ID {
+		t.Errorf("Expected cursor id %s, got %s", task.ID, cursor.ID)
+	}
+	if !cursor.CreatedAt.Equal(task.CreatedAt) {
+		t.Errorf("Expected cursor time %v, got %v", task.CreatedAt, cursor.CreatedAt)
+	}
+}
@@ -0,0 +1,174 @@
+package tests
+
+import (
+	"encoding/json"
+	"net/http"
+	"net/url"
+	"testing"
+	"time"
+
+	"github.com/google/uuid"
+	"github.com/nexustodo/backend/models"
+	"gorm.io/gorm"
+)
+
+// seedTask inserts a task directly, so tests control its timestamps.
+func seedTask(t *testing.T, db *gorm.DB, userID, title string, createdAt, updatedAt time.Time) *models.Task {
+	task := &models.Task{
+		ID:        uuid.New().String(),
+		UserID:    userID,
+		Title:     title,
+		Status:    "待办",
+		CreatedAt: createdAt,
+		UpdatedAt: updatedAt,
+	}
+	if err := db.Create(task).Error; err != nil {
+		t.Fatalf("Failed to seed task %q: %v", title, err)
+	}
+	return task
+}
+
+func sinceRequest(userID, since string) *http.Request {
+	return taskRequest("GET", "?since="+url.QueryEscape(since), userID, nil)
+}
+
+func TestGetTasksSince_ReturnsTombstones(t *testing.T) {
+	router, db, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	userID := "sync-user"
+	kept := createTestTask(t, router, userID, "保留")
+	removed := createTestTask(t, router, userID, "删除")
+
+	full := serveTaskRequest(router, taskRequest("GET", "", userID, nil))
+	token := full.Header().Get("X-Sync-Token")
+	if token == "" {
+		t.Fatal("Expected an X-Sync-Token header on the full list")
+	}
+
+	if w := serveTaskRequest(router, taskRequest("DELETE", "/"+removed.TaskID, userID, nil)); w.Code != http.StatusOK {
+		t.Fatalf("Expected status code %d, got %d", http.StatusOK, w.Code)
+	}
+
+	w := serveTaskRequest(router, sinceRequest(userID, token))
+	if w.Code != http.StatusOK {
+		t.Fatalf("Expected status code %d, got %d", http.StatusOK, w.Code)
+	}
+
+	var delta []map[string]interface{}
+	if err := json.Unmarshal(w.Body.Bytes(), &delta); err != nil {
+		t.Fatalf("Failed to parse response: %v", err)
+	}
+	byID := make(map[string]map[string]interface{}, len(delta))
+	for _, item := range delta {
+		byID[item["taskId"].(string)] = item
+	}
+	tombstone, ok := byID[removed.TaskID]
+	if !ok {
+		t.Fatalf("Expected deleted task %s in the delta", removed.TaskID)
+	}
+	if tombstone["deleted"] != true {
+		t.Errorf("Expected deleted task to carry deleted=true, got %v", tombstone["deleted"])
+	}
+	if item, ok := byID[kept.TaskID]; ok && item["deleted"] != nil {
+		t.Errorf("Expected live task %s without deleted, got %v", kept.TaskID, item["deleted"])
+	}
+
+	var deleted models.Task
+	if err := db.Unscoped().Where("id = ?", removed.TaskID).First(&deleted).Error; err != nil {
+		t.Fatalf("Failed to load deleted task: %v", err)
+	}
+	expected := deleted.DeletedAt.Time.UTC().Format(time.RFC3339Nano)
+	if got := w.Header().Get("X-Sync-Token"); got != expected {
+		t.Errorf("Expected X-Sync-Token %s (the deletion time), got %s", expected, got)
+	}
+}
+
+func TestGetTasks_SyncTokenComesFromRows(t *testing.T) {
+	router, db, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	userID := "sync-user"
+	updatedAt := time.Date(2024, 1, 2, 3, 4, 5, 123456789, time.UTC)
+	seedTask(t, db, userID, "旧任务", updatedAt.Add(-time.Hour), updatedAt)
+	seedTask(t, db, userID, "更旧的任务", updatedAt.Add(-2*time.Hour), updatedAt.Add(-time.Minute))
+
+	w := serveTaskRequest(router, taskRequest("GET", "", userID, nil))
+	if w.Code != http.StatusOK {
+		t.Fatalf("Expected status code %d, got %d", http.StatusOK, w.Code)
+	}
+	expected := "2024-01-02T03:04:05.123456789Z"
+	if got := w.Header().Get("X-Sync-Token"); got != expected {
+		t.Errorf("Expected X-Sync-Token %s (newest updatedAt), got %s", expected, got)
+	}
+
+	// With no changes after since, the token stays at since.
+	since := "2030-01-01T00:00:00Z"
+	w = serveTaskRequest(router, sinceRequest(userID, since))
+	if w.Code != http.StatusOK {
+		t.Fatalf("Expected status code %d, got %d", http.StatusOK, w.Code)
+	}
+	if got := w.Header().Get("X-Sync-Token"); got != since {
+		t.Errorf("Expected X-Sync-Token %s, got %s", since, got)
+	}
+}
+
+func TestGetTasksSince_InvalidSince(t *testing.T) {
+	router, _, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	for _, since := range []string{"yesterday", "2024-01-02", "1704164645"} {
+		t.Run(since, func(t *testing.T) {
+			w := serveTaskRequest(router, sinceRequest("sync-user", since))
+			if w.Code != http.StatusBadRequest {
+				t.Errorf("Expected status code %d, got %d", http.StatusBadRequest, w.Code)
+			}
+			var response ErrorResponse
+			if err := json.Unmarshal(w.Body.Bytes(), &response); err != nil {
+				t.Fatalf("Failed to parse response: %v", err)
+			}
+			if response.Error.Code != "INVALID_REQUEST" {
+				t.Errorf("Expected error code 'INVALID_REQUEST', got '%s'", response.Error.Code)
+			}
+		})
+	}
+}
+
+func TestGetTasks_SyncTokenOnlyOnFullList(t *testing.T) {
+	router, _, cleanup := setupIntegrationTestRouter()
+	defer cleanup()
+
+	userID := "sync-user"
+	createTestTask(t, router, userID, "任务A")
+	createTestTask(t, router, userID, "任务B")
+
+	first := serveTaskRequest(router, taskRequest("GET", "?limit=1", userID, nil))
+	cursor := first.Header().Get("X-Next-Cursor")
+	if cursor == "" {
+		t.Fatal("Expected an X-Next-Cursor header")
+	}
+
+	if w := serveTaskRequest(router, taskRequest("GET", "", userID, nil)); w.Header().Get("X-Sync-Token") == "" {
+		t.Error("Expected an X-Sync-Token header on the full list")
+	}
+
+	for _, query := range []string{
+		"?status=" + url.QueryEscape("待办"),
+		"?statuses=" + url.QueryEscape("待办,进行中"),
+		"?tags=work",
+		"?q=" + url.QueryEscape("任务"),
+		"?limit=1",
+		"?limit=500",
+		"?cursor=" + cursor,
+	} {
+		t.Run(query, func(t *testing.T) {
+			w := serveTaskRequest(router, taskRequest("GET", query, userID, nil))
+			if w.Code != http.StatusOK {
+				t.Fatalf("Expected status code %d, got %d", http.StatusOK, w.Code)
+			}
+			if token := w.Header().Get("X-Sync-Token"); token != "" {
+				t.Errorf("Expected no X-Sync-Token on a filtered or paged list, got %s", token)
+			}
+		})
+	}
+}
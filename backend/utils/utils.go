@@ -1,9 +1,15 @@
 package utils
 
 import (
+	"encoding/base64"
+	"fmt"
+	"hash/fnv"
+	"strings"
+	"time"
+
 	"github.com/nexustodo/backend/models"
 	"github.com/nexustodo/backend/schemas"
-	"time"
+	"github.com/nexustodo/backend/services"
 )
 
 func ModelToTaskResponse(task *models.Task) *schemas.TaskResponse {
@@ -16,6 +22,7 @@ func ModelToTaskResponse(task *models.Task) *schemas.TaskResponse {
 		Tags:        []string(task.Tags),
 		CreatedAt:   task.CreatedAt.Format(time.RFC3339),
 		UpdatedAt:   task.UpdatedAt.Format(time.RFC3339),
+		Deleted:     task.DeletedAt.Valid,
 	}
 }
 
@@ -26,3 +33,134 @@ func ModelToTaskResponseList(tasks []*models.Task) []schemas.TaskResponse {
 	}
 	return responses
 }
+
+// TaskListETag returns a weak validator for a task list: it changes whenever a
+// task is added, removed, or has its updatedAt bumped. hasMore distinguishes a
+// page that gained a successor from the same page when it was the last one.
+func TaskListETag(tasks []*models.Task, hasMore bool) string {
+	hash := fnv.New64a()
+	for _, task := range tasks {
+		fmt.Fprintf(hash, "%s|%d;", task.ID, task.UpdatedAt.UnixNano())
+	}
+	if hasMore {
+		hash.Write([]byte("more"))
+	}
+	return fmt.Sprintf(`W/"%d-%x"`, len(tasks), hash.Sum64())
+}
+
+// EncodeTaskCursor returns the opaque cursor for the page after task.
+func EncodeTaskCursor(task *models.Task) string {
+	raw := task.CreatedAt.Format(time.RFC3339Nano) + "|" + task.ID
+	return base64.RawURLEncoding.EncodeToString([]byte(raw))
+}
+
+// DecodeTaskCursor parses a cursor produced by EncodeTaskCursor.
+func DecodeTaskCursor(cursor string) (*services.TaskCursor, error) {
+	raw, err := base64.RawURLEncoding.DecodeString(cursor)
+	if err != nil {
+		return nil, err
+	}
+	createdAt, id, ok := strings.Cut(string(raw), "|")
+	if !ok || id == "" {
+		return nil, fmt.Errorf("malformed task cursor")
+	}
+	parsed, err := time.Parse(time.RFC3339Nano, createdAt)
+	if err != nil {
+		return nil, err
+	}
+	return &services.TaskCursor{CreatedAt: parsed.Local(), ID: id}, nil
+}
+
+// TaskListSyncToken returns the newest updatedAt/deletedAt among the rows, as
+// the X-Sync-Token for the next since delta; fallback when there are no rows.
+// Deriving it from the rows rather than the clock means a write that commits
+// after the query but with an earlier timestamp than the token cannot be
+// skipped by the next delta.
+func TaskListSyncToken(tasks []*models.Task, fallback time.Time) string {
+	latest := fallback
+	for _, task := range tasks {
+		if task.UpdatedAt.After(latest) {
+			latest = task.UpdatedAt
+		}
+		if task.DeletedAt.Valid && task.DeletedAt.Time.After(latest) {
+			latest = task.DeletedAt.Time
+		}
+	}
+	if latest.IsZero() {
+		return ""
+	}
+	return latest.UTC().Format(time.RFC3339Nano)
+}
+
+// TaskListLastModified returns the newest updatedAt in the list.
+func TaskListLastModified(tasks []*models.Task) time.Time {
+	var latest time.Time
+	for _, task := range tasks {
+		if task.UpdatedAt.After(latest) {
+			latest = task.UpdatedAt
+		}
+	}
+	return latest
+}
+
+func BatchFailuresToResponse(failures []services.BatchFailure) []schemas.TaskBatchFailure {
+	responses := make([]schemas.TaskBatchFailure, len(failures))
+	for i, failure := range failures {
+		responses[i] = schemas.TaskBatchFailure{
+			TaskID: failure.TaskID,
+			Error:  schemas.BatchError{Code: failure.Code, Message: failure.Message},
+		}
+	}
+	return responses
+}
+
+// taskFields maps the JSON names accepted by the fields query parameter to
+// their values in a TaskResponse.
+var taskFields = map[string]func(task *schemas.TaskResponse) interface{}{
+	"taskId":      func(task *schemas.TaskResponse) interface{} { return task.TaskID },
+	"userId":      func(task *schemas.TaskResponse) interface{} { return task.UserID },
+	"title":       func(task *schemas.TaskResponse) interface{} { return task.Title },
+	"description": func(task *schemas.TaskResponse) interface{} { return task.Description },
+	"status":      func(task *schemas.TaskResponse) interface{} { return task.Status },
+	"tags":        func(task *schemas.TaskResponse) interface{} { return task.Tags },
+	"createdAt":   func(task *schemas.TaskResponse) interface{} { return task.CreatedAt },
+	"updatedAt":   func(task *schemas.TaskResponse) interface{} { return task.UpdatedAt },
+}
+
+// ParseTaskFields splits a comma-separated fields parameter and rejects
+// unknown names. An empty parameter means "all fields" and returns nil.
+func ParseTaskFields(raw string) ([]string, error) {
+	if raw == "" {
+		return nil, nil
+	}
+	var fields []string
+	for _, field := range strings.Split(raw, ",") {
+		field = strings.TrimSpace(field)
+		if field == "" {
+			continue
+		}
+		if _, ok := taskFields[field]; !ok {
+			return nil, fmt.Errorf("unknown task field %q", field)
+		}
+		fields = append(fields, field)
+	}
+	return fields, nil
+}
+
+// ProjectTaskResponses keeps only the requested fields. taskId is always
+// included, and so is deleted for tombstones.
+func ProjectTaskResponses(responses []schemas.TaskResponse, fields []string) []map[string]interface{} {
+	projected := make([]map[string]interface{}, len(responses))
+	for i := range responses {
+		task := &responses[i]
+		item := map[string]interface{}{"taskId": task.TaskID}
+		for _, field := range fields {
+			item[field] = taskFields[field](task)
+		}
+		if task.Deleted {
+			item["deleted"] = true
+		}
+		projected[i] = item
+	}
+	return projected
+}